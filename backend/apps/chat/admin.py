@@ -17,6 +17,7 @@ class ParticipantAdmin(admin.ModelAdmin):
         "joined_at",
         "last_read_message",
         "last_read_at",
+        "unread_count",
     )
     search_fields = ("conversation__id", "user__username")
 
@@ -2,7 +2,7 @@ from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.contrib.auth.models import AnonymousUser
 
-from .models import Conversation, ConversationParticipant, Message
+from .models import Conversation, ConversationParticipant
 
 
 class ChatConsumer(AsyncJsonWebsocketConsumer):
@@ -52,15 +52,12 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
     @database_sync_to_async
     def _create_msg(self, uid, conv_id, text):
         conv = Conversation.objects.get(pk=conv_id)
-        user = self.scope["user"]
-        m = Message.objects.create(conversation=conv, sender=user, text=text)
-        Conversation.objects.filter(pk=conv.pk).update(last_message_at=m.created_at)
-        return m
+        return conv.post_message(self.scope["user"], text)
 
     def _serialize(self, m):
         return {
             "id": str(m.id),
-            "conversation": m.conversation_id,
+            "conversation": str(m.conversation_id),
             "sender": m.sender_id,
             "text": m.text,
             "created_at": m.created_at.isoformat(),
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+
+from apps.chat.models import ConversationParticipant, Message
+
+
+class Command(BaseCommand):
+    """
+    Repair drift in the materialized ConversationParticipant.unread_count and
+    ConversationParticipant.last_message columns by recomputing them from the
+    messages table.
+
+    Usage:
+        python manage.py reconcile_chat_counters            # repair
+        python manage.py reconcile_chat_counters --dry-run  # report only
+    """
+
+    help = "Recompute ConversationParticipant unread_count/last_message"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted participants without writing.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        checked = 0
+        drifted = 0
+
+        participants = ConversationParticipant.objects.select_related(
+            "last_read_message"
+        ).order_by("pk")
+        for part in participants.iterator(chunk_size=500):
+            checked += 1
+            last_message_id = (
+                Message.objects.filter(conversation_id=part.conversation_id)
+                .order_by("-created_at", "-id")
+                .values_list("id", flat=True)
+                .first()
+            )
+            unread_count = part.count_unread()
+            if (part.last_message_id, part.unread_count) == (
+                last_message_id,
+                unread_count,
+            ):
+                continue
+
+            drifted += 1
+            self.stdout.write(
+                f"Participant {part.pk} (conversation {part.conversation_id}): "
+                f"unread_count {part.unread_count} -> {unread_count}, "
+                f"last_message {part.last_message_id} -> {last_message_id}"
+            )
+            if not dry_run:
+                # Queryset update so concurrent increments are not clobbered
+                # by a stale full-row save
+                ConversationParticipant.objects.filter(pk=part.pk).update(
+                    last_message_id=last_message_id, unread_count=unread_count
+                )
+
+        verb = "Found" if dry_run else "Repaired"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {checked} participants. {verb} {drifted} drifted."
+            )
+        )
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_participant_counters(apps, schema_editor):
+    ConversationParticipant = apps.get_model("chat", "ConversationParticipant")
+    Message = apps.get_model("chat", "Message")
+
+    for part in ConversationParticipant.objects.select_related(
+        "last_read_message"
+    ).iterator():
+        messages = Message.objects.filter(conversation_id=part.conversation_id)
+        unread = messages.exclude(sender_id=part.user_id)
+        if part.last_read_message_id:
+            unread = unread.filter(created_at__gt=part.last_read_message.created_at)
+        part.last_message = messages.order_by("-created_at", "-id").first()
+        part.unread_count = unread.count()
+        part.save(update_fields=["last_message", "unread_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0002_alter_conversation_created_by_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversationparticipant",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="chat.message",
+            ),
+        ),
+        migrations.AddField(
+            model_name="conversationparticipant",
+            name="unread_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_participant_counters, migrations.RunPython.noop),
+    ]
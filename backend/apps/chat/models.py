@@ -1,7 +1,9 @@
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 
 User = settings.AUTH_USER_MODEL
 
@@ -25,6 +27,23 @@ class Conversation(models.Model):
         a, b = sorted([str(u1_id), str(u2_id)])
         return f"{a}:{b}"
 
+    def post_message(self, sender, text):
+        """
+        Create a message and update the denormalized inbox state in the same
+        transaction: conversation.last_message_at, every participant's
+        last_message, and unread_count for everyone except the sender.
+        """
+        with transaction.atomic():
+            m = Message.objects.create(conversation=self, sender=sender, text=text)
+            Conversation.objects.filter(pk=self.pk).update(last_message_at=m.created_at)
+            participants = ConversationParticipant.objects.filter(conversation=self)
+            participants.filter(user=sender).update(last_message=m)
+            participants.exclude(user=sender).update(
+                last_message=m, unread_count=F("unread_count") + 1
+            )
+        self.last_message_at = m.created_at
+        return m
+
 
 class ConversationParticipant(models.Model):
     conversation = models.ForeignKey(
@@ -38,10 +57,48 @@ class ConversationParticipant(models.Model):
         "Message", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
     )
     last_read_at = models.DateTimeField(null=True, blank=True)
+    # Materialized inbox state, maintained by Conversation.post_message and
+    # mark_read; repair drift with `manage.py reconcile_chat_counters`.
+    last_message = models.ForeignKey(
+        "Message", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    unread_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ("conversation", "user")
 
+    def count_unread(self):
+        """Count unread messages from scratch (messages from others after the
+        last read message)"""
+        qs = Message.objects.filter(conversation_id=self.conversation_id).exclude(
+            sender_id=self.user_id
+        )
+        if self.last_read_message_id:
+            qs = qs.filter(created_at__gt=self.last_read_message.created_at)
+        return qs.count()
+
+    def mark_read(self, message):
+        """
+        Advance the read marker to `message` (never backwards) and recompute
+        unread_count. Returns True if the marker moved.
+        """
+        with transaction.atomic():
+            part = ConversationParticipant.objects.select_for_update().get(pk=self.pk)
+            if part.last_read_message and (
+                part.last_read_message.created_at >= message.created_at
+            ):
+                return False
+            part.last_read_message = message
+            part.last_read_at = timezone.now()
+            part.unread_count = part.count_unread()
+            part.save(
+                update_fields=["last_read_message", "last_read_at", "unread_count"]
+            )
+        self.last_read_message = part.last_read_message
+        self.last_read_at = part.last_read_at
+        self.unread_count = part.unread_count
+        return True
+
 
 class Message(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
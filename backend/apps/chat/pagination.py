@@ -0,0 +1,36 @@
+"""
+Opaque keyset cursors for chat endpoints.
+
+A cursor is the url-safe base64 of a small JSON list holding the sort key
+of the row it points at, e.g. ``[created_at_iso, id]``. Clients must treat
+it as an opaque token and only echo back what the API returned.
+"""
+
+import base64
+import binascii
+import json
+
+from rest_framework.exceptions import ValidationError
+
+
+def encode_cursor(*values):
+    """Encode sort-key values (str/None) into an opaque cursor string"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size, param="cursor"):
+    """
+    Decode a cursor produced by encode_cursor into a list of `size` values.
+
+    Raises:
+        ValidationError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValidationError({param: ["Invalid cursor."]})
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError({param: ["Invalid cursor."]})
+    return values
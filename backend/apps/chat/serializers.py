@@ -27,14 +27,14 @@ class ConversationListSerializer(serializers.ModelSerializer):
         )
 
     def get_last_message(self, obj):
-        m = getattr(obj, "last_message_obj", None)
-        if not m:
+        # Populated by ConversationViewSet._inbox_queryset annotations
+        if getattr(obj, "last_msg_id", None) is None:
             return None
         return {
-            "id": str(m.id),
-            "text": m.text,
-            "sender": m.sender_id,
-            "created_at": m.created_at,
+            "id": str(obj.last_msg_id),
+            "text": obj.last_msg_text,
+            "sender": obj.last_msg_sender_id,
+            "created_at": obj.last_msg_created_at,
         }
 
     def get_other_participant(self, obj):
@@ -43,8 +43,13 @@ class ConversationListSerializer(serializers.ModelSerializer):
         if not request or not request.user:
             return None
 
-        # Get the other participant (not the current user)
-        other_participant = obj.participants.exclude(user=request.user).first()
+        # Get the other participant (not the current user), preferring the
+        # list prefetched by the inbox queryset to avoid a query per row
+        others = getattr(obj, "other_participants", None)
+        if others is not None:
+            other_participant = others[0] if others else None
+        else:
+            other_participant = obj.participants.exclude(user=request.user).first()
         if not other_participant:
             return None
 
@@ -1,5 +1,4 @@
 from django.contrib.auth import get_user_model
-from django.utils import timezone
 from apps.chat.models import Conversation, ConversationParticipant, Message
 
 User = get_user_model()
@@ -26,9 +25,5 @@ def make_direct_conversation(a: User, b: User) -> Conversation:
 
 
 def make_message(conv: Conversation, sender: User, text: str = "hi") -> Message:
-    m = Message.objects.create(conversation=conv, sender=sender, text=text)
-    # mirror production view behavior that bumps last_message_at
-    Conversation.objects.filter(pk=conv.pk).update(
-        last_message_at=m.created_at or timezone.now()
-    )
-    return m
+    # same path as production: bumps last_message_at and participant counters
+    return conv.post_message(sender, text)
@@ -0,0 +1,104 @@
+import io
+
+import pytest
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.chat.models import ConversationParticipant
+from apps.chat.tests._factories import make_direct_conversation, make_nyu_user
+
+
+def _part(conv, user):
+    return ConversationParticipant.objects.get(conversation=conv, user=user)
+
+
+@pytest.fixture
+def pair(db):
+    a = make_nyu_user(email="cnt-a@nyu.edu")
+    b = make_nyu_user(email="cnt-b@nyu.edu")
+    return make_direct_conversation(a, b), a, b
+
+
+@pytest.mark.django_db
+def test_rest_send_increments_peer_only_and_read_resets(pair):
+    conv, a, b = pair
+    client = APIClient()
+    client.force_authenticate(user=a)
+    for text in ("one", "two"):
+        res = client.post(
+            f"/api/v1/chat/conversations/{conv.id}/send/", {"text": text}, format="json"
+        )
+        assert res.status_code == 201
+    last_id = res.json()["id"]
+
+    assert _part(conv, a).unread_count == 0
+    assert _part(conv, b).unread_count == 2
+    assert str(_part(conv, a).last_message_id) == last_id
+    assert str(_part(conv, b).last_message_id) == last_id
+
+    client.force_authenticate(user=b)
+    res = client.post(
+        f"/api/v1/chat/conversations/{conv.id}/read/",
+        {"message_id": last_id},
+        format="json",
+    )
+    assert res.status_code == 200
+    assert _part(conv, b).unread_count == 0
+
+
+@pytest.mark.django_db
+def test_read_up_to_older_message_keeps_newer_unread(pair):
+    conv, a, b = pair
+    first = conv.post_message(a, "one")
+    conv.post_message(a, "two")
+
+    assert _part(conv, b).mark_read(first) is True
+    assert _part(conv, b).unread_count == 1
+    # The marker never moves backwards
+    assert _part(conv, b).mark_read(first) is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_websocket_send_increments_peer_counter():
+    from apps.chat.consumers import ChatConsumer
+
+    a = await sync_to_async(make_nyu_user)(email="cnt-ws-a@nyu.edu")
+    b = await sync_to_async(make_nyu_user)(email="cnt-ws-b@nyu.edu")
+    conv = await sync_to_async(make_direct_conversation)(a, b)
+
+    comm = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+    comm.scope["url_route"] = {"kwargs": {"conversation_id": str(conv.id)}}
+    comm.scope["user"] = a
+    connected, _ = await comm.connect()
+    assert connected
+    await comm.send_json_to({"type": "message.send", "text": "hello"})
+    event = await comm.receive_json_from()
+    await comm.disconnect()
+
+    part = await sync_to_async(_part)(conv, b)
+    assert part.unread_count == 1
+    assert str(part.last_message_id) == event["message"]["id"]
+
+
+@pytest.mark.django_db
+def test_reconcile_command_repairs_drift(pair):
+    conv, a, b = pair
+    m = conv.post_message(a, "one")
+    ConversationParticipant.objects.filter(conversation=conv).update(
+        unread_count=7, last_message=None
+    )
+
+    out = io.StringIO()
+    call_command("reconcile_chat_counters", "--dry-run", stdout=out)
+    assert "Found 2 drifted" in out.getvalue()
+    assert _part(conv, b).unread_count == 7
+
+    out = io.StringIO()
+    call_command("reconcile_chat_counters", stdout=out)
+    assert "Repaired 2 drifted" in out.getvalue()
+    assert _part(conv, a).unread_count == 0
+    assert _part(conv, b).unread_count == 1
+    assert _part(conv, b).last_message_id == m.id
@@ -0,0 +1,139 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.chat.pagination import encode_cursor
+from apps.chat.tests._factories import (
+    make_direct_conversation,
+    make_message,
+    make_nyu_user,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def me():
+    return make_nyu_user(email="inbox-me@nyu.edu")
+
+
+@pytest.fixture
+def client(me):
+    c = APIClient()
+    c.force_authenticate(user=me)
+    return c
+
+
+def _make_peers(me, count, start=0):
+    convs = []
+    for i in range(start, start + count):
+        peer = make_nyu_user(email=f"inbox-peer{i}@nyu.edu", netid=f"peer{i}")
+        conv = make_direct_conversation(me, peer)
+        make_message(conv, peer, text=f"hello {i}")
+        make_message(conv, peer, text=f"latest {i}")
+        convs.append((conv, peer))
+    return convs
+
+
+def _count_queries(client, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get("/api/v1/chat/conversations/", params or {})
+    assert res.status_code == 200
+    return len(ctx.captured_queries), res.json()
+
+
+def test_inbox_query_count_is_constant(me, client):
+    _make_peers(me, 1)
+    small, _ = _count_queries(client)
+    _make_peers(me, 6, start=1)
+    large, payload = _count_queries(client)
+
+    assert small == large == 2  # conversations + peers
+    assert len(payload) == 7
+
+
+def test_inbox_row_contents(me, client):
+    ((conv, peer),) = _make_peers(me, 1)
+    own = make_message(conv, me, text="mine")
+
+    _, payload = _count_queries(client)
+    row = payload[0]
+    assert row["id"] == str(conv.id)
+    assert row["last_message"]["id"] == str(own.id)
+    assert row["last_message"]["text"] == "mine"
+    assert row["last_message"]["sender"] == me.id
+    assert row["other_participant"] == {
+        "id": peer.id,
+        "email": peer.email,
+        "netid": "peer0",
+    }
+    # Never read: every message from the peer counts, own messages do not
+    assert row["unread_count"] == 2
+
+
+def test_inbox_unread_counts_after_last_read(me, client):
+    ((conv, peer),) = _make_peers(me, 1)
+    read_upto = conv.messages.order_by("created_at").first()
+    res = client.post(
+        f"/api/v1/chat/conversations/{conv.id}/read/",
+        {"message_id": str(read_upto.id)},
+        format="json",
+    )
+    assert res.status_code == 200
+
+    _, payload = _count_queries(client)
+    assert payload[0]["unread_count"] == 1
+
+
+def test_inbox_empty_conversation(me, client):
+    peer = make_nyu_user(email="inbox-quiet@nyu.edu")
+    make_direct_conversation(me, peer)
+
+    _, payload = _count_queries(client)
+    assert payload[0]["last_message"] is None
+    assert payload[0]["unread_count"] == 0
+
+
+def test_inbox_cursor_pagination_walks_all_conversations(me, client):
+    convs = _make_peers(me, 5)
+    # One conversation without any message sorts last
+    quiet = make_direct_conversation(me, make_nyu_user(email="inbox-q@nyu.edu"))
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        queries, body = _count_queries(client, params)
+        assert queries == 2
+        seen.extend(row["id"] for row in body["results"])
+        if not body["next"]:
+            break
+        params = {"limit": 2, "cursor": body["next"]}
+
+    expected = [str(c.id) for c, _ in reversed(convs)] + [str(quiet.id)]
+    assert seen == expected
+
+
+def test_inbox_invalid_cursor_and_limit(client):
+    assert (
+        client.get("/api/v1/chat/conversations/", {"cursor": "!!"}).status_code == 400
+    )
+    assert client.get("/api/v1/chat/conversations/", {"limit": "0"}).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["2024-01-01T00:00:00Z", 1],
+        [None, ["5b6b8a6e-1f3e-4a7a-9d2c-3f1e2d4c5b6a"]],
+        ["not-a-date", "5b6b8a6e-1f3e-4a7a-9d2c-3f1e2d4c5b6a"],
+        [20240101, "5b6b8a6e-1f3e-4a7a-9d2c-3f1e2d4c5b6a"],
+    ],
+)
+def test_inbox_crafted_cursor_returns_400(client, values):
+    response = client.get(
+        "/api/v1/chat/conversations/", {"cursor": encode_cursor(*values)}
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"cursor": ["Invalid cursor."]}
@@ -0,0 +1,104 @@
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.chat.models import Message
+from apps.chat.pagination import encode_cursor
+from apps.chat.tests._factories import make_direct_conversation, make_nyu_user
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def conv_client():
+    a = make_nyu_user(email="page-a@nyu.edu")
+    b = make_nyu_user(email="page-b@nyu.edu")
+    conv = make_direct_conversation(a, b)
+    client = APIClient()
+    client.force_authenticate(user=a)
+    return conv, a, client
+
+
+def _url(conv):
+    return f"/api/v1/chat/conversations/{conv.id}/messages/"
+
+
+def _bulk_messages(conv, sender, count, created_at=None):
+    msgs = Message.objects.bulk_create(
+        [Message(conversation=conv, sender=sender, text=f"m{i}") for i in range(count)]
+    )
+    if created_at is not None:
+        # Force identical timestamps to exercise the id tiebreaker
+        Message.objects.filter(conversation=conv).update(created_at=created_at)
+    return msgs
+
+
+def test_walks_older_pages_without_skips_on_shared_timestamps(conv_client):
+    conv, a, client = conv_client
+    _bulk_messages(conv, a, 7, created_at=timezone.now())
+
+    seen = []
+    params = {"limit": 3}
+    while True:
+        body = client.get(_url(conv), params).json()
+        seen.extend(m["id"] for m in body["results"])
+        if not body["next"]:
+            break
+        params = {"limit": 3, "cursor": body["next"]}
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+def test_prev_cursor_returns_newer_messages(conv_client):
+    conv, a, client = conv_client
+    _bulk_messages(conv, a, 3)
+
+    first = client.get(_url(conv)).json()
+    assert first["next"] is None
+    newest_ids = [m["id"] for m in first["results"]]
+
+    # Nothing newer yet: polling hands back a usable cursor
+    empty = client.get(_url(conv), {"cursor": first["prev"]}).json()
+    assert empty["results"] == []
+    assert empty["prev"] == first["prev"]
+
+    new = conv.post_message(a, "fresh")
+    newer = client.get(_url(conv), {"cursor": empty["prev"]}).json()
+    assert [m["id"] for m in newer["results"]] == [str(new.id)]
+    # Paging back from the newer page reaches the earlier messages
+    older = client.get(_url(conv), {"cursor": newer["next"]}).json()
+    assert [m["id"] for m in older["results"]] == newest_ids
+
+
+def test_limit_is_capped(conv_client):
+    conv, a, client = conv_client
+    _bulk_messages(conv, a, 105)
+
+    body = client.get(_url(conv), {"limit": 1000}).json()
+    assert len(body["results"]) == 100
+    assert body["next"]
+
+
+def test_invalid_cursor_and_limit_return_400(conv_client):
+    conv, _, client = conv_client
+    assert client.get(_url(conv), {"cursor": "garbage"}).status_code == 400
+    assert client.get(_url(conv), {"limit": "abc"}).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["older", "2024-01-01T00:00:00Z", 1],
+        ["older", 20240101, "5b6b8a6e-1f3e-4a7a-9d2c-3f1e2d4c5b6a"],
+        ["older", "yesterday", "5b6b8a6e-1f3e-4a7a-9d2c-3f1e2d4c5b6a"],
+        ["sideways", "2024-01-01T00:00:00Z", "5b6b8a6e-1f3e-4a7a-9d2c-3f1e2d4c5b6a"],
+    ],
+)
+def test_crafted_cursor_returns_400(conv_client, values):
+    conv, _, client = conv_client
+
+    response = client.get(_url(conv), {"cursor": encode_cursor(*values)})
+
+    assert response.status_code == 400
+    assert response.json() == {"cursor": ["Invalid cursor."]}
@@ -23,7 +23,9 @@ METHOD  AUTH  API Endpoints                            Function
               list user's chats
               Fields: id, type(DIRECT), last_message_at,
                       last_message{id, text, sender, created_at},
-                      unread_count
+                      unread_count, other_participant{id, email, netid}
+              Query: limit, cursor (optional; either one switches the
+                     response to {results, next} keyset pages)
 
 3. GET    Y*  /api/v1/chat/conversations/<id>/
               retrieve a chat
@@ -33,8 +35,9 @@ METHOD  AUTH  API Endpoints                            Function
 4. GET    Y*  /api/v1/chat/conversations/<id>/messages
               list chat messages (paged)
               Fields: id, conversation, sender, text, created_at
-              Query: limit, before, after
-              Returns: next_before
+              Query: cursor, limit (max 100), before/after (legacy)
+              Returns: next (older page cursor), prev (newer page
+                       cursor), next_before (legacy)
 
 5. POST   Y*  /api/v1/chat/conversations/<id>/send
               send a message (REST optional)
@@ -1,10 +1,17 @@
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.utils import timezone
+from django.db.models import F, OuterRef, Prefetch, Q, Subquery, UUIDField
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from utils.pagination import parse_limit
 from .models import Conversation, ConversationParticipant, Message
+from .pagination import decode_cursor, encode_cursor
 from .permissions import IsConversationMember
 from .serializers import (
     ConversationDetailSerializer,
@@ -16,6 +23,30 @@ from .serializers import (
 
 User = get_user_model()
 
+INBOX_PAGE_SIZE = 20
+INBOX_MAX_PAGE_SIZE = 50
+MESSAGES_PAGE_SIZE = 50
+MESSAGES_MAX_PAGE_SIZE = 100
+
+
+def _message_cursor(direction, message):
+    return encode_cursor(direction, message.created_at.isoformat(), str(message.id))
+
+
+def _parse_message_cursor(cursor):
+    """Decode a messages cursor into (direction, created_at, message_id)"""
+    direction, created_at, msg_id = decode_cursor(cursor, 3)
+    if not all(isinstance(value, str) for value in (created_at, msg_id)):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+    try:
+        created_at = parse_datetime(created_at)
+        msg_id = uuid.UUID(msg_id)
+    except ValueError:
+        created_at = None
+    if direction not in ("older", "newer") or created_at is None:
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+    return direction, created_at, msg_id
+
 
 class ConversationViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -87,24 +118,84 @@ class ConversationViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=True, methods=["get"], url_path="messages")
     def messages(self, request, pk=None):
+        """
+        Newest-first page of messages keyed on (created_at, id), so messages
+        sharing a timestamp are never skipped or repeated.
+
+        Query:
+          - cursor: a `next` (older) or `prev` (newer) value from a previous
+            response. `prev` is also returned for the newest page so clients
+            can poll for new messages.
+          - limit: page size, capped at MESSAGES_MAX_PAGE_SIZE.
+          - before / after: legacy timestamp paging, still honoured.
+        """
         conv = self.get_object()
-        qs = Message.objects.filter(conversation=conv).order_by("-created_at")
+        params = request.query_params
+        limit = parse_limit(
+            params.get("limit"), MESSAGES_PAGE_SIZE, MESSAGES_MAX_PAGE_SIZE
+        )
+        qs = Message.objects.filter(conversation=conv)
+
+        cursor = params.get("cursor")
+        after = params.get("after")
+        if after and not cursor:
+            # Legacy: oldest-first messages newer than `after`
+            page = list(qs.filter(created_at__gt=after).order_by("created_at")[:limit])
+            return Response(
+                {
+                    "results": MessageSerializer(page, many=True).data,
+                    "next_before": page[-1].created_at.isoformat() if page else None,
+                    "next": None,
+                    "prev": None,
+                }
+            )
+
+        direction = "older"
+        anchor = None
+        if cursor:
+            direction, *anchor = _parse_message_cursor(cursor)
+            created_at, msg_id = anchor
+            if direction == "older":
+                qs = qs.filter(
+                    Q(created_at__lt=created_at)
+                    | Q(created_at=created_at, id__lt=msg_id)
+                )
+            else:
+                qs = qs.filter(
+                    Q(created_at__gt=created_at)
+                    | Q(created_at=created_at, id__gt=msg_id)
+                )
+        elif params.get("before"):
+            qs = qs.filter(created_at__lt=params["before"])
 
-        before = request.query_params.get("before")
-        after = request.query_params.get("after")
-        limit = int(request.query_params.get("limit", 50))
+        if direction == "older":
+            rows = list(qs.order_by("-created_at", "-id")[: limit + 1])
+        else:
+            rows = list(qs.order_by("created_at", "id")[: limit + 1])
+        has_more = len(rows) > limit
+        page = rows[:limit]
+        if direction == "newer":
+            page.reverse()
 
-        if before:
-            qs = qs.filter(created_at__lt=before)
-        if after:
-            qs = Message.objects.filter(
-                conversation=conv, created_at__gt=after
-            ).order_by("created_at")
+        next_cursor = prev_cursor = None
+        if page:
+            # Older messages remain if we hit the limit going back, or always
+            # when paging forward (the anchor itself is older)
+            if has_more or direction == "newer":
+                next_cursor = _message_cursor("older", page[-1])
+            prev_cursor = _message_cursor("newer", page[0])
+        elif anchor:
+            # Nothing newer yet: hand the same position back for polling
+            prev_cursor = encode_cursor("newer", anchor[0].isoformat(), str(anchor[1]))
 
-        page = list(qs[:limit])
-        data = MessageSerializer(page, many=True).data
-        next_before = page[-1].created_at.isoformat() if page else None
-        return Response({"results": data, "next_before": next_before})
+        return Response(
+            {
+                "results": MessageSerializer(page, many=True).data,
+                "next": next_cursor,
+                "prev": prev_cursor,
+                "next_before": page[-1].created_at.isoformat() if page else None,
+            }
+        )
 
     @action(detail=True, methods=["post"], url_path="send")
     def send(self, request, pk=None):
@@ -112,12 +203,7 @@ class ConversationViewSet(viewsets.ReadOnlyModelViewSet):
         ser = MessageCreateSerializer(data=request.data, context={"request": request})
         ser.is_valid(raise_exception=True)
 
-        m = Message.objects.create(
-            conversation=conv,
-            sender=request.user,
-            text=ser.validated_data["text"].strip(),
-        )
-        Conversation.objects.filter(pk=conv.pk).update(last_message_at=m.created_at)
+        m = conv.post_message(request.user, ser.validated_data["text"].strip())
         return Response(MessageSerializer(m).data, status=201)
 
     @action(detail=True, methods=["post"], url_path="read")
@@ -130,63 +216,97 @@ class ConversationViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({"detail": "Invalid message_id"}, status=400)
 
         part = ConversationParticipant.objects.get(conversation=conv, user=request.user)
-        if (not part.last_read_message) or (
-            part.last_read_message.created_at < msg.created_at
-        ):
-            part.last_read_message = msg
-            part.last_read_at = timezone.now()
-            part.save(update_fields=["last_read_message", "last_read_at"])
+        part.mark_read(msg)
 
         return Response(
             {"ok": True, "last_read_message": str(part.last_read_message_id)}
         )
 
-    def list(self, request, *args, **kwargs):
-        user = request.user
-        convs = self.get_queryset()
-
-        ids = [c.id for c in convs]
-        last_msg_map = {}
-        for m in Message.objects.filter(conversation_id__in=ids).order_by(
-            "conversation_id", "-created_at"
-        ):
-            if m.conversation_id not in last_msg_map:
-                last_msg_map[m.conversation_id] = m
-
-        parts = {
-            p.conversation_id: p
-            for p in ConversationParticipant.objects.filter(
-                conversation_id__in=ids, user=user
+    def _inbox_queryset(self, user):
+        """
+        Conversations of `user` annotated with everything the inbox needs.
+        Last message and unread count are read from the user's materialized
+        ConversationParticipant row (unique-index lookups, O(1) per row) and
+        the peer is prefetched, so a page costs two queries regardless of
+        its size or the length of the conversations.
+        """
+        my_part = ConversationParticipant.objects.filter(
+            conversation=OuterRef("pk"), user=user
+        )
+        return (
+            Conversation.objects.filter(participants__user=user)
+            .annotate(
+                unread_count=Coalesce(Subquery(my_part.values("unread_count")[:1]), 0),
+                last_msg_id=Subquery(
+                    my_part.values("last_message_id")[:1], output_field=UUIDField()
+                ),
+                last_msg_text=Subquery(my_part.values("last_message__text")[:1]),
+                last_msg_sender_id=Subquery(
+                    my_part.values("last_message__sender_id")[:1]
+                ),
+                last_msg_created_at=Subquery(
+                    my_part.values("last_message__created_at")[:1]
+                ),
             )
-        }
-
-        payload = []
-        for c in convs:
-            lm = last_msg_map.get(c.id)
-            part = parts.get(c.id)
-            unread = 0
-            if lm and part:
-                if part.last_read_message_id is None:
-                    unread = Message.objects.filter(conversation=c).count()
-                else:
-                    unread = Message.objects.filter(
-                        conversation=c,
-                        created_at__gt=part.last_read_message.created_at,
-                    ).count()
-
-            serializer = ConversationListSerializer(c, context={"request": request})
-            item = serializer.data
-            item["last_message"] = (
-                None
-                if not lm
-                else {
-                    "id": str(lm.id),
-                    "text": lm.text,
-                    "sender": lm.sender_id,
-                    "created_at": lm.created_at,
-                }
+            .prefetch_related(
+                Prefetch(
+                    "participants",
+                    queryset=ConversationParticipant.objects.exclude(
+                        user=user
+                    ).select_related("user"),
+                    to_attr="other_participants",
+                )
             )
-            item["unread_count"] = unread
-            payload.append(item)
+            .order_by(F("last_message_at").desc(nulls_last=True), "-id")
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        GET /chat/conversations/
+        Returns a bare list of conversations (newest activity first). Passing
+        `limit` and/or `cursor` switches to keyset pagination over
+        (last_message_at, id): {"results": [...], "next": <cursor|null>}.
+        """
+        qs = self._inbox_queryset(request.user)
+        params = request.query_params
+        if "limit" not in params and "cursor" not in params:
+            data = ConversationListSerializer(
+                qs, many=True, context={"request": request}
+            ).data
+            return Response(data)
 
-        return Response(payload)
+        limit = parse_limit(params.get("limit"), INBOX_PAGE_SIZE, INBOX_MAX_PAGE_SIZE)
+        cursor = params.get("cursor")
+        if cursor:
+            raw_at, raw_id = decode_cursor(cursor, 2)
+            try:
+                last_id = uuid.UUID(raw_id) if isinstance(raw_id, str) else None
+                last_at = parse_datetime(raw_at) if isinstance(raw_at, str) else None
+            except ValueError:
+                last_id = None
+            # last_at is null only for conversations without messages
+            if last_id is None or (raw_at is not None and last_at is None):
+                raise ValidationError({"cursor": ["Invalid cursor."]})
+            if last_at is None:
+                qs = qs.filter(last_message_at__isnull=True, id__lt=last_id)
+            else:
+                qs = qs.filter(
+                    Q(last_message_at__lt=last_at)
+                    | Q(last_message_at=last_at, id__lt=last_id)
+                    | Q(last_message_at__isnull=True)
+                )
+
+        page = list(qs[: limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        next_cursor = None
+        if has_more:
+            tail = page[-1]
+            next_cursor = encode_cursor(
+                tail.last_message_at.isoformat() if tail.last_message_at else None,
+                str(tail.id),
+            )
+        data = ConversationListSerializer(
+            page, many=True, context={"request": request}
+        ).data
+        return Response({"results": data, "next": next_cursor})
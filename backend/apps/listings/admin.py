@@ -1 +1,24 @@
-# Register your models here.
+from django.contrib import admin
+
+from .models import Dorm, ImageProcessingJob, S3DeletionJob
+
+
+@admin.register(ImageProcessingJob)
+class ImageProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ("job_id", "image", "status", "attempts", "run_after")
+    list_filter = ("status",)
+    raw_id_fields = ("image",)
+
+
+@admin.register(S3DeletionJob)
+class S3DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ("job_id", "image_url", "status", "attempts", "run_after")
+    list_filter = ("status",)
+    search_fields = ("image_url",)
+
+
+@admin.register(Dorm)
+class DormAdmin(admin.ModelAdmin):
+    list_display = ("name", "area", "is_default")
+    list_filter = ("area", "is_default")
+    search_fields = ("name",)
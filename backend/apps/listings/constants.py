@@ -55,3 +55,10 @@ DEFAULT_DORM_LOCATIONS_GROUPED = {
 
 # Flattened list of all default dorm locations (for convenience)
 DEFAULT_DORM_LOCATIONS_FLAT = WASHINGTON_SQUARE_DORMS + DOWNTOWN_DORMS + OTHER
+
+# Area of each default dorm location (Dorm.area / Listing.area)
+DORM_AREAS = {
+    name: area
+    for area, names in DEFAULT_DORM_LOCATIONS_GROUPED.items()
+    for name in names
+}
@@ -0,0 +1,196 @@
+"""
+Caches of the public listing feed (GET /api/v1/listings/ and
+/listings/search/) and their invalidation.
+
+Entries are keyed by a canonical form of the request's filter parameters
+(canonical_params) and by a feed generation that the Listing signal
+receivers replace whenever a listing is created, saved or deleted (see
+signals.py), so a cached value never outlives the data it was computed
+from by more than its timeout.
+
+Anonymous GET /listings/ pages (lookup_browse_response) are cached for
+RESPONSE_TIMEOUT, keyed on the filter, ordering and paging parameters:
+the results plus the paginator's page state (count, page number or next
+cursor), from which each hit rebuilds next/previous for its own host and
+query string. Hits and misses are counted (browse_cache_stats, shown by
+`manage.py browse_cache_stats`).
+
+Page counts (cached_count) are kept for COUNT_TIMEOUT. A count above
+ESTIMATE_THRESHOLD is also kept outside the generation for
+ESTIMATE_TIMEOUT and served as an estimate (count_is_estimate) until then:
+on a large result set a few listings more or less do not change the
+pager, and one write no longer re-runs that COUNT(*) for every filter
+combination being browsed.
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY = "listings:feed-generation"
+RESPONSE_KEY = "listings:browse:{}:{}"
+STATS_KEY = "listings:browse-stats:{}"
+COUNT_KEY = "listings:count:{}:{}"
+ESTIMATE_KEY = "listings:count-estimate:{}"
+RESPONSE_TIMEOUT = 60
+COUNT_TIMEOUT = 60
+ESTIMATE_TIMEOUT = 5 * 60
+ESTIMATE_THRESHOLD = 5000
+
+# The parameters ListingFilter, ListingSearchFilter and the search action
+# read; anything else (tracking parameters, typos) cannot change the result
+FILTER_PARAMS = (
+    "min_price",
+    "max_price",
+    "location",
+    "category",
+    "posted_within",
+    "categories",
+    "locations",
+    "area",
+    "search",
+    "q",
+)
+# ...plus what selects the page of a browse response
+BROWSE_PARAMS = FILTER_PARAMS + (
+    "ordering",
+    "page",
+    "page_size",
+    "pagination",
+    "cursor",
+)
+# Comma-separated OR filters that also accept repeated parameters
+MULTI_VALUE_PARAMS = ("categories", "locations", "area")
+
+
+def canonical_params(query_params, names=FILTER_PARAMS):
+    """
+    The given query parameters as a sorted list of (name, value) pairs.
+
+    Single-value parameters keep the value the filters read (the last
+    one). Multi-value parameters merge their repeated and comma-separated
+    forms into one sorted, de-duplicated list, so
+    ?categories=Books,Furniture, ?categories=Furniture&categories=Books and
+    ?categories=Books,Furniture,Books are the same request.
+    """
+    canonical = []
+    for name in sorted(set(names) & set(query_params)):
+        if name in MULTI_VALUE_PARAMS:
+            values = {
+                value.strip()
+                for param in query_params.getlist(name)
+                for value in param.split(",")
+                if value.strip()
+            }
+            if values:
+                canonical.append((name, ",".join(sorted(values))))
+        else:
+            value = query_params.get(name)
+            if value not in (None, ""):
+                canonical.append((name, value))
+    return canonical
+
+
+def request_signature(request, names=FILTER_PARAMS):
+    """Digest of the request path and canonical parameters"""
+    payload = json.dumps([request.path, canonical_params(request.query_params, names)])
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def feed_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate_feed():
+    """
+    Start a new feed generation now and again once the current transaction
+    commits, so values computed before the commit are not reused.
+    """
+    cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+    transaction.on_commit(
+        lambda: cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+    )
+
+
+def cached_count(queryset, signature, exact=False):
+    """
+    Number of rows in queryset, cached under its request signature.
+    exact=True skips the estimate (counting afresh unless this generation
+    already did).
+
+    Returns:
+        tuple: (count, is_estimate). is_estimate is True when the count
+        was cached in an earlier generation, i.e. listings may have
+        changed since it was taken.
+    """
+    key = COUNT_KEY.format(feed_generation(), signature)
+    count = cache.get(key)
+    if count is not None:
+        return count, False
+    estimate = None if exact else cache.get(ESTIMATE_KEY.format(signature))
+    if estimate is not None:
+        return estimate, True
+
+    count = queryset.count()
+    cache.set(key, count, COUNT_TIMEOUT)
+    if count > ESTIMATE_THRESHOLD:
+        cache.set(ESTIMATE_KEY.format(signature), count, ESTIMATE_TIMEOUT)
+    return count, False
+
+
+def lookup_browse_response(request):
+    """
+    The cached page of an anonymous browse request.
+
+    Returns:
+        tuple: (key, data). data is None on a miss, else {"results",
+        "page"}, "page" being the ListingPagination.page_state() to
+        restore; store a page under key with store_browse_response(). The
+        key is taken before
+        the caller reads the database, so a listing change during the read
+        leaves the stored data under a generation nobody reads.
+    """
+    key = RESPONSE_KEY.format(
+        feed_generation(), request_signature(request, BROWSE_PARAMS)
+    )
+    data = cache.get(key)
+    _record("misses" if data is None else "hits")
+    return key, data
+
+
+def store_browse_response(key, results, page_state):
+    # Plain containers: serializer.data keeps a reference to its serializer
+    data = {"results": [dict(row) for row in results], "page": page_state}
+    cache.set(key, data, RESPONSE_TIMEOUT)
+
+
+def _record(outcome):
+    key = STATS_KEY.format(outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def browse_cache_stats():
+    """Hits, misses and hit rate of the browse response cache"""
+    hits = cache.get(STATS_KEY.format("hits"), 0)
+    misses = cache.get(STATS_KEY.format("misses"), 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else None,
+    }
+
+
+def reset_browse_cache_stats():
+    cache.delete_many([STATS_KEY.format("hits"), STATS_KEY.format("misses")])
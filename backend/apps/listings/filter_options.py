@@ -0,0 +1,105 @@
+"""
+Cached payload for GET /api/v1/listings/filter-options/.
+
+Building the payload takes two DISTINCT scans over active listings, but the
+result only changes when an active listing's category, dorm_location or
+status changes. The computed payload is therefore cached together with its
+ETag and Last-Modified values. apps.listings.signals drops the entry on
+those changes, and CACHE_TIMEOUT is only a safety net for writes that skip
+model signals (queryset.update(), raw SQL).
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .constants import (
+    DEFAULT_CATEGORIES,
+    DEFAULT_DORM_LOCATIONS_FLAT,
+    DOWNTOWN_DORMS,
+    OTHER,
+    WASHINGTON_SQUARE_DORMS,
+)
+from .models import Listing
+
+CACHE_KEY = "listings:filter-options:v1"
+CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+
+def build_filter_options():
+    """Compute the filter-options payload from active listings and defaults"""
+    active = Listing.objects.filter(status="active")
+
+    # Get distinct categories from active listings (non-empty)
+    available_categories = set(
+        active.exclude(Q(category__isnull=True) | Q(category=""))
+        .values_list("category", flat=True)
+        .distinct()
+    )
+
+    # Merge with defaults and sort
+    all_categories = sorted(set(DEFAULT_CATEGORIES) | available_categories)
+
+    # Get distinct dorm locations from active listings (non-empty, non-null)
+    available_locations = set(
+        active.exclude(Q(dorm_location__isnull=True) | Q(dorm_location=""))
+        .values_list("dorm_location", flat=True)
+        .distinct()
+    )
+
+    # Merge with defaults
+    all_dorm_locations = set(DEFAULT_DORM_LOCATIONS_FLAT) | available_locations
+
+    # Group dorm locations by area; anything not in a known area is "other"
+    grouped_dorm_locations = {
+        "washington_square": sorted(WASHINGTON_SQUARE_DORMS),
+        "downtown": sorted(DOWNTOWN_DORMS),
+        "other": sorted(
+            set(OTHER)
+            | (all_dorm_locations - set(WASHINGTON_SQUARE_DORMS) - set(DOWNTOWN_DORMS))
+        ),
+    }
+
+    return {
+        "categories": all_categories,
+        "dorm_locations": grouped_dorm_locations,
+        # Flat list for backward compatibility (sorted)
+        "locations": sorted(all_dorm_locations),
+    }
+
+
+def get_filter_options():
+    """
+    Return the cached entry, computing and storing it on a miss.
+
+    Returns:
+        dict with "payload", "etag" (quoted strong validator) and
+        "last_modified" (epoch seconds when the payload was computed).
+    """
+    entry = cache.get(CACHE_KEY)
+    if entry is not None:
+        return entry
+
+    payload = build_filter_options()
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    entry = {
+        "payload": payload,
+        "etag": '"%s"' % hashlib.md5(body.encode()).hexdigest(),
+        "last_modified": int(time.time()),
+    }
+    cache.set(CACHE_KEY, entry, CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_filter_options():
+    """
+    Drop the cached payload now and again once the current transaction
+    commits, so a request that read pre-commit rows in between cannot leave
+    a stale entry behind.
+    """
+    cache.delete(CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
@@ -5,9 +5,12 @@ import django_filters
 from django.db.models import Q
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
+from rest_framework.filters import SearchFilter
 
-from .constants import DEFAULT_DORM_LOCATIONS_FLAT
-from .models import Listing
+from .constants import DEFAULT_DORM_LOCATIONS_GROUPED
+from .models import Dorm, Listing
+from .pagination import is_keyset_request
+from .search import search_listings
 
 
 class ListingFilter(django_filters.FilterSet):
@@ -16,15 +19,14 @@ class ListingFilter(django_filters.FilterSet):
     # method-based filters
     min_price = django_filters.NumberFilter(method="filter_min_price")
     max_price = django_filters.NumberFilter(method="filter_max_price")
-    location = django_filters.CharFilter(
-        field_name="dorm_location", lookup_expr="icontains"
-    )
+    location = django_filters.CharFilter(method="filter_location")
     category = django_filters.CharFilter(field_name="category", lookup_expr="iexact")
     posted_within = django_filters.NumberFilter(method="filter_posted_within")
 
     # Multiple selection filters (comma-separated OR logic)
     categories = django_filters.CharFilter(method="filter_categories")
     locations = django_filters.CharFilter(method="filter_locations")
+    area = django_filters.CharFilter(method="filter_areas")
 
     class Meta:
         model = Listing
@@ -36,6 +38,7 @@ class ListingFilter(django_filters.FilterSet):
             "posted_within",
             "categories",
             "locations",
+            "area",
         ]
 
     def filter_min_price(self, queryset, name, value):
@@ -92,6 +95,19 @@ class ListingFilter(django_filters.FilterSet):
         since = timezone.now() - timedelta(days=days)
         return queryset.filter(created_at__gte=since)
 
+    def _multi_values(self, name, value):
+        """
+        Values of a comma-separated filter merged with its repeated query
+        params (name=a,b&name=c), stripped and de-duplicated in order.
+        """
+        values = [v.strip() for v in value.split(",") if v.strip()]
+        # Only works if self.data is a QueryDict (from request), not a dict (from tests)
+        if hasattr(self, "data") and hasattr(self.data, "getlist"):
+            for param in self.data.getlist(name):
+                if param:
+                    values.extend(v.strip() for v in param.split(",") if v.strip())
+        return list(dict.fromkeys(values))
+
     def filter_categories(self, queryset, name, value):
         """
         Filter by multiple categories (OR logic).
@@ -102,24 +118,7 @@ class ListingFilter(django_filters.FilterSet):
         if not value:
             return queryset
 
-        # Parse comma-separated values from the value parameter
-        category_list = [cat.strip() for cat in value.split(",") if cat.strip()]
-
-        # Also check for multiple query params (Django's getlist)
-        # Only works if self.data is a QueryDict (from request), not a dict (from tests)
-        if hasattr(self, "data") and hasattr(self.data, "getlist"):
-            multi_cats = self.data.getlist("categories")
-            if multi_cats:
-                # Merge: split each element if it contains commas, then combine
-                for cat_param in multi_cats:
-                    if cat_param:
-                        split_cats = [
-                            c.strip() for c in cat_param.split(",") if c.strip()
-                        ]
-                        category_list.extend(split_cats)
-                # Remove duplicates while preserving order
-                category_list = list(dict.fromkeys(category_list))
-
+        category_list = self._multi_values("categories", value)
         if not category_list:
             return queryset
 
@@ -130,6 +129,15 @@ class ListingFilter(django_filters.FilterSet):
 
         return queryset.filter(q_objects)
 
+    def filter_location(self, queryset, name, value):
+        """
+        Partial, case-insensitive location match. The match runs against the
+        dorms table; listings are then read through the dorm foreign key.
+        """
+        if not value:
+            return queryset
+        return queryset.filter(dorm__in=Dorm.objects.filter(name__icontains=value))
+
     def filter_locations(self, queryset, name, value):
         """
         Filter by multiple locations (OR logic).
@@ -142,60 +150,63 @@ class ListingFilter(django_filters.FilterSet):
         - Matches listings with dorm_location = "Off-Campus" (exact match)
         - Matches listings without location set (null or empty)
         - Also matches legacy listings with locations not in default dorm list
+
+        Terms are matched against the small dorms table, so listings are
+        selected with an IN on the indexed dorm foreign key (plus IS NULL
+        for Off-Campus) instead of LIKE scans of dorm_location.
         """
         if not value:
             return queryset
 
-        # Parse comma-separated values from the value parameter
-        location_list = [loc.strip() for loc in value.split(",") if loc.strip()]
-
-        # Also check for multiple query params
-        # Only works if self.data is a QueryDict (from request), not a dict (from tests)
-        if hasattr(self, "data") and hasattr(self.data, "getlist"):
-            multi_locs = self.data.getlist("locations")
-            if multi_locs:
-                # Merge: split each element if it contains commas, then combine
-                for loc_param in multi_locs:
-                    if loc_param:
-                        split_locs = [
-                            loc.strip() for loc in loc_param.split(",") if loc.strip()
-                        ]
-                        location_list.extend(split_locs)
-                # Remove duplicates while preserving order
-                location_list = list(dict.fromkeys(location_list))
-
+        location_list = self._multi_values("locations", value)
         if not location_list:
             return queryset
 
-        # Build OR query with Q objects (partial matching)
-        q_objects = Q()
-
-        # Pre-compute tuple for "Off-Campus" optimization (only if needed)
-        # Convert to tuple once for better query optimization
-        has_off_campus = "Off-Campus" in location_list
-        default_locations_tuple = (
-            tuple(DEFAULT_DORM_LOCATIONS_FLAT) if has_off_campus else None
-        )
-
+        dorms = Q()
         for loc in location_list:
             if loc == "Off-Campus":
-                # Match exact "Off-Campus", legacy locations not in default list,
-                # or listings without location set (null/empty)
-                # Legacy locations are those with dorm_location not in
-                # DEFAULT_DORM_LOCATIONS_FLAT
-                # Optimized: use __gt="" for non-empty check (more index-friendly)
-                # and use tuple for better query optimization
-                q_objects |= (
-                    Q(dorm_location__iexact="Off-Campus")
-                    | Q(dorm_location__isnull=True)
-                    | Q(dorm_location="")
-                    | (
-                        Q(dorm_location__isnull=False, dorm_location__gt="")
-                        & ~Q(dorm_location__in=default_locations_tuple)
-                    )
-                )
+                # "Off-Campus" itself and legacy locations outside the
+                # default list (Dorm.is_default)
+                dorms |= Q(name__iexact="Off-Campus") | Q(is_default=False)
             else:
                 # Regular partial matching for other locations
-                q_objects |= Q(dorm_location__icontains=loc)
+                dorms |= Q(name__icontains=loc)
 
+        q_objects = Q(dorm__in=Dorm.objects.filter(dorms))
+        if "Off-Campus" in location_list:
+            # Listings without location set (null/empty)
+            q_objects |= Q(dorm__isnull=True)
         return queryset.filter(q_objects)
+
+    def filter_areas(self, queryset, name, value):
+        """
+        Filter by dorm area (OR logic), e.g. area=washington_square,downtown.
+        Accepts the same comma-separated and repeated forms as locations.
+        """
+        if not value:
+            return queryset
+
+        areas = self._multi_values("area", value)
+        if not areas:
+            return queryset
+        invalid = set(areas) - set(DEFAULT_DORM_LOCATIONS_GROUPED)
+        if invalid:
+            choices = ", ".join(DEFAULT_DORM_LOCATIONS_GROUPED)
+            raise ValidationError({"area": [f"Must be one of {choices}."]})
+        return queryset.filter(area__in=areas)
+
+
+class ListingSearchFilter(SearchFilter):
+    """
+    ?search= on the list endpoint, served by the full-text search backend
+    instead of SearchFilter's per-field icontains. Results are ranked by
+    relevance unless the client asked for an explicit ?ordering= or cursor
+    pagination.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        rank = not request.query_params.get("ordering") and not is_keyset_request(
+            request
+        )
+        return search_listings(queryset, query, rank=rank)
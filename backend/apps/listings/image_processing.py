@@ -0,0 +1,290 @@
+"""
+Image variants for listing photos, rendered off the request path.
+
+Uploads store only the original (up to 10MB). For each new ListingImage a
+job is queued that downloads the original, renders resized copies with
+Pillow and records their URLs on the image:
+
+- thumbnail: fits 400x400, served on browse cards (200px at 2x)
+- medium:    fits 1200x1200, for detail views
+
+Variants are WebP (JPEG if Pillow was built without WebP). EXIF orientation
+is applied to the pixels first, then all metadata (EXIF/GPS, XMP) is
+dropped because it is not passed to save().
+
+Deleting images is queued the same way (delete_images_later): requests
+only record which S3 objects to remove, and the files are deleted in
+DeleteObjects batches of up to 1000 keys after the transaction commits.
+Failed deletes are retried with backoff and end up as "failed"
+S3DeletionJob rows (dead letters) after MAX_ATTEMPTS.
+
+Queues (settings.IMAGE_QUEUE_BACKEND):
+- "database" (default): ImageProcessingJob / S3DeletionJob rows, drained
+  by `python manage.py process_image_jobs`; no external broker needed
+- "inline": process after the request's transaction commits, in-process
+  (for local development without a worker); failed deletes are still
+  recorded for the worker to retry
+"""
+
+import io
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from utils.s3_service import DELETE_BATCH_SIZE, s3_service
+
+from .models import ImageProcessingJob, Listing, ListingImage, S3DeletionJob
+
+logger = logging.getLogger(__name__)
+
+# variant name -> longest side in pixels
+VARIANT_SIZES = {"thumbnail": 400, "medium": 1200}
+
+VARIANT_QUALITY = 80
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = timedelta(seconds=30)
+# A "running" job whose worker died is picked up again after this long
+STALE_AFTER = timedelta(minutes=10)
+
+
+def variant_format():
+    """(Pillow format, file extension, content type) used for variants"""
+    if features.check("webp"):
+        return "WEBP", "webp", "image/webp"
+    return "JPEG", "jpg", "image/jpeg"
+
+
+def render_variant(data, max_size):
+    """Return the encoded bytes of `data` resized to fit max_size x max_size"""
+    fmt, _, _ = variant_format()
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        if fmt == "WEBP" and has_alpha:
+            image = image.convert("RGBA")
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        out = io.BytesIO()
+        options = {"quality": VARIANT_QUALITY}
+        if fmt == "JPEG":
+            options.update(optimize=True, progressive=True)
+        # No exif=/icc_profile=/xmp= arguments: the variant carries no metadata
+        image.save(out, fmt, **options)
+    return out.getvalue()
+
+
+def process_image(image):
+    """
+    Render and store every variant of one ListingImage, then record the
+    URLs and refresh the listing's denormalized thumbnail.
+
+    Returns:
+        bool: False if the image was deleted while it was being processed.
+    """
+    data = s3_service.download_image(image.image_url)
+    _, extension, content_type = variant_format()
+
+    urls = {}
+    for name, size in VARIANT_SIZES.items():
+        key = s3_service.variant_key(image.image_url, name, extension)
+        urls[f"{name}_url"] = s3_service.upload_bytes(
+            render_variant(data, size), key, content_type
+        )
+
+    if not ListingImage.objects.filter(pk=image.pk).update(**urls):
+        return False
+    Listing(pk=image.listing_id).refresh_image_summary()
+    return True
+
+
+class DatabaseImageQueue:
+    """Queue backed by the image_processing_jobs table"""
+
+    def enqueue(self, images):
+        """Queue processing for ListingImage rows (duplicates are ignored)"""
+        ImageProcessingJob.objects.bulk_create(
+            [ImageProcessingJob(image_id=image.pk) for image in images],
+            ignore_conflicts=True,
+        )
+
+    def _claimable(self, now):
+        return Q(status="pending", run_after__lte=now) | Q(
+            status="running", locked_at__lt=now - STALE_AFTER
+        )
+
+    def claim(self, limit):
+        """
+        Atomically mark up to `limit` due jobs as running and return them.
+        Each row is claimed with a conditional UPDATE, so concurrent workers
+        never process the same job.
+        """
+        now = timezone.now()
+        candidates = list(
+            ImageProcessingJob.objects.filter(self._claimable(now)).values_list(
+                "pk", flat=True
+            )[:limit]
+        )
+        claimed = [
+            pk
+            for pk in candidates
+            if ImageProcessingJob.objects.filter(self._claimable(now), pk=pk).update(
+                status="running", locked_at=now, attempts=F("attempts") + 1
+            )
+        ]
+        return list(
+            ImageProcessingJob.objects.filter(pk__in=claimed).select_related("image")
+        )
+
+    def claim_deletions(self, limit):
+        """
+        Mark up to `limit` due deletion jobs as running and return them,
+        claiming the whole batch with one conditional UPDATE
+        """
+        now = timezone.now()
+        candidates = list(
+            S3DeletionJob.objects.filter(self._claimable(now)).values_list(
+                "pk", flat=True
+            )[:limit]
+        )
+        S3DeletionJob.objects.filter(self._claimable(now), pk__in=candidates).update(
+            status="running", locked_at=now, attempts=F("attempts") + 1
+        )
+        # Rows another worker claimed first carry its locked_at, not ours
+        return list(
+            S3DeletionJob.objects.filter(
+                pk__in=candidates, status="running", locked_at=now
+            )
+        )
+
+    def complete(self, job):
+        job.delete()
+
+    def fail(self, job, error):
+        """Schedule a retry with exponential backoff, or give up"""
+        job.last_error = str(error)[:2000]
+        job.locked_at = None
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = "failed"
+        else:
+            job.status = "pending"
+            job.run_after = timezone.now() + RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+        job.save(update_fields=["status", "last_error", "locked_at", "run_after"])
+
+    def run_once(self, batch_size=10):
+        """Process one batch; returns (processed, failed) counts"""
+        processed = failed = 0
+        for job in self.claim(batch_size):
+            try:
+                process_image(job.image)
+            except Exception as e:
+                logger.error(
+                    f"Processing image {job.image_id} failed "
+                    f"(attempt {job.attempts}): {str(e)}"
+                )
+                self.fail(job, e)
+                failed += 1
+            else:
+                self.complete(job)
+                processed += 1
+        return processed, failed
+
+    def delete_later(self, image_urls):
+        """
+        Queue S3 deletion of stored images. The rows are part of the
+        caller's transaction, so nothing is deleted if it rolls back.
+        """
+        S3DeletionJob.objects.bulk_create(
+            [S3DeletionJob(image_url=url) for url in image_urls if url]
+        )
+
+    def run_deletions(self, batch_size=DELETE_BATCH_SIZE):
+        """Delete one batch of queued images; returns (deleted, failed) counts"""
+        jobs = self.claim_deletions(batch_size)
+        if not jobs:
+            return 0, 0
+        try:
+            errors = s3_service.delete_images([job.image_url for job in jobs])
+        except Exception as e:
+            errors = {job.image_url: str(e) for job in jobs}
+
+        deleted = [job.pk for job in jobs if job.image_url not in errors]
+        S3DeletionJob.objects.filter(pk__in=deleted).delete()
+        for job in jobs:
+            if job.image_url in errors:
+                logger.error(
+                    f"Deleting {job.image_url} failed "
+                    f"(attempt {job.attempts}): {errors[job.image_url]}"
+                )
+                self.fail(job, errors[job.image_url])
+        return len(deleted), len(jobs) - len(deleted)
+
+
+class InlineImageQueue:
+    """Process right after the current transaction commits, in-process"""
+
+    def enqueue(self, images):
+        images = list(images)
+
+        def run():
+            for image in images:
+                try:
+                    process_image(image)
+                except Exception as e:
+                    logger.error(f"Processing image {image.pk} failed: {str(e)}")
+
+        transaction.on_commit(run)
+
+    def delete_later(self, image_urls):
+        """Delete after the current transaction commits, in-process"""
+        image_urls = [url for url in image_urls if url]
+        if not image_urls:
+            return
+
+        def run():
+            try:
+                errors = s3_service.delete_images(image_urls)
+            except Exception as e:
+                errors = {url: str(e) for url in image_urls}
+            # Leave failures to the worker's retries
+            S3DeletionJob.objects.bulk_create(
+                S3DeletionJob(
+                    image_url=url,
+                    attempts=1,
+                    last_error=error[:2000],
+                    run_after=timezone.now() + RETRY_BASE_DELAY,
+                )
+                for url, error in errors.items()
+            )
+
+        transaction.on_commit(run)
+
+
+QUEUE_BACKENDS = {
+    "database": DatabaseImageQueue,
+    "inline": InlineImageQueue,
+}
+
+
+def get_image_queue():
+    backend = getattr(settings, "IMAGE_QUEUE_BACKEND", "database")
+    return QUEUE_BACKENDS[backend]()
+
+
+def enqueue_unprocessed(listing):
+    """Queue every image of a listing that has no variants yet"""
+    images = ListingImage.objects.filter(listing=listing, thumbnail_url__isnull=True)
+    get_image_queue().enqueue(images)
+
+
+def delete_images_later(image_urls):
+    """Remove stored images from S3 once the current transaction commits"""
+    get_image_queue().delete_later(image_urls)
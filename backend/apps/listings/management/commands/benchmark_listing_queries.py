@@ -0,0 +1,236 @@
+import random
+import re
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.listings.constants import DEFAULT_CATEGORIES, DEFAULT_DORM_LOCATIONS_FLAT
+from apps.listings.models import Dorm, Listing
+from apps.listings.views import ListingPagination, ListingViewSet
+
+# Seeded rows are marked so --clear removes only them
+SEED_TITLE_PREFIX = "[bench] "
+SEED_BATCH_SIZE = 5000
+
+# Browse requests as the frontend sends them: (name, query params,
+# whether the ORDER BY must be served by an index). Every scenario must read
+# listings through an index; a scenario that also sorts in memory is only
+# acceptable when a range filter may be more selective than the ordering.
+SCENARIOS = [
+    ("newest", {}, True),
+    ("price ascending", {"ordering": "price"}, True),
+    ("price descending", {"ordering": "-price"}, True),
+    ("title", {"ordering": "title"}, True),
+    ("category", {"category": "Electronics"}, False),
+    ("categories", {"categories": "Books,Furniture"}, False),
+    ("posted within 7 days", {"posted_within": "7"}, True),
+    ("price range", {"min_price": "10", "max_price": "50"}, False),
+    (
+        "price range by price",
+        {"min_price": "10", "max_price": "50", "ordering": "price"},
+        True,
+    ),
+    ("category under 30", {"category": "Books", "max_price": "30"}, False),
+    ("locations", {"locations": "Othmer Hall,Clark Hall"}, False),
+    ("off-campus", {"locations": "Off-Campus"}, False),
+    ("area", {"area": "downtown"}, True),
+]
+
+# EXPLAIN format per vendor where Django's default does not suit the
+# patterns below: on MySQL 8.0.16+ it is TREE; TRADITIONAL gives one row per
+# table (id, select_type, table, [partitions,] type, ..., Extra), which
+# QuerySet.explain() joins with spaces
+EXPLAIN_FORMATS = {"mysql": "TRADITIONAL"}
+
+# EXPLAIN output patterns per vendor: a full scan of listings, and a sort
+# the ORDER BY could not avoid
+PLAN_PROBLEMS = {
+    "sqlite": {
+        "full scan": re.compile(r"\bSCAN listings\b(?! USING)"),
+        "sort": re.compile(r"USE TEMP B-TREE FOR ORDER BY"),
+    },
+    "mysql": {
+        "full scan": re.compile(r"^\S+ \S+ listings (?:\S+ )?ALL\b", re.MULTILINE),
+        "sort": re.compile(r"\bUsing filesort\b"),
+    },
+    "postgresql": {
+        "full scan": re.compile(r"Seq Scan on listings\b"),
+        "sort": re.compile(r"^\s*(->\s*)?(Incremental )?Sort\b", re.MULTILINE),
+    },
+}
+
+
+def plan_problems(vendor, plan, index_ordered):
+    """Names of the problems found in an EXPLAIN plan of a feed query"""
+    patterns = PLAN_PROBLEMS.get(vendor, {})
+    problems = []
+    if "full scan" in patterns and patterns["full scan"].search(plan):
+        problems.append("full scan")
+    if index_ordered and "sort" in patterns and patterns["sort"].search(plan):
+        problems.append("sort")
+    return problems
+
+
+def feed_queryset(params):
+    """The page query ListingViewSet.list runs for these query params"""
+    request = Request(APIRequestFactory().get("/api/v1/listings/", params))
+    view = ListingViewSet(
+        action="list", request=request, format_kwarg=None, kwargs={}, args=()
+    )
+    queryset = view.filter_queryset(view.get_queryset())
+    return queryset[: ListingPagination.page_size]
+
+
+@contextmanager
+def _explicit_created_at():
+    """Let bulk_create keep the created_at we generate (auto_now_add off)"""
+    field = Listing._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def _analyze():
+    vendor = connection.vendor
+    statement = {
+        "sqlite": "ANALYZE",
+        "mysql": "ANALYZE TABLE listings",
+        "postgresql": "ANALYZE listings",
+    }.get(vendor)
+    if statement:
+        with connection.cursor() as cursor:
+            cursor.execute(statement)
+
+
+class Command(BaseCommand):
+    """
+    Run the public feed's filter/ordering combinations through EXPLAIN and
+    time them, optionally after seeding synthetic listings.
+
+    Each scenario builds its queryset with the real ListingViewSet
+    (get_queryset + ListingFilter + ordering) and explains the page query.
+    A scenario fails when the plan scans the whole listings table, or sorts
+    in memory where an index should deliver the order (see SCENARIOS).
+
+    Run it against a scratch database, not production:
+
+        DJANGO_SETTINGS_MODULE=core.settings_local \\
+            python manage.py benchmark_listing_queries --seed 1000000
+        python manage.py benchmark_listing_queries --check -v 2   # plans too
+        python manage.py benchmark_listing_queries --clear        # drop seed
+    """
+
+    help = "EXPLAIN and time the listing feed queries (optionally seed data)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Insert this many synthetic listings first (e.g. 1000000).",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously seeded listings and exit.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timed runs per scenario (default: 5).",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with an error if any plan has a problem.",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted, _ = Listing.objects.filter(
+                title__startswith=SEED_TITLE_PREFIX
+            ).delete()
+            self.stdout.write(f"Deleted {deleted} seeded rows")
+            return
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        if options["seed"]:
+            self._seed(options["seed"])
+        _analyze()
+
+        vendor = connection.vendor
+        if vendor not in PLAN_PROBLEMS:
+            self.stderr.write(f"No plan checks for {vendor}; timing only")
+
+        failures = []
+        for name, params, index_ordered in SCENARIOS:
+            queryset = feed_queryset(params)
+            plan = queryset.explain(format=EXPLAIN_FORMATS.get(vendor))
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+
+            problems = plan_problems(vendor, plan, index_ordered)
+            verdict = ", ".join(problems) if problems else "ok"
+            self.stdout.write(
+                f"{name:<24} {statistics.median(timings):8.2f} ms  {verdict}"
+            )
+            if options["verbosity"] >= 2 or problems:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            if problems:
+                failures.append(name)
+
+        summary = f"{len(SCENARIOS)} scenarios, {len(failures)} with plan problems"
+        if failures and options["check"]:
+            raise CommandError(f"{summary}: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def _seed(self, count):
+        rng = random.Random(count)
+        now = timezone.now()
+        # bulk_create skips the signal that resolves Listing.dorm, so rows
+        # get their Dorm here; one legacy free-text location included
+        locations = DEFAULT_DORM_LOCATIONS_FLAT + ["Off-Campus", "Brooklyn, NY", None]
+        dorms = {location: Dorm.for_location(location) for location in locations}
+        statuses = ["active"] * 8 + ["sold", "inactive"]
+
+        created = 0
+        with _explicit_created_at():
+            while created < count:
+                batch = []
+                for i in range(min(SEED_BATCH_SIZE, count - created)):
+                    location = rng.choice(locations)
+                    dorm = dorms[location]
+                    batch.append(
+                        Listing(
+                            title=f"{SEED_TITLE_PREFIX}item {created + i}",
+                            description="Synthetic listing for query benchmarks",
+                            category=rng.choice(DEFAULT_CATEGORIES),
+                            dorm_location=location,
+                            dorm=dorm,
+                            area=dorm.area if dorm else None,
+                            price=Decimal(rng.randrange(100, 100000)) / 100,
+                            status=rng.choice(statuses),
+                            created_at=now
+                            - timedelta(seconds=rng.randrange(365 * 86400)),
+                        )
+                    )
+                with transaction.atomic():
+                    Listing.objects.bulk_create(batch)
+                created += len(batch)
+                self.stdout.write(f"Seeded {created}/{count} listings")
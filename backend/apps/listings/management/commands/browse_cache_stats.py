@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.listings.feed_cache import browse_cache_stats, reset_browse_cache_stats
+
+
+class Command(BaseCommand):
+    """
+    Report hits and misses of the anonymous browse response cache
+    (apps/listings/feed_cache.py) since the counters were last reset.
+
+    Usage:
+        python manage.py browse_cache_stats          # report
+        python manage.py browse_cache_stats --reset  # report, then reset
+    """
+
+    help = "Show hit/miss counts of the listing browse response cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after reporting them.",
+        )
+
+    def handle(self, *args, **options):
+        stats = browse_cache_stats()
+        rate = stats["hit_rate"]
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} "
+            f"hit_rate={'n/a' if rate is None else f'{rate:.1%}'}"
+        )
+        if options["reset"]:
+            reset_browse_cache_stats()
+            self.stdout.write("Counters reset")
@@ -0,0 +1,202 @@
+import json
+import os
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.listings.models import ListingImage
+from apps.profiles.models import Profile
+from utils.s3_service import DELETE_BATCH_SIZE, s3_service
+
+
+def _key(url):
+    """Object key of a stored (virtual-hosted-style) S3 URL"""
+    return urlsplit(url).path.lstrip("/")
+
+
+def referenced_listing_keys(listing_ids):
+    """Keys of every original and variant stored for these listings"""
+    keys = set()
+    for urls in ListingImage.objects.filter(listing_id__in=listing_ids).values_list(
+        "image_url", "thumbnail_url", "medium_url"
+    ):
+        keys.update(_key(url) for url in urls if url)
+    return keys
+
+
+def referenced_profile_keys(user_ids):
+    """Keys of the current avatars of these users"""
+    return {
+        _key(url)
+        for url in Profile.objects.filter(user_id__in=user_ids).values_list(
+            "avatar_url", flat=True
+        )
+        if url
+    }
+
+
+# S3 prefix -> loader of the keys still referenced by resources in that prefix.
+# Keys are laid out as {prefix}{resource_id}/..., see S3Service.new_key().
+PREFIXES = {
+    "listings/": referenced_listing_keys,
+    "profiles/": referenced_profile_keys,
+}
+
+
+class Command(BaseCommand):
+    """
+    Delete S3 objects under listings/ and profiles/ that no ListingImage or
+    Profile.avatar_url refers to (failed uploads, abandoned direct uploads,
+    deletes that never reached S3).
+
+    The bucket is listed one page (up to 1000 keys) at a time. For each page
+    the referenced keys of the listings/users it mentions are loaded in one
+    query and diffed as a set, and the orphans are removed with a single
+    DeleteObjects request. Memory stays bounded by the page size, so the
+    command can walk millions of keys; with --checkpoint it records the last
+    finished key per prefix and resumes from there after an interruption.
+
+    Objects newer than --min-age-hours are never touched: they may belong to
+    an upload whose database row has not been written yet.
+
+    Usage:
+        python manage.py collect_orphan_images --dry-run   # report only
+        python manage.py collect_orphan_images --checkpoint /var/tmp/gc.json
+        python manage.py collect_orphan_images --prefix profiles/
+    """
+
+    help = "Delete S3 images no listing or profile refers to"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List orphaned objects without deleting them.",
+        )
+        parser.add_argument(
+            "--prefix",
+            action="append",
+            choices=list(PREFIXES),
+            help="Only scan this prefix (repeatable; default: all).",
+        )
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24,
+            help="Skip objects modified more recently than this (default: 24).",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=DELETE_BATCH_SIZE,
+            help=f"Keys listed per page (max/default: {DELETE_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="JSON file to resume from and record progress in; removed "
+            "once every prefix has been scanned.",
+        )
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        if not 1 <= page_size <= DELETE_BATCH_SIZE:
+            raise CommandError(f"--page-size must be between 1 and {DELETE_BATCH_SIZE}")
+        if options["min_age_hours"] < 0:
+            raise CommandError("--min-age-hours must not be negative")
+
+        self.dry_run = options["dry_run"]
+        self.verbosity = options["verbosity"]
+        self.checkpoint_path = options["checkpoint"]
+        self.checkpoint = self._load_checkpoint()
+        self.cutoff = timezone.now() - timedelta(hours=options["min_age_hours"])
+        self.totals = dict.fromkeys(
+            ("scanned", "orphaned", "deleted", "failed", "skipped"), 0
+        )
+
+        for prefix in options["prefix"] or list(PREFIXES):
+            state = self.checkpoint.setdefault(prefix, {"after": None, "done": False})
+            if state["done"]:
+                self.stdout.write(f"{prefix}: already finished (checkpoint)")
+                continue
+            for page in s3_service.list_objects(
+                prefix, start_after=state["after"], page_size=page_size
+            ):
+                self._collect_page(prefix, page)
+                state["after"] = page[-1][0]
+                self._save_checkpoint()
+            state["done"] = True
+            self._save_checkpoint()
+
+        if self.checkpoint_path and all(
+            self.checkpoint.get(prefix, {}).get("done") for prefix in PREFIXES
+        ):
+            os.remove(self.checkpoint_path)
+
+        totals = self.totals
+        verb = "would delete" if self.dry_run else "deleted"
+        count = totals["orphaned"] if self.dry_run else totals["deleted"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scanned {totals['scanned']} objects: {totals['orphaned']} "
+                f"orphaned, {verb} {count}, {totals['failed']} failed, "
+                f"{totals['skipped']} skipped (recent or unrecognized)"
+            )
+        )
+
+    def _collect_page(self, prefix, page):
+        keys_by_resource = {}
+        for key, last_modified in page:
+            self.totals["scanned"] += 1
+            resource_id, _, rest = key[len(prefix) :].partition("/")
+            if not resource_id.isdigit() or not rest or last_modified > self.cutoff:
+                # Not a key we write, or possibly an upload still in flight
+                self.totals["skipped"] += 1
+                continue
+            keys_by_resource.setdefault(int(resource_id), []).append(key)
+
+        if not keys_by_resource:
+            return
+        referenced = PREFIXES[prefix](list(keys_by_resource))
+        orphans = [
+            key
+            for keys in keys_by_resource.values()
+            for key in keys
+            if key not in referenced
+        ]
+        if not orphans:
+            return
+
+        self.totals["orphaned"] += len(orphans)
+        if self.dry_run or self.verbosity >= 2:
+            for key in orphans:
+                self.stdout.write(f"Orphan: {key}")
+        if self.dry_run:
+            return
+
+        errors = s3_service.delete_images(
+            [s3_service.public_url(key) for key in orphans]
+        )
+        for url, error in errors.items():
+            self.stderr.write(f"Failed to delete {url}: {error}")
+        self.totals["failed"] += len(errors)
+        self.totals["deleted"] += len(orphans) - len(errors)
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read checkpoint {self.checkpoint_path}: {e}")
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        # Write-then-rename so an interrupted write never corrupts progress
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,52 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.listings.view_counts import (
+    PRUNE_DUE_KEY,
+    PRUNE_INTERVAL,
+    flush_view_counts,
+    prune_view_sketches,
+)
+
+
+class Command(BaseCommand):
+    """
+    Write listing views buffered in the cache to Listing.view_count.
+
+    Views are also flushed from the request path at most once per
+    VIEW_COUNT_FLUSH_INTERVAL; run this from cron or a worker (the
+    `viewcounts` process in the Procfile) so the last views of a quiet
+    period are written too. Once per PRUNE_INTERVAL it also deletes the
+    unique-viewer sketches older than the longest stats window.
+
+    Usage:
+        python manage.py flush_view_counts                # flush once
+        python manage.py flush_view_counts --interval 60  # keep flushing
+    """
+
+    help = "Flush buffered listing view counts to the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running and flush every INTERVAL seconds "
+            "(default: flush once and exit).",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        if interval is not None and interval <= 0:
+            raise CommandError("--interval must be positive")
+
+        while True:
+            flushed = flush_view_counts()
+            self.stdout.write(f"Flushed {flushed} listing views")
+            if cache.add(PRUNE_DUE_KEY, 1, timeout=PRUNE_INTERVAL):
+                pruned = prune_view_sketches()
+                self.stdout.write(f"Pruned {pruned} listing view sketches")
+            if interval is None:
+                break
+            time.sleep(interval)
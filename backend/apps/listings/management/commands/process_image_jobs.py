@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.listings.image_processing import DatabaseImageQueue
+from apps.listings.models import ImageProcessingJob, ListingImage
+
+
+class Command(BaseCommand):
+    """
+    Worker for the DB-backed image queues: renders thumbnail and medium
+    variants for queued ListingImage rows and deletes queued S3 objects
+    (S3DeletionJob rows) in batches.
+
+    Usage:
+        python manage.py process_image_jobs                  # run forever
+        python manage.py process_image_jobs --once           # drain and exit
+        python manage.py process_image_jobs --enqueue-missing --once
+    """
+
+    help = "Render image variants and delete removed images from S3"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when no job is due instead of polling.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10,
+            help="Jobs claimed per batch (default: 10).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when the queue is empty (default: 2).",
+        )
+        parser.add_argument(
+            "--enqueue-missing",
+            action="store_true",
+            help="First queue every image that has no variants yet (backfill).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer")
+
+        queue = DatabaseImageQueue()
+        if options["enqueue_missing"]:
+            before = ImageProcessingJob.objects.count()
+            queue.enqueue(
+                ListingImage.objects.filter(thumbnail_url__isnull=True).only("pk")
+            )
+            added = ImageProcessingJob.objects.count() - before
+            self.stdout.write(f"Queued {added} unprocessed images")
+
+        total_processed = total_failed = 0
+        total_deleted = total_delete_failed = 0
+        while True:
+            processed, failed = queue.run_once(batch_size)
+            deleted, delete_failed = queue.run_deletions()
+            total_processed += processed
+            total_failed += failed
+            total_deleted += deleted
+            total_delete_failed += delete_failed
+            if processed or failed or deleted or delete_failed:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {total_processed} images, {total_failed} failed; "
+                f"deleted {total_deleted} files, {total_delete_failed} failed"
+            )
+        )
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.listings.models import Listing, ListingImage, pick_primary_image
+
+
+class Command(BaseCommand):
+    """
+    Backfill or verify the denormalized Listing.primary_image_url,
+    Listing.primary_thumbnail_url and Listing.image_count columns against
+    the listing_images table.
+
+    Usage:
+        python manage.py sync_listing_images            # repair drifted rows
+        python manage.py sync_listing_images --verify   # report only
+    """
+
+    help = "Backfill/verify Listing's denormalized image columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report mismatched listings; exit non-zero if any exist.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of listings to check per batch (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        verify_only = options["verify"]
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer")
+
+        checked = 0
+        mismatched = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Listing.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list(
+                    "pk", "primary_image_url", "primary_thumbnail_url", "image_count"
+                )[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+
+            images_by_listing = {}
+            for listing_id, *image in (
+                ListingImage.objects.filter(listing_id__in=[row[0] for row in batch])
+                .order_by("listing_id", "display_order", "image_id")
+                .values_list("listing_id", "image_url", "is_primary", "thumbnail_url")
+            ):
+                images_by_listing.setdefault(listing_id, []).append(image)
+
+            for pk, *stored in batch:
+                images = images_by_listing.get(pk, [])
+                primary = pick_primary_image(images) or (None, False, None)
+                expected = [primary[0], primary[2], len(images)]
+                checked += 1
+                if stored == expected:
+                    continue
+
+                mismatched += 1
+                self.stdout.write(
+                    f"Listing {pk}: primary_image_url={stored[0]!r} "
+                    f"primary_thumbnail_url={stored[1]!r} image_count={stored[2]} "
+                    f"(expected {expected[0]!r}, {expected[1]!r}, {expected[2]})"
+                )
+                if not verify_only:
+                    Listing.objects.filter(pk=pk).update(
+                        primary_image_url=expected[0],
+                        primary_thumbnail_url=expected[1],
+                        image_count=expected[2],
+                    )
+
+        if verify_only:
+            if mismatched:
+                raise CommandError(
+                    f"{mismatched} of {checked} listings have stale image columns"
+                )
+            self.stdout.write(self.style.SUCCESS(f"All {checked} listings in sync"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Checked {checked} listings, repaired {mismatched}")
+            )
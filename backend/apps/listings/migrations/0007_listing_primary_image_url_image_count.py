@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:38
+
+from django.db import migrations, models
+
+
+def backfill_image_summary(apps, schema_editor):
+    Listing = apps.get_model("listings", "Listing")
+    ListingImage = apps.get_model("listings", "ListingImage")
+
+    images_by_listing = {}
+    for listing_id, image_url, is_primary in ListingImage.objects.order_by(
+        "listing_id", "display_order", "image_id"
+    ).values_list("listing_id", "image_url", "is_primary"):
+        images_by_listing.setdefault(listing_id, []).append((image_url, is_primary))
+
+    for listing_id, images in images_by_listing.items():
+        primary = next((url for url, is_primary in images if is_primary), None)
+        Listing.objects.filter(pk=listing_id).update(
+            primary_image_url=primary or images[0][0], image_count=len(images)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0006_rename_location_to_dorm_location"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="image_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="primary_image_url",
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.RunPython(backfill_image_summary, migrations.RunPython.noop),
+    ]
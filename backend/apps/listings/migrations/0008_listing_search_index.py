@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:20
+
+from django.db import migrations
+
+SEARCH_COLUMNS = "title, description, dorm_location, category"
+
+MYSQL_FORWARD = [
+    f"ALTER TABLE listings ADD FULLTEXT INDEX listings_search_ft ({SEARCH_COLUMNS})",
+]
+MYSQL_BACKWARD = ["ALTER TABLE listings DROP INDEX listings_search_ft"]
+
+# External-content FTS5 table: stores only the index, rows live in listings.
+# Note: a migration that rebuilds the listings table on SQLite (AlterField,
+# RemoveField, ...) drops these triggers and must re-run SQLITE_FORWARD.
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5("
+    f"{SEARCH_COLUMNS}, content='listings', content_rowid='listing_id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS listings_fts_ai AFTER INSERT ON listings BEGIN "
+    f"INSERT INTO listings_fts(rowid, {SEARCH_COLUMNS}) VALUES "
+    "(new.listing_id, new.title, new.description, new.dorm_location, "
+    "new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS listings_fts_ad AFTER DELETE ON listings BEGIN "
+    f"INSERT INTO listings_fts(listings_fts, rowid, {SEARCH_COLUMNS}) VALUES "
+    "('delete', old.listing_id, old.title, old.description, old.dorm_location, "
+    "old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS listings_fts_au AFTER UPDATE OF "
+    f"{SEARCH_COLUMNS} ON listings BEGIN "
+    f"INSERT INTO listings_fts(listings_fts, rowid, {SEARCH_COLUMNS}) VALUES "
+    "('delete', old.listing_id, old.title, old.description, old.dorm_location, "
+    "old.category); "
+    f"INSERT INTO listings_fts(rowid, {SEARCH_COLUMNS}) VALUES "
+    "(new.listing_id, new.title, new.description, new.dorm_location, "
+    "new.category); END",
+    "INSERT INTO listings_fts(listings_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS listings_fts_ai",
+    "DROP TRIGGER IF EXISTS listings_fts_ad",
+    "DROP TRIGGER IF EXISTS listings_fts_au",
+    "DROP TABLE IF EXISTS listings_fts",
+]
+
+
+def _sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any("FTS5" in row[0] for row in cursor.fetchall())
+
+
+def _run(schema_editor, statements_by_vendor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite" and not _sqlite_has_fts5(schema_editor):
+        # Search falls back to icontains when the index is missing
+        return
+    for sql in statements_by_vendor.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {"mysql": MYSQL_FORWARD, "sqlite": SQLITE_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {"mysql": MYSQL_BACKWARD, "sqlite": SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0007_listing_primary_image_url_image_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0008_listing_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="primary_thumbnail_url",
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name="listingimage",
+            name="medium_url",
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name="listingimage",
+            name="thumbnail_url",
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.CreateModel(
+            name="ImageProcessingJob",
+            fields=[
+                ("job_id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "image",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="processing_job",
+                        to="listings.listingimage",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "image_processing_jobs",
+                "ordering": ["run_after", "job_id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="image_proce_status_4eab00_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0009_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="S3DeletionJob",
+            fields=[
+                ("job_id", models.AutoField(primary_key=True, serialize=False)),
+                ("image_url", models.CharField(max_length=500)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "s3_deletion_jobs",
+                "ordering": ["run_after", "job_id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="s3_deletion_status_c4ce7f_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0010_s3_deletion_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListingViewSketch",
+            fields=[
+                ("sketch_id", models.AutoField(primary_key=True, serialize=False)),
+                ("day", models.DateField()),
+                ("registers", models.BinaryField()),
+                (
+                    "listing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="view_sketches",
+                        to="listings.listing",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "listing_view_sketches",
+                "ordering": ["listing", "day"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("listing", "day"), name="unique_listing_view_sketch_day"
+                    )
+                ],
+            },
+        ),
+    ]
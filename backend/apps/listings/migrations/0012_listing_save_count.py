@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:35
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Count
+
+search_index = import_module("apps.listings.migrations.0008_listing_search_index")
+
+
+def restore_search_index(apps, schema_editor):
+    # Adding a NOT NULL column rebuilds the listings table on SQLite, which
+    # drops the full-text triggers (see 0008)
+    if schema_editor.connection.vendor == "sqlite":
+        search_index.create_search_index(apps, schema_editor)
+
+
+def backfill_save_count(apps, schema_editor):
+    Listing = apps.get_model("listings", "Listing")
+    Watchlist = apps.get_model("listings", "Watchlist")
+
+    for row in Watchlist.objects.values("listing_id").annotate(saves=Count("pk")):
+        Listing.objects.filter(pk=row["listing_id"]).update(save_count=row["saves"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0011_listing_view_sketches"),
+    ]
+
+    operations = [
+        # Reversing the AddField rebuilds the table too
+        migrations.RunPython(migrations.RunPython.noop, restore_search_index),
+        migrations.AddField(
+            model_name="listing",
+            name="save_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(restore_search_index, migrations.RunPython.noop),
+        migrations.RunPython(backfill_save_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0012_listing_save_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="watchlist",
+            index=models.Index(
+                fields=["user", "-created_at"], name="watchlist_user_id_1b0258_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,148 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:20
+
+import django.db.models.deletion
+from importlib import import_module
+
+from django.conf import settings
+from django.db import migrations, models
+
+search_index = import_module("apps.listings.migrations.0008_listing_search_index")
+
+
+# The default dorms as of this migration (constants.DORM_AREAS may change)
+DORM_AREAS = {
+    "Alumni Hall": "washington_square",
+    "Brittany Hall": "washington_square",
+    "Clark Hall": "washington_square",
+    "Founders Hall": "washington_square",
+    "Hayden Hall": "washington_square",
+    "Lipton Hall": "washington_square",
+    "Othmer Hall": "washington_square",
+    "Palladium": "washington_square",
+    "Rubin Hall": "washington_square",
+    "Third North": "washington_square",
+    "University Hall": "washington_square",
+    "Weinstein Hall": "washington_square",
+    "194 Mercer": "downtown",
+    "26th Street": "downtown",
+    "Broome Street": "downtown",
+    "Carlyle Court": "downtown",
+    "Coral Towers": "downtown",
+    "Gramercy Green": "downtown",
+    "Greenwich Hotel": "downtown",
+    "Lafayette": "downtown",
+    "Water Street": "downtown",
+    "Other Dorms": "other",
+    "Off-Campus": "other",
+}
+
+
+def restore_search_index(apps, schema_editor):
+    # Removing the columns again rebuilds the listings table on SQLite,
+    # which drops the full-text triggers (see 0008)
+    if schema_editor.connection.vendor == "sqlite":
+        search_index.create_search_index(apps, schema_editor)
+
+
+def seed_dorms(apps, schema_editor):
+    Dorm = apps.get_model("listings", "Dorm")
+    for name, area in DORM_AREAS.items():
+        Dorm.objects.get_or_create(
+            name=name, defaults={"area": area, "is_default": True}
+        )
+
+
+def map_dorm_locations(apps, schema_editor):
+    """
+    Point listings at the Dorm matching their dorm_location, ignoring case
+    and surrounding spaces. Free-text locations outside the defaults get a
+    Dorm of their own in the "other" area; blank ones stay unset.
+    """
+    Dorm = apps.get_model("listings", "Dorm")
+    Listing = apps.get_model("listings", "Listing")
+
+    dorms = {dorm.name.lower(): dorm for dorm in Dorm.objects.all()}
+    locations = (
+        Listing.objects.exclude(dorm_location__isnull=True)
+        .values_list("dorm_location", flat=True)
+        .distinct()
+    )
+    for location in list(locations):
+        name = location.strip()
+        if not name:
+            continue
+        dorm = dorms.get(name.lower())
+        if dorm is None:
+            dorm = Dorm.objects.create(name=name, area="other", is_default=False)
+            dorms[name.lower()] = dorm
+        Listing.objects.filter(dorm_location=location).update(dorm=dorm, area=dorm.area)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0014_listing_feed_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Dorm",
+            fields=[
+                ("dorm_id", models.AutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=100, unique=True)),
+                (
+                    "area",
+                    models.CharField(
+                        choices=[
+                            ("washington_square", "Washington Square"),
+                            ("downtown", "Downtown"),
+                            ("other", "Other"),
+                        ],
+                        default="other",
+                        max_length=20,
+                    ),
+                ),
+                ("is_default", models.BooleanField(default=False)),
+            ],
+            options={
+                "db_table": "dorms",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.RunPython(migrations.RunPython.noop, restore_search_index),
+        migrations.AddField(
+            model_name="listing",
+            name="area",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("washington_square", "Washington Square"),
+                    ("downtown", "Downtown"),
+                    ("other", "Other"),
+                ],
+                max_length=20,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="dorm",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="listings",
+                to="listings.dorm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["status", "area", "created_at"],
+                name="listings_status_f7955b_idx",
+            ),
+        ),
+        migrations.RunPython(seed_dorms, migrations.RunPython.noop),
+        migrations.RunPython(map_dorm_locations, migrations.RunPython.noop),
+    ]
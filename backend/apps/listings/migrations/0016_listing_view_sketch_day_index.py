@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0015_dorms"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="listingviewsketch",
+            index=models.Index(fields=["day"], name="listing_vie_day_b53c93_idx"),
+        ),
+    ]
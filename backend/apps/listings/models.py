@@ -1,6 +1,60 @@
 # Create your models here.
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from .constants import DEFAULT_DORM_LOCATIONS_GROUPED, DORM_AREAS
+
+
+class Dorm(models.Model):
+    """
+    A dorm location listings can be filtered by.
+
+    Seeded with the default locations in constants.py (is_default). Any
+    other dorm_location a listing was saved with gets a row of its own in
+    the "other" area, so every location filter resolves through this small
+    table to indexed Listing.dorm lookups.
+    """
+
+    AREA_CHOICES = [
+        (area, area.replace("_", " ").title())
+        for area in DEFAULT_DORM_LOCATIONS_GROUPED
+    ]
+
+    dorm_id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=100, unique=True)
+    area = models.CharField(max_length=20, choices=AREA_CHOICES, default="other")
+    is_default = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = "dorms"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def for_location(cls, location):
+        """
+        The Dorm for a listing's dorm_location (case-insensitive), created
+        if it is new; None for a blank location.
+        """
+        name = (location or "").strip()
+        if not name:
+            return None
+        dorm = cls.objects.filter(name__iexact=name).first()
+        if dorm is None:
+            try:
+                with transaction.atomic():
+                    dorm = cls.objects.create(
+                        name=name,
+                        area=DORM_AREAS.get(name, "other"),
+                        is_default=name in DORM_AREAS,
+                    )
+            except IntegrityError:
+                # Created concurrently
+                dorm = cls.objects.get(name__iexact=name)
+        return dorm
 
 
 class Listing(models.Model):
@@ -22,22 +76,100 @@ class Listing(models.Model):
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="active")
     dorm_location = models.CharField(max_length=100, blank=True, null=True)
+    # Normalized dorm_location and its area, kept in sync by the pre_save
+    # receiver in signals.py; location filters query these
+    dorm = models.ForeignKey(
+        Dorm,
+        on_delete=models.SET_NULL,
+        related_name="listings",
+        null=True,
+        blank=True,
+    )
+    area = models.CharField(
+        max_length=20, choices=Dorm.AREA_CHOICES, blank=True, null=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     view_count = models.PositiveIntegerField(default=0)
+    # Denormalized from ListingImage so list pages can render cards from the
+    # listings table alone. Kept in sync by refresh_image_summary().
+    primary_image_url = models.CharField(max_length=500, blank=True, null=True)
+    # Thumbnail variant of the primary image, once image processing made one
+    primary_thumbnail_url = models.CharField(max_length=500, blank=True, null=True)
+    image_count = models.PositiveIntegerField(default=0)
+    # Number of Watchlist rows for this listing, kept current by the
+    # Watchlist signal receivers in signals.py
+    save_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = "listings"
         # used for efficient filtering
         indexes = [
             models.Index(fields=["category"]),
-            models.Index(fields=["status"]),
+            # The public feed always filters status="active" and sorts by one
+            # of ListingViewSet's ordering fields: each index below serves the
+            # filter and the ORDER BY ... LIMIT without a sort. Checked by
+            # `manage.py benchmark_listing_queries` (see test_query_plans.py).
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["status", "price"]),
+            models.Index(fields=["status", "title"]),
+            # Category pages and the filter-options category list
+            models.Index(fields=["status", "category", "created_at"]),
+            # Area pages (?area=); locations use the dorm foreign key index
+            models.Index(fields=["status", "area", "created_at"]),
         ]
         ordering = ["-created_at"]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "dorm_location" in update_fields:
+            # resolve_dorm (signals.py) repoints dorm and area to match
+            kwargs["update_fields"] = {*update_fields, "dorm", "area"}
+        super().save(*args, **kwargs)
+
+    def compute_image_summary(self):
+        """
+        Return (primary_image_url, primary_thumbnail_url, image_count)
+        computed from ListingImage
+        """
+        images = list(
+            ListingImage.objects.filter(listing_id=self.pk)
+            .order_by("display_order", "image_id")
+            .values_list("image_url", "is_primary", "thumbnail_url")
+        )
+        primary = pick_primary_image(images) or (None, False, None)
+        return primary[0], primary[2], len(images)
+
+    def refresh_image_summary(self):
+        """
+        Recompute the denormalized image columns and persist them.
+        Uses a queryset update so updated_at is not bumped.
+        """
+        (
+            self.primary_image_url,
+            self.primary_thumbnail_url,
+            self.image_count,
+        ) = self.compute_image_summary()
+        Listing.objects.filter(pk=self.pk).update(
+            primary_image_url=self.primary_image_url,
+            primary_thumbnail_url=self.primary_thumbnail_url,
+            image_count=self.image_count,
+        )
+
+
+def pick_primary_image(images):
+    """
+    Pick the card image from (image_url, is_primary, ...) rows ordered by
+    display_order: the row marked primary, else the first row.
+    """
+    for image in images:
+        if image[1]:
+            return image
+    return images[0] if images else None
+
 
 class ListingImage(models.Model):
     image_id = models.AutoField(primary_key=True)
@@ -52,6 +184,10 @@ class ListingImage(models.Model):
     # First image to show when the user opens the listing.
     # This need not always be the first image.
     created_at = models.DateTimeField(auto_now_add=True)
+    # Resized, EXIF-free copies written by the image processing worker
+    # (apps/listings/image_processing.py); null until processed
+    thumbnail_url = models.CharField(max_length=500, blank=True, null=True)
+    medium_url = models.CharField(max_length=500, blank=True, null=True)
 
     class Meta:
         db_table = "listing_images"
@@ -64,6 +200,116 @@ class ListingImage(models.Model):
     def __str__(self):
         return f"Image for {self.listing.title}"
 
+    def stored_urls(self):
+        """The original and every variant this image has in storage"""
+        return [
+            url for url in (self.image_url, self.thumbnail_url, self.medium_url) if url
+        ]
+
+
+class ImageProcessingJob(models.Model):
+    """
+    DB-backed queue entry: render the variants of one ListingImage.
+
+    Rows are claimed by the process_image_jobs worker and deleted once the
+    variants are stored; a job that keeps failing ends up as "failed" with
+    its last error for inspection.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("failed", "Failed"),
+    ]
+
+    job_id = models.AutoField(primary_key=True)
+    image = models.OneToOneField(
+        ListingImage, on_delete=models.CASCADE, related_name="processing_job"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "image_processing_jobs"
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+        ordering = ["run_after", "job_id"]
+
+    def __str__(self):
+        return f"Process image {self.image_id} ({self.status})"
+
+
+class S3DeletionJob(models.Model):
+    """
+    DB-backed queue entry: delete one stored image (original, variant or
+    avatar) from S3.
+
+    Rows are written in the same transaction that removes the database
+    record, so a rolled-back delete leaves the file alone. The
+    process_image_jobs worker deletes due rows in DeleteObjects batches;
+    one that keeps failing stays behind as "failed" (dead letter) with its
+    last error.
+    """
+
+    STATUS_CHOICES = ImageProcessingJob.STATUS_CHOICES
+
+    job_id = models.AutoField(primary_key=True)
+    image_url = models.CharField(max_length=500)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "s3_deletion_jobs"
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+        ordering = ["run_after", "job_id"]
+
+    def __str__(self):
+        return f"Delete {self.image_url} ({self.status})"
+
+
+class ListingViewSketch(models.Model):
+    """
+    HyperLogLog sketch (utils/hyperloglog.py) of the distinct viewers of one
+    listing on one day. A fixed 2KB per listing and day, however many
+    viewers; days merge into unique viewers over any range.
+
+    Merged in from the cache by flush_view_counts() (apps/listings/view_counts.py).
+    """
+
+    sketch_id = models.AutoField(primary_key=True)
+    listing = models.ForeignKey(
+        Listing, on_delete=models.CASCADE, related_name="view_sketches"
+    )
+    day = models.DateField()
+    registers = models.BinaryField()
+
+    class Meta:
+        db_table = "listing_view_sketches"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["listing", "day"], name="unique_listing_view_sketch_day"
+            )
+        ]
+        indexes = [
+            # prune_view_sketches() deletes by day across listings
+            models.Index(fields=["day"]),
+        ]
+        ordering = ["listing", "day"]
+
+    def __str__(self):
+        return f"Viewers of {self.listing_id} on {self.day}"
+
 
 class Watchlist(models.Model):
     """Model to track listings saved by users"""
@@ -87,8 +333,21 @@ class Watchlist(models.Model):
         indexes = [
             models.Index(fields=["user"]),
             models.Index(fields=["listing"]),
+            # Cursor-paginated watchlist page (WatchlistPagination)
+            models.Index(fields=["user", "-created_at"]),
         ]
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"{self.user.email} - {self.listing.title}"
+
+    @classmethod
+    def saved_listing_ids(cls, user, listing_ids):
+        """The subset of listing_ids the user has saved, in one query"""
+        if not user or not user.is_authenticated or not listing_ids:
+            return set()
+        return set(
+            cls.objects.filter(user=user, listing_id__in=listing_ids).values_list(
+                "listing_id", flat=True
+            )
+        )
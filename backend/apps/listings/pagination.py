@@ -0,0 +1,200 @@
+"""
+Pagination of the public listing feed (GET /api/v1/listings/ and
+/listings/search/).
+
+The default is page-number pagination (?page=, ?page_size=) with a total
+count. The count is cached per filter combination (feed_cache.cached_count)
+so paging through results does not re-run COUNT(*) on every page;
+count_is_estimate says whether listings may have changed since it was
+taken; a page the estimate cannot account for (past its end, or fuller
+than its last page) is counted exactly rather than turned away. For
+infinite scroll, ?pagination=cursor switches to keyset pagination: each
+page is "the next page_size rows after the last one seen", keyed on the
+active ordering field plus listing_id, so page 500 costs one indexed
+range read like page 1, with no OFFSET and no COUNT.
+Responses are {next, previous: null, results}; follow `next` (it carries
+?cursor=) until it is null.
+"""
+
+import base64
+import json
+
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .feed_cache import cached_count, request_signature
+from .models import Listing
+
+CURSOR_QUERY_PARAM = "cursor"
+MODE_QUERY_PARAM = "pagination"
+
+
+def is_keyset_request(request):
+    """Whether the request asked for cursor (keyset) pagination"""
+    params = request.query_params
+    return CURSOR_QUERY_PARAM in params or params.get(MODE_QUERY_PARAM) == "cursor"
+
+
+def _encode_cursor(ordering, value, listing_id):
+    payload = json.dumps({"o": ordering, "v": value, "id": listing_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor, ordering):
+    """(value, listing_id) of a cursor issued for this ordering"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if payload["o"] != ordering:
+            raise ValueError("cursor was issued for another ordering")
+        field = Listing._meta.get_field(ordering.lstrip("-"))
+        return field.to_python(payload["v"]), int(payload["id"])
+    except Exception:
+        raise NotFound("Invalid cursor.")
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator whose count comes from cached_count()"""
+
+    def __init__(self, object_list, per_page, signature, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.signature = signature
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        count, self.count_is_estimate = cached_count(self.object_list, self.signature)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_estimate:
+                raise
+        # Listings added since the estimate may fill this page
+        self._count_exactly()
+        return super().validate_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate or number < self.num_pages:
+            return super().page(number)
+        # Paginator.page() cuts the last page off at the count, which would
+        # drop listings added since the estimate; read a full page instead
+        bottom = (number - 1) * self.per_page
+        rows = self.object_list[bottom : bottom + self.per_page]
+        page = self._get_page(rows, number, self)
+        if len(page) > self.count - bottom:
+            # Not the last page after all, and `next` must say so
+            self._count_exactly()
+        return page
+
+    def _count_exactly(self):
+        self.__dict__.pop("num_pages", None)
+        self.count, self.count_is_estimate = cached_count(
+            self.object_list, self.signature, exact=True
+        )
+
+
+class ListingPagination(pagination.PageNumberPagination):
+    page_size = 12
+    page_size_query_param = "page_size"
+    max_page_size = 60
+
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = is_keyset_request(request)
+        if not self.keyset:
+            self.signature = request_signature(request)
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        # get_queryset orders by exactly one of its ordering fields
+        ordering = queryset.query.order_by[0]
+        name = ordering.lstrip("-")
+        descending = ordering.startswith("-")
+        queryset = queryset.order_by(
+            ordering, "-listing_id" if descending else "listing_id"
+        )
+
+        cursor = request.query_params.get(CURSOR_QUERY_PARAM)
+        if cursor:
+            value, listing_id = _decode_cursor(cursor, ordering)
+            op = "lt" if descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{name}__{op}": value})
+                | Q(**{name: value, f"listing_id__{op}": listing_id})
+            )
+
+        rows = list(queryset[: page_size + 1])
+        page = rows[:page_size]
+        self.next_cursor = None
+        if len(rows) > page_size:
+            last = page[-1]
+            value = Listing._meta.get_field(name).value_to_string(last)
+            self.next_cursor = _encode_cursor(ordering, value, last.pk)
+        return page
+
+    def page_state(self):
+        """What get_paginated_response() needs besides the results"""
+        if self.keyset:
+            return {"next_cursor": self.next_cursor}
+        paginator = self.page.paginator
+        return {
+            "number": self.page.number,
+            "count": paginator.count,
+            "count_is_estimate": paginator.count_is_estimate,
+        }
+
+    def restore_page(self, request, state):
+        """
+        Prepare get_paginated_response() from the page_state() of an
+        equivalent request, building the links for this one.
+        """
+        self.request = request
+        self.keyset = is_keyset_request(request)
+        if self.keyset:
+            self.next_cursor = state["next_cursor"]
+            return
+        paginator = CachedCountPaginator(
+            Listing.objects.none(), self.get_page_size(request), signature=None
+        )
+        paginator.count = state["count"]
+        paginator.count_is_estimate = state["count_is_estimate"]
+        self.page = paginator._get_page([], state["number"], paginator)
+
+    def django_paginator_class(self, queryset, page_size):
+        return CachedCountPaginator(queryset, page_size, self.signature)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, CURSOR_QUERY_PARAM, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            paginator = self.page.paginator
+            return Response(
+                {
+                    "count": paginator.count,
+                    "count_is_estimate": paginator.count_is_estimate,
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                    "results": data,
+                }
+            )
+        return Response(
+            {"next": self.get_next_link(), "previous": None, "results": data}
+        )
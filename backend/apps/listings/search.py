@@ -0,0 +1,157 @@
+"""
+Keyword search over listings.
+
+Both GET /api/v1/listings/search/?q= and the list endpoint's ?search= go
+through search_listings(), which picks a backend for the database vendor:
+
+- MySQL:  FULLTEXT index ``listings_search_ft`` queried with
+          MATCH ... AGAINST in boolean mode
+- SQLite: FTS5 table ``listings_fts`` kept in sync by triggers
+- other / index missing: the original OR of icontains lookups
+
+The index is created by migration 0008_listing_search_index. Full-text
+backends match whole words and word prefixes ("des" finds "desk"), not
+arbitrary substrings. A query that yields no indexable terms falls back to
+icontains.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_FIELDS = ("title", "description", "dorm_location", "category")
+
+SQLITE_FTS_TABLE = "listings_fts"
+MYSQL_FULLTEXT_INDEX = "listings_search_ft"
+
+# Default innodb_ft_min_token_size; shorter words are not in the index
+MYSQL_MIN_TOKEN_SIZE = 3
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query):
+    """Split a raw query into lowercased word terms"""
+    return [t.lower() for t in _TERM_RE.findall(query or "")]
+
+
+class IContainsSearchBackend:
+    """Substring match on every search field (full table scan)"""
+
+    name = "icontains"
+
+    def search(self, queryset, query, rank=False):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f"{field}__icontains": query})
+        return queryset.filter(condition)
+
+
+class SQLiteFTS5SearchBackend(IContainsSearchBackend):
+    name = "sqlite_fts5"
+
+    def search(self, queryset, query, rank=False):
+        terms = search_terms(query)
+        if not terms:
+            return super().search(queryset, query, rank)
+
+        # Every term must match, each as a quoted prefix: "desk"* "lamp"*
+        match = " ".join(f'"{term}"*' for term in terms)
+        queryset = queryset.filter(
+            listing_id__in=RawSQL(
+                f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s",
+                [match],
+            )
+        )
+        if not rank:
+            return queryset
+        # bm25() is lower-is-better; negate it so higher search_rank wins
+        table = queryset.model._meta.db_table
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f"(SELECT -bm25({SQLITE_FTS_TABLE}) FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s "
+                f'AND rowid = "{table}"."listing_id")',
+                [match],
+                output_field=FloatField(),
+            )
+        ).order_by("-search_rank", "-created_at")
+
+
+class MySQLFullTextSearchBackend(IContainsSearchBackend):
+    name = "mysql_fulltext"
+
+    def search(self, queryset, query, rank=False):
+        terms = search_terms(query)
+        if not terms or any(len(t) < MYSQL_MIN_TOKEN_SIZE for t in terms):
+            return super().search(queryset, query, rank)
+
+        table = queryset.model._meta.db_table
+        columns = ", ".join(f"`{table}`.`{field}`" for field in SEARCH_FIELDS)
+        # Boolean mode: every term required, matched as a prefix
+        against = " ".join(f"+{term}*" for term in terms)
+        match_sql = f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)"
+
+        queryset = queryset.filter(
+            RawSQL(match_sql, [against], output_field=BooleanField())
+        )
+        if not rank:
+            return queryset
+        return queryset.annotate(
+            search_rank=RawSQL(match_sql, [against], output_field=FloatField())
+        ).order_by("-search_rank", "-created_at")
+
+
+_BACKENDS = {
+    "sqlite": SQLiteFTS5SearchBackend,
+    "mysql": MySQLFullTextSearchBackend,
+}
+
+# alias -> backend instance, resolved once per process
+_resolved = {}
+
+
+def _index_exists(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [SQLITE_FTS_TABLE],
+            )
+        else:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND index_name = %s LIMIT 1",
+                [MYSQL_FULLTEXT_INDEX],
+            )
+        return cursor.fetchone() is not None
+
+
+def get_search_backend(using="default"):
+    """Return the search backend for a database alias"""
+    backend = _resolved.get(using)
+    if backend is None:
+        connection = connections[using]
+        backend_class = _BACKENDS.get(connection.vendor, IContainsSearchBackend)
+        if backend_class is not IContainsSearchBackend and not _index_exists(
+            connection
+        ):
+            backend_class = IContainsSearchBackend
+        backend = _resolved[using] = backend_class()
+    return backend
+
+
+def search_listings(queryset, query, rank=False):
+    """
+    Filter a Listing queryset by keyword query.
+
+    An empty query returns the queryset unchanged. With rank=True, results
+    are ordered by relevance (then newest first); callers pass rank=False
+    when the client asked for an explicit ordering.
+    """
+    if not query:
+        return queryset
+    return get_search_backend(queryset.db).search(queryset, query, rank=rank)
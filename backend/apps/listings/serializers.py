@@ -1,8 +1,11 @@
 import json
 import logging
 
-from apps.listings.models import Listing, ListingImage
-from django.db import models
+from apps.listings.models import Listing, ListingImage, Watchlist
+from apps.listings.image_processing import delete_images_later, enqueue_unprocessed
+from apps.listings.view_counts import cached_unique_viewers
+from apps.listings.watchlist_status import MAX_STATUS_IDS
+from django.db import models, transaction
 from rest_framework import serializers
 from utils.s3_service import s3_service
 
@@ -41,6 +44,8 @@ class ListingImageSerializer(serializers.ModelSerializer):
             "image_url",
             "display_order",
             "is_primary",
+            "thumbnail_url",
+            "medium_url",
             "created_at",
         ]
 
@@ -55,6 +60,7 @@ class ListingCreateSerializer(serializers.ModelSerializer):
         required=False,
     )
     uploaded_images = ListingImageSerializer(many=True, read_only=True, source="images")
+    failed_images = serializers.SerializerMethodField()
 
     class Meta:
         model = Listing
@@ -68,8 +74,9 @@ class ListingCreateSerializer(serializers.ModelSerializer):
             "dorm_location",
             "images",
             "uploaded_images",
+            "failed_images",
         ]
-        read_only_fields = ["listing_id", "uploaded_images"]
+        read_only_fields = ["listing_id", "uploaded_images", "failed_images"]
 
     def validate(self, data):
         """Ensure user is authenticated"""
@@ -98,33 +105,58 @@ class ListingCreateSerializer(serializers.ModelSerializer):
         # Create the listing first
         listing = Listing.objects.create(**validated_data)
 
-        # Upload images to S3 and create ListingImage records
-        for index, image_file in enumerate(images_data):
-            try:
-                # Upload to S3
-                image_url = s3_service.upload_image(image_file, listing.listing_id)
-
-                # Create ListingImage record
-                ListingImage.objects.create(
-                    listing=listing,
-                    image_url=image_url,
-                    display_order=index,
-                    is_primary=(index == 0),  # First image is primary
-                )
-            except Exception as e:
-                # If any image upload fails, we should handle it gracefully
-                # For now, log the error and continue with other images
-                logger.error(
-                    f"Failed to upload image for listing "
-                    f"{listing.listing_id}: {str(e)}"
-                    f"Failed to upload image for listing "
-                    f"{listing.listing_id}: {str(e)}"
-                )
-                # Optionally, you could delete the listing if no images were
-                # uploaded successfully
+        # Upload images to S3 concurrently; display_order follows the
+        # submitted order even if some uploads fail
+        results = s3_service.upload_images(images_data, listing.listing_id)
+        uploaded = [r for r in results if r.ok]
+        ListingImage.objects.bulk_create(
+            ListingImage(
+                listing=listing,
+                image_url=r.url,
+                display_order=r.index,
+                is_primary=(r is uploaded[0]),  # First uploaded image is primary
+            )
+            for r in uploaded
+        )
+        enqueue_unprocessed(listing)
+
+        # A failed upload doesn't fail the listing; report it per image
+        listing.failed_images = [
+            {"index": r.index, "name": r.name, "error": r.error}
+            for r in results
+            if not r.ok
+        ]
+        for r in listing.failed_images:
+            logger.error(
+                f"Failed to upload image {r['index']} ({r['name']}) for listing "
+                f"{listing.listing_id}: {r['error']}"
+            )
 
+        listing.refresh_image_summary()
         return listing
 
+    def get_failed_images(self, obj):
+        return getattr(obj, "failed_images", [])
+
+
+def _is_saved(context, obj):
+    """
+    Whether the requesting user saved this listing. Read from the
+    is_saved_by_user annotation (detail views) or the batched
+    context["saved_listing_ids"] (card pages) when the view supplied one,
+    else one query.
+    """
+    annotated = getattr(obj, "is_saved_by_user", None)
+    if annotated is not None:
+        return annotated
+    saved_listing_ids = context.get("saved_listing_ids")
+    if saved_listing_ids is not None:
+        return obj.pk in saved_listing_ids
+    request = context.get("request")
+    if request and request.user.is_authenticated:
+        return Watchlist.objects.filter(user=request.user, listing=obj).exists()
+    return False
+
 
 # Detail page — GET /api/v1/listings/<id>/
 class ListingDetailSerializer(serializers.ModelSerializer):
@@ -133,7 +165,7 @@ class ListingDetailSerializer(serializers.ModelSerializer):
     user_netid = serializers.CharField(source="user.netid", read_only=True)
     user_id = serializers.CharField(source="user.user_id", read_only=True)
     is_saved = serializers.SerializerMethodField()
-    save_count = serializers.SerializerMethodField()
+    unique_viewers = serializers.SerializerMethodField()
 
     class Meta:
         model = Listing
@@ -153,6 +185,7 @@ class ListingDetailSerializer(serializers.ModelSerializer):
             "user_id",
             "is_saved",
             "save_count",
+            "unique_viewers",
         ]
         read_only_fields = [
             "listing_id",
@@ -162,22 +195,16 @@ class ListingDetailSerializer(serializers.ModelSerializer):
             "user_netid",
             "is_saved",
             "save_count",
+            "unique_viewers",
         ]
 
     def get_is_saved(self, obj):
         """Check if current user has saved this listing"""
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            from .models import Watchlist
-
-            return Watchlist.objects.filter(user=request.user, listing=obj).exists()
-        return False
+        return _is_saved(self.context, obj)
 
-    def get_save_count(self, obj):
-        """Get total number of users who saved this listing"""
-        from .models import Watchlist
-
-        return Watchlist.objects.filter(listing=obj).count()
+    def get_unique_viewers(self, obj):
+        """Estimated distinct viewers over the last 30 days (HyperLogLog)"""
+        return cached_unique_viewers(obj.pk)
 
 
 # Update listing— PUT / PATCH
@@ -277,103 +304,130 @@ class ListingUpdateSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
 
-        # Handle image removals
-        if remove_image_ids:
-            images_to_delete = ListingImage.objects.filter(
-                listing=instance, image_id__in=remove_image_ids
-            )
-            for img in images_to_delete:
-                try:
-                    # Delete from S3
-                    s3_service.delete_image(img.image_url)
-                    # Delete from database
-                    img.delete()
-                    logger.info(
-                        f"Deleted image {img.image_id} from listing "
-                        f"{instance.listing_id}"
+        # Keep the denormalized image columns in sync even if a branch below
+        # raises part-way through (e.g. an upload failure after removals)
+        try:
+            # Handle image removals
+            if remove_image_ids:
+                images_to_delete = list(
+                    ListingImage.objects.filter(
+                        listing=instance, image_id__in=remove_image_ids
                     )
-                except Exception as e:
-                    logger.error(f"Failed to delete image {img.image_id}: {str(e)}")
-
-        # Handle new image uploads
-        if new_images:
-            # Get current max display_order
-            existing_images = ListingImage.objects.filter(listing=instance)
-            current_count = existing_images.count()
-
-            # Check total image limit
-            if current_count + len(new_images) > 10:
-                raise serializers.ValidationError(
-                    f"Cannot add {len(new_images)} images. Listing already "
-                    f"has {current_count} images. Maximum is 10."
+                )
+                with transaction.atomic():
+                    # The originals and variants are removed from S3 in one
+                    # batch once the rows are gone
+                    delete_images_later(
+                        url for img in images_to_delete for url in img.stored_urls()
+                    )
+                    ListingImage.objects.filter(
+                        image_id__in=[img.image_id for img in images_to_delete]
+                    ).delete()
+                logger.info(
+                    f"Deleted images {[img.image_id for img in images_to_delete]} "
+                    f"from listing {instance.listing_id}"
                 )
 
-            max_order = (
-                existing_images.aggregate(models.Max("display_order"))[
-                    "display_order__max"
-                ]
-                or -1
-            )
+            # Handle new image uploads
+            if new_images:
+                # Get current max display_order
+                existing_images = ListingImage.objects.filter(listing=instance)
+                current_count = existing_images.count()
 
-            for index, image_file in enumerate(new_images):
-                try:
-                    # Upload to S3
-                    image_url = s3_service.upload_image(image_file, instance.listing_id)
+                # Check total image limit
+                if current_count + len(new_images) > 10:
+                    raise serializers.ValidationError(
+                        f"Cannot add {len(new_images)} images. Listing already "
+                        f"has {current_count} images. Maximum is 10."
+                    )
 
-                    # Create ListingImage record
-                    ListingImage.objects.create(
+                max_order = (
+                    existing_images.aggregate(models.Max("display_order"))[
+                        "display_order__max"
+                    ]
+                    or -1
+                )
+
+                results = s3_service.upload_images(new_images, instance.listing_id)
+                ListingImage.objects.bulk_create(
+                    ListingImage(
                         listing=instance,
-                        image_url=image_url,
-                        display_order=max_order + index + 1,
+                        image_url=r.url,
+                        display_order=max_order + r.index + 1,
                         is_primary=False,  # Don't auto-set as primary on update
                     )
-                    logger.info(f"Added new image to listing {instance.listing_id}")
-                except Exception as e:
-                    logger.error(
-                        f"Failed to upload image for listing "
-                        f"{instance.listing_id}: {str(e)}"
-                    )
+                    for r in results
+                    if r.ok
+                )
+                enqueue_unprocessed(instance)
+                logger.info(
+                    f"Added {sum(r.ok for r in results)} new images to listing "
+                    f"{instance.listing_id}"
+                )
+
+                failed = [r for r in results if not r.ok]
+                if failed:
+                    for r in failed:
+                        logger.error(
+                            f"Failed to upload image {r.index} ({r.name}) for "
+                            f"listing {instance.listing_id}: {r.error}"
+                        )
                     raise serializers.ValidationError(
-                        f"Failed to upload image: {str(e)}"
+                        {
+                            "new_images": [
+                                f"Failed to upload image {r.name or r.index}: "
+                                f"{r.error}"
+                                for r in failed
+                            ]
+                        }
                     )
 
-        # Handle image metadata updates
-        if update_images:
-            for update_data in update_images:
-                image_id = update_data.get("image_id")
-                try:
-                    img = ListingImage.objects.get(image_id=image_id, listing=instance)
-
-                    # Update display_order if provided
-                    if "display_order" in update_data:
-                        img.display_order = update_data["display_order"]
-
-                    # Update is_primary if provided
-                    if "is_primary" in update_data:
-                        is_primary = update_data["is_primary"]
-                        if is_primary:
-                            # Unset is_primary for all other images
-                            ListingImage.objects.filter(listing=instance).exclude(
-                                image_id=image_id
-                            ).update(is_primary=False)
-                        img.is_primary = is_primary
-
-                    img.save()
-                    logger.info(
-                        f"Updated image {image_id} for listing {instance.listing_id}"
-                    )
-                except ListingImage.DoesNotExist:
-                    logger.warning(
-                        f"Image {image_id} not found for listing {instance.listing_id}"
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to update image {image_id}: {str(e)}")
+            # Handle image metadata updates
+            if update_images:
+                for update_data in update_images:
+                    image_id = update_data.get("image_id")
+                    try:
+                        img = ListingImage.objects.get(
+                            image_id=image_id, listing=instance
+                        )
+
+                        # Update display_order if provided
+                        if "display_order" in update_data:
+                            img.display_order = update_data["display_order"]
+
+                        # Update is_primary if provided
+                        if "is_primary" in update_data:
+                            is_primary = update_data["is_primary"]
+                            if is_primary:
+                                # Unset is_primary for all other images
+                                ListingImage.objects.filter(listing=instance).exclude(
+                                    image_id=image_id
+                                ).update(is_primary=False)
+                            img.is_primary = is_primary
+
+                        img.save()
+                        logger.info(
+                            f"Updated image {image_id} for listing "
+                            f"{instance.listing_id}"
+                        )
+                    except ListingImage.DoesNotExist:
+                        logger.warning(
+                            f"Image {image_id} not found for listing "
+                            f"{instance.listing_id}"
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to update image {image_id}: {str(e)}")
+        finally:
+            instance.refresh_image_summary()
 
         return instance
 
 
 # Compact list — GET /api/v1/listings/
 class CompactListingSerializer(serializers.ModelSerializer):
+    # Read from the denormalized primary_thumbnail_url / primary_image_url
+    # columns, so list pages need no image queries: cards show the thumbnail
+    # variant, or the original until the thumbnail is processed
     primary_image = serializers.SerializerMethodField()
 
     # Expose seller username from user.netid (null-safe)
@@ -390,6 +444,10 @@ class CompactListingSerializer(serializers.ModelSerializer):
         source="dorm_location", read_only=True, allow_null=True
     )
 
+    # Views pass the page's saved ids in context, read from the per-user cache
+    # (watchlist_status.saved_listing_ids)
+    is_saved = serializers.SerializerMethodField()
+
     class Meta:
         model = Listing
         fields = [
@@ -399,26 +457,27 @@ class CompactListingSerializer(serializers.ModelSerializer):
             "price",
             "status",
             "primary_image",
+            "image_count",
             "seller_username",
             "created_at",
             "view_count",
+            "save_count",
+            "is_saved",
             "dorm_location",
             "location",
         ]
 
     def get_primary_image(self, obj):
-        """Get the primary image URL, or the first image if no primary is set"""
-        # First try to get the image marked as primary
-        primary_img = obj.images.filter(is_primary=True).first()
-        if primary_img:
-            return primary_img.image_url
+        return obj.primary_thumbnail_url or obj.primary_image_url
 
-        # If no primary image, get the first image by display_order
-        first_img = obj.images.order_by("display_order").first()
-        if first_img:
-            return first_img.image_url
+    def get_is_saved(self, obj):
+        return _is_saved(self.context, obj)
 
-        # No images for this listing
-        return None
 
-        return None
+# Saved state of a page of cards — POST /api/v1/watchlist/status/
+class WatchlistStatusSerializer(serializers.Serializer):
+    listing_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_STATUS_IDS,
+    )
@@ -0,0 +1,117 @@
+"""
+Listing signal receivers that keep derived read models current:
+
+- the cached filter-options payload is invalidated when a listing change
+  could alter it: a category, dorm_location or status change on a listing
+  that is (or was) active
+- Listing.dorm and Listing.area follow dorm_location (Dorm.for_location)
+- the in-process suggest index is updated once the write commits
+- the feed caches (feed_cache.py) start a new generation on any listing
+  save or delete
+- Listing.save_count follows Watchlist inserts and deletes, including the
+  cascades when a user is deleted, and the user's cached saved-state
+  lookups (watchlist_status.py) are invalidated
+
+Field values are snapshotted in post_init so post_save can compare them
+without an extra query. Values are read from __dict__ so deferred fields
+(.only()/.defer()) are never loaded just for the snapshot; a deferred field
+counts as "unknown" and invalidates conservatively.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .feed_cache import invalidate_feed
+from .filter_options import invalidate_filter_options
+from .models import Dorm, Listing, Watchlist
+from .suggest import suggest_index
+from .watchlist_status import invalidate_saved_listing_ids
+
+FILTER_OPTION_FIELDS = ("category", "dorm_location", "status")
+SUGGEST_FIELDS = ("title", "category", "status")
+
+_MISSING = object()
+
+
+def _filter_state(instance):
+    return tuple(instance.__dict__.get(f, _MISSING) for f in FILTER_OPTION_FIELDS)
+
+
+def _is_active(state):
+    return state[FILTER_OPTION_FIELDS.index("status")] in ("active", _MISSING)
+
+
+@receiver(post_init, sender=Listing)
+def snapshot_filter_state(sender, instance, **kwargs):
+    instance._filter_state = _filter_state(instance)
+
+
+@receiver(pre_save, sender=Listing)
+def resolve_dorm(sender, instance, update_fields=None, **kwargs):
+    if "dorm_location" not in instance.__dict__:
+        return  # deferred, so not being saved
+    if update_fields is not None and "dorm_location" not in update_fields:
+        return  # Listing.save() adds dorm and area alongside dorm_location
+    old = getattr(instance, "_filter_state", None)
+    location_index = FILTER_OPTION_FIELDS.index("dorm_location")
+    unchanged = (
+        not instance._state.adding
+        and old is not None
+        and old[location_index] == instance.dorm_location
+    )
+    if unchanged and (instance.dorm_id is not None or not instance.dorm_location):
+        return
+    dorm = Dorm.for_location(instance.dorm_location)
+    instance.dorm = dorm
+    instance.area = dorm.area if dorm else None
+
+
+@receiver(post_save, sender=Listing)
+def listing_saved(sender, instance, created, update_fields=None, **kwargs):
+    new = _filter_state(instance)
+    old = getattr(instance, "_filter_state", None)
+    instance._filter_state = new
+    invalidate_feed()
+
+    if update_fields is None or set(update_fields) & set(SUGGEST_FIELDS):
+        transaction.on_commit(lambda: suggest_index.update_listing(instance))
+
+    if update_fields is not None and not set(update_fields) & set(FILTER_OPTION_FIELDS):
+        return
+    if created or old is None:
+        changed = _is_active(new)
+    else:
+        changed = old != new and (_is_active(old) or _is_active(new))
+    if changed:
+        invalidate_filter_options()
+
+
+@receiver(post_delete, sender=Listing)
+def listing_deleted(sender, instance, **kwargs):
+    listing_id = instance.pk
+    transaction.on_commit(lambda: suggest_index.remove_listing(listing_id))
+    invalidate_feed()
+
+    if _is_active(_filter_state(instance)):
+        invalidate_filter_options()
+
+
+@receiver(post_save, sender=Watchlist)
+def watchlist_saved(sender, instance, created, **kwargs):
+    if created:
+        invalidate_saved_listing_ids(instance.user_id)
+        Listing.objects.filter(pk=instance.listing_id).update(
+            save_count=F("save_count") + 1
+        )
+
+
+@receiver(post_delete, sender=Watchlist)
+def watchlist_deleted(sender, instance, origin=None, **kwargs):
+    invalidate_saved_listing_ids(instance.user_id)
+    if isinstance(origin, Listing) and origin.pk == instance.listing_id:
+        return  # the listing itself is going away
+    Listing.objects.filter(pk=instance.listing_id, save_count__gt=0).update(
+        save_count=F("save_count") - 1
+    )
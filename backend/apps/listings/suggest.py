@@ -0,0 +1,206 @@
+"""
+In-process prefix index behind GET /api/v1/listings/suggest/?q=.
+
+The index is a sorted array of (key, kind, text) rows searched with bisect.
+Keys are casefolded and every word of a title gets its own row, so "lam"
+suggests "Desk lamp" as well as "Lamp shade". It covers the titles and
+categories of active listings.
+
+Lifecycle:
+- built from the database on first use (one query)
+- kept current by apps.listings.signals, which call update_listing() /
+  remove_listing() after each commit in this process
+- rebuilt after REBUILD_INTERVAL (plus up to REBUILD_JITTER of it, so
+  worker processes do not all reload at once) to pick up writes made by
+  other worker processes or by queryset.update(). One request per process
+  rebuilds; concurrent lookups keep using the stale index meanwhile.
+
+Lookups never touch the database.
+"""
+
+import bisect
+import random
+import re
+import threading
+import time
+
+from .models import Listing
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+REBUILD_INTERVAL = 5 * 60  # seconds
+REBUILD_JITTER = 0.2  # fraction of REBUILD_INTERVAL
+# Rows scanned per lookup; bounds latency for very short prefixes
+SCAN_LIMIT = 500
+
+TITLE = "title"
+CATEGORY = "category"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text):
+    """Casefold and collapse whitespace"""
+    return " ".join((text or "").split()).casefold()
+
+
+def _keys(text):
+    """Index keys for a text: the whole string, then each later word onward"""
+    norm = normalize(text)
+    keys = [norm]
+    for match in _WORD_RE.finditer(norm):
+        if match.start() > 0:
+            keys.append(norm[match.start() :])
+    return keys
+
+
+def listing_terms(listing):
+    """The (kind, text) suggestions one listing contributes"""
+    if listing.status != "active":
+        return ()
+    terms = []
+    if normalize(listing.title):
+        terms.append((TITLE, listing.title.strip()))
+    if normalize(listing.category):
+        terms.append((CATEGORY, listing.category.strip()))
+    return tuple(terms)
+
+
+class SuggestIndex:
+    def __init__(self, loader=None, rebuild_interval=REBUILD_INTERVAL):
+        self._loader = loader or _load_active_listings
+        self._rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        # Held while loading from the database; never held by lookups
+        self._rebuild_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything; the next lookup rebuilds from the database"""
+        with self._lock:
+            self._rows = []  # sorted (key, kind, text)
+            self._counts = {}  # (kind, text) -> number of active listings
+            self._by_listing = {}  # listing_id -> terms
+            self._built_at = None
+            self._stale_at = None
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def rebuild(self):
+        """Reload all active listings in one query"""
+        by_listing = {}
+        counts = {}
+        for listing in self._loader():
+            terms = listing_terms(listing)
+            if terms:
+                by_listing[listing.pk] = terms
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+        rows = sorted((key, kind, text) for kind, text in counts for key in _keys(text))
+        built_at = time.monotonic()
+        jitter = 1 + random.random() * REBUILD_JITTER
+        with self._lock:
+            self._rows, self._counts, self._by_listing = rows, counts, by_listing
+            self._built_at = built_at
+            self._stale_at = built_at + self._rebuild_interval * jitter
+
+    def _ensure_fresh(self):
+        if self._built_at is None:
+            # Nothing to serve yet: wait for the build in progress, if any
+            with self._rebuild_lock:
+                if self._built_at is None:
+                    self.rebuild()
+            return
+        if time.monotonic() < self._stale_at:
+            return
+        # Stale: the first caller rebuilds, the others serve the old index
+        if self._rebuild_lock.acquire(blocking=False):
+            try:
+                if time.monotonic() >= self._stale_at:
+                    self.rebuild()
+            finally:
+                self._rebuild_lock.release()
+
+    def _add_term(self, term):
+        self._counts[term] = self._counts.get(term, 0) + 1
+        if self._counts[term] == 1:
+            kind, text = term
+            for key in _keys(text):
+                bisect.insort(self._rows, (key, kind, text))
+
+    def _remove_term(self, term):
+        count = self._counts.get(term, 0) - 1
+        if count > 0:
+            self._counts[term] = count
+            return
+        self._counts.pop(term, None)
+        kind, text = term
+        for key in _keys(text):
+            row = (key, kind, text)
+            i = bisect.bisect_left(self._rows, row)
+            if i < len(self._rows) and self._rows[i] == row:
+                del self._rows[i]
+
+    def update_listing(self, listing):
+        """Re-index one listing after it was saved"""
+        terms = listing_terms(listing)
+        with self._lock:
+            if not self.is_built:
+                return  # the first lookup will load it from the database
+            old = self._by_listing.pop(listing.pk, ())
+            if terms:
+                self._by_listing[listing.pk] = terms
+            for term in old:
+                if term not in terms:
+                    self._remove_term(term)
+            for term in terms:
+                if term not in old:
+                    self._add_term(term)
+
+    def remove_listing(self, listing_id):
+        """Drop one listing after it was deleted"""
+        with self._lock:
+            for term in self._by_listing.pop(listing_id, ()):
+                self._remove_term(term)
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """
+        Return up to `limit` suggestions for a prefix.
+
+        Whole-string prefix matches come before mid-title word matches,
+        then more common suggestions first, then alphabetical.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self._ensure_fresh()
+
+        with self._lock:
+            rows, counts = self._rows, self._counts
+            start = bisect.bisect_left(rows, (prefix,))
+            matches = {}
+            for key, kind, text in rows[start : start + SCAN_LIMIT]:
+                if not key.startswith(prefix):
+                    break
+                leading = key == normalize(text)
+                term = (kind, text)
+                if term not in matches or leading:
+                    matches[term] = (not leading, -counts.get(term, 0), text.casefold())
+
+        results, seen = [], set()
+        for kind, text in sorted(matches, key=matches.get):
+            if (kind, text.casefold()) not in seen:
+                seen.add((kind, text.casefold()))
+                results.append({"text": text, "type": kind})
+        return results[:limit]
+
+
+def _load_active_listings():
+    return Listing.objects.filter(status="active").only(
+        "listing_id", "title", "category", "status"
+    )
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,176 @@
+"""
+Tests for the presign/confirm direct-to-S3 image upload endpoints, run
+against the in-memory S3 stand-in (fake_s3 fixture).
+"""
+
+import io
+
+import pytest
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.listings.models import ImageProcessingJob, Listing, ListingImage
+from tests.factories.factories import ListingFactory, ListingImageFactory, UserFactory
+
+
+def _jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def owner_client():
+    listing = ListingFactory()
+    client = APIClient()
+    client.force_authenticate(user=listing.user)
+    return client, listing
+
+
+def _presign(client, listing, content_type="image/jpeg"):
+    return client.post(
+        f"/api/v1/listings/{listing.listing_id}/images/presign/",
+        {"content_type": content_type},
+        format="json",
+    )
+
+
+def _confirm(client, listing, token):
+    return client.post(
+        f"/api/v1/listings/{listing.listing_id}/images/confirm/",
+        {"upload_token": token},
+        format="json",
+    )
+
+
+def _presign_and_upload(fake_s3, client, listing, data=None):
+    presigned = _presign(client, listing).json()
+    fake_s3.put_object(
+        Bucket="test-bucket",
+        Key=presigned["key"],
+        Body=data or _jpeg_bytes(),
+        ContentType="image/jpeg",
+    )
+    return presigned
+
+
+@pytest.mark.django_db
+class TestListingImagePresign:
+    def test_owner_gets_presigned_post(self, fake_s3, owner_client):
+        client, listing = owner_client
+
+        response = _presign(client, listing)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["key"].startswith(f"listings/{listing.listing_id}/")
+        assert data["upload"]["method"] == "POST"
+        assert data["upload"]["fields"]["key"] == data["key"]
+        assert data["upload_token"]
+
+    def test_non_owner_forbidden(self, fake_s3, owner_client):
+        _, listing = owner_client
+        client = APIClient()
+        client.force_authenticate(user=UserFactory())
+
+        response = _presign(client, listing)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert fake_s3.presigned == []
+
+    def test_unauthenticated(self, fake_s3, owner_client):
+        _, listing = owner_client
+        response = _presign(APIClient(), listing)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_invalid_content_type(self, fake_s3, owner_client):
+        client, listing = owner_client
+        response = _presign(client, listing, content_type="image/svg+xml")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "content_type" in response.json()
+
+    def test_full_listing_rejected(self, fake_s3, owner_client):
+        client, listing = owner_client
+        ListingImageFactory.create_batch(10, listing=listing)
+
+        response = _presign(client, listing)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestListingImageConfirm:
+    def test_confirm_attaches_image_and_queues_variants(self, fake_s3, owner_client):
+        client, listing = owner_client
+        presigned = _presign_and_upload(fake_s3, client, listing)
+
+        response = _confirm(client, listing, presigned["upload_token"])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        image = ListingImage.objects.get(listing=listing)
+        assert response.json()["image_id"] == image.image_id
+        assert image.image_url.endswith(presigned["key"])
+        assert image.is_primary
+        assert image.display_order == 0
+        assert ImageProcessingJob.objects.filter(image=image).exists()
+
+        listing = Listing.objects.get(pk=listing.pk)
+        assert listing.image_count == 1
+        assert listing.primary_image_url == image.image_url
+
+    def test_confirm_appends_after_existing_images(self, fake_s3, owner_client):
+        client, listing = owner_client
+        ListingImageFactory(listing=listing, display_order=3, is_primary=True)
+        presigned = _presign_and_upload(fake_s3, client, listing)
+
+        response = _confirm(client, listing, presigned["upload_token"])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["display_order"] == 4
+        assert response.json()["is_primary"] is False
+
+    def test_confirm_twice_returns_existing_image(self, fake_s3, owner_client):
+        client, listing = owner_client
+        presigned = _presign_and_upload(fake_s3, client, listing)
+
+        first = _confirm(client, listing, presigned["upload_token"])
+        second = _confirm(client, listing, presigned["upload_token"])
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json()["image_id"] == first.json()["image_id"]
+        assert ListingImage.objects.filter(listing=listing).count() == 1
+
+    def test_confirm_rejects_invalid_object(self, fake_s3, owner_client):
+        client, listing = owner_client
+        presigned = _presign_and_upload(
+            fake_s3, client, listing, data=b"definitely not a jpeg"
+        )
+
+        response = _confirm(client, listing, presigned["upload_token"])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "upload_token" in response.json()
+        assert not ListingImage.objects.filter(listing=listing).exists()
+        assert presigned["key"] not in fake_s3.objects
+
+    def test_confirm_rejects_token_for_another_listing(self, fake_s3, owner_client):
+        client, listing = owner_client
+        other = ListingFactory(user=listing.user)
+        presigned = _presign_and_upload(fake_s3, client, other)
+
+        response = _confirm(client, listing, presigned["upload_token"])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not ListingImage.objects.exists()
+
+    def test_confirm_when_listing_filled_up_meanwhile(self, fake_s3, owner_client):
+        client, listing = owner_client
+        presigned = _presign_and_upload(fake_s3, client, listing)
+        ListingImageFactory.create_batch(10, listing=listing)
+
+        response = _confirm(client, listing, presigned["upload_token"])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert ListingImage.objects.filter(listing=listing).count() == 10
+        assert presigned["key"] not in fake_s3.objects
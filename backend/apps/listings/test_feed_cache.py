@@ -0,0 +1,228 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.listings import feed_cache
+from apps.listings.filters import ListingFilter
+from tests.factories.factories import ListingFactory, UserFactory
+
+LIST_URL = "/api/v1/listings/"
+
+
+def _get(client, params):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(LIST_URL, params)
+    assert response.status_code == 200
+    counts = [q for q in ctx.captured_queries if "COUNT(" in q["sql"].upper()]
+    return response, len(counts)
+
+
+class TestCanonicalParams:
+    def test_multi_value_forms_are_equivalent(self):
+        forms = [
+            "categories=Books,Furniture",
+            "categories=Furniture&categories=Books",
+            "categories=Books, Furniture,Books&categories=",
+        ]
+
+        canonical = [feed_cache.canonical_params(QueryDict(f)) for f in forms]
+
+        assert canonical == [[("categories", "Books,Furniture")]] * 3
+
+    def test_keeps_filter_params_only_sorted(self):
+        params = QueryDict("utm_source=x&page=2&max_price=5&category=A&category=B")
+
+        assert feed_cache.canonical_params(params) == [
+            ("category", "B"),
+            ("max_price", "5"),
+        ]
+
+    def test_filter_params_cover_listing_filter(self):
+        assert set(ListingFilter.base_filters) <= set(feed_cache.FILTER_PARAMS)
+
+
+@pytest.mark.django_db
+class TestCachedCount:
+    def test_pages_share_one_count(self):
+        ListingFactory.create_batch(5)
+        client = APIClient()
+
+        first, first_counts = _get(client, {"page_size": 2})
+        second, second_counts = _get(client, {"page_size": 2, "page": 2})
+
+        assert (first_counts, second_counts) == (1, 0)
+        assert first.data["count"] == second.data["count"] == 5
+        assert second.data["count_is_estimate"] is False
+
+    def test_equivalent_filters_share_one_count(self):
+        ListingFactory(category="Books")
+        ListingFactory(category="Furniture")
+        client = APIClient()
+
+        _, first_counts = _get(client, {"categories": "Books,Furniture"})
+        response, second_counts = _get(client, {"categories": "Furniture,Books"})
+
+        assert (first_counts, second_counts) == (1, 0)
+        assert response.data["count"] == 2
+
+    def test_listing_write_invalidates_count(self):
+        ListingFactory.create_batch(2)
+        client = APIClient()
+        _get(client, {})
+
+        ListingFactory()
+        response, counts = _get(client, {})
+
+        assert counts == 1
+        assert response.data["count"] == 3
+        assert response.data["count_is_estimate"] is False
+
+    def test_large_count_is_served_as_estimate_after_write(self):
+        ListingFactory.create_batch(3)
+        client = APIClient()
+        with patch.object(feed_cache, "ESTIMATE_THRESHOLD", 2):
+            _get(client, {"page_size": 2})
+            ListingFactory()
+            response, counts = _get(client, {"page_size": 2})
+
+        assert counts == 0
+        assert response.data["count"] == 3
+        assert response.data["count_is_estimate"] is True
+
+    def test_page_past_low_estimate_is_served(self):
+        ListingFactory.create_batch(3)
+        client = APIClient()
+        with patch.object(feed_cache, "ESTIMATE_THRESHOLD", 2):
+            _get(client, {"page_size": 2})
+            ListingFactory.create_batch(2)
+            # The estimate (3) says two pages; there are three
+            last, counts = _get(client, {"page_size": 2, "page": 3})
+
+        assert counts == 1
+        assert last.data["count"] == 5
+        assert last.data["count_is_estimate"] is False
+        assert len(last.data["results"]) == 1
+
+    def test_full_last_page_of_low_estimate_links_next(self):
+        ListingFactory.create_batch(3)
+        client = APIClient()
+        with patch.object(feed_cache, "ESTIMATE_THRESHOLD", 2):
+            _get(client, {"page_size": 2})
+            ListingFactory.create_batch(2)
+            # The estimate leaves one row for page 2; it holds two
+            response, counts = _get(client, {"page_size": 2, "page": 2})
+
+        assert counts == 1
+        assert response.data["count"] == 5
+        assert "page=3" in response.data["next"]
+
+    def test_page_past_exact_count_is_not_found(self):
+        ListingFactory.create_batch(3)
+
+        response = APIClient().get(LIST_URL, {"page_size": 2, "page": 3})
+
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestBrowseResponseCache:
+    def test_repeat_request_is_served_from_cache(self):
+        ListingFactory.create_batch(3)
+        client = APIClient()
+
+        first = client.get(LIST_URL, {"ordering": "price"})
+        with CaptureQueriesContext(connection) as ctx:
+            second = client.get(LIST_URL, {"ordering": "price"})
+
+        assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+        assert len(ctx.captured_queries) == 0
+        assert second.data == first.data
+
+    def test_equivalent_query_strings_share_an_entry(self):
+        ListingFactory(category="Books")
+        client = APIClient()
+
+        client.get(f"{LIST_URL}?categories=Books,Furniture&page_size=5&utm=a")
+        response = client.get(
+            f"{LIST_URL}?page_size=5&categories=Furniture&categories=Books,Books"
+        )
+
+        assert response["X-Cache"] == "HIT"
+
+    def test_page_and_ordering_are_part_of_the_key(self):
+        ListingFactory.create_batch(3)
+        client = APIClient()
+        client.get(LIST_URL, {"page_size": 2})
+
+        assert client.get(LIST_URL, {"page_size": 2, "page": 2})["X-Cache"] == "MISS"
+        response = client.get(LIST_URL, {"page_size": 2, "ordering": "-price"})
+        assert response["X-Cache"] == "MISS"
+
+    def test_links_are_built_per_request(self, settings):
+        settings.ALLOWED_HOSTS = ["a.test", "b.test"]
+        ListingFactory.create_batch(3)
+        client = APIClient()
+        client.get(LIST_URL, {"page_size": 2, "utm": "mail"}, HTTP_HOST="a.test")
+
+        response = client.get(LIST_URL, {"page_size": 2}, HTTP_HOST="b.test")
+
+        assert response["X-Cache"] == "HIT"
+        assert response.data["next"] == (
+            "http://b.test/api/v1/listings/?page=2&page_size=2"
+        )
+        assert response.data["count"] == 3
+
+    def test_cursor_links_are_built_per_request(self):
+        ListingFactory.create_batch(3)
+        client = APIClient()
+        first = client.get(
+            LIST_URL, {"pagination": "cursor", "page_size": 2, "utm": "mail"}
+        )
+
+        response = client.get(LIST_URL, {"pagination": "cursor", "page_size": 2})
+
+        assert response["X-Cache"] == "HIT"
+        assert "utm" in first.data["next"] and "utm" not in response.data["next"]
+        assert response.data["results"] == first.data["results"]
+        assert set(response.data) == {"next", "previous", "results"}
+
+    def test_listing_write_invalidates(self):
+        ListingFactory()
+        client = APIClient()
+        client.get(LIST_URL)
+
+        ListingFactory()
+        response = client.get(LIST_URL)
+
+        assert response["X-Cache"] == "MISS"
+        assert response.data["count"] == 2
+
+    def test_authenticated_requests_bypass_cache(self):
+        ListingFactory()
+        client = APIClient()
+        client.force_authenticate(user=UserFactory())
+        client.get(LIST_URL)
+
+        assert "X-Cache" not in client.get(LIST_URL)
+
+    def test_hits_and_misses_are_counted(self):
+        ListingFactory()
+        client = APIClient()
+        for _ in range(3):
+            client.get(LIST_URL)
+        client.get(LIST_URL, {"page_size": 1})
+
+        stats = feed_cache.browse_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (2, 2)
+        assert stats["hit_rate"] == 0.5
+
+        out = StringIO()
+        call_command("browse_cache_stats", "--reset", stdout=out)
+        assert "hits=2 misses=2 hit_rate=50.0%" in out.getvalue()
+        assert feed_cache.browse_cache_stats()["hits"] == 0
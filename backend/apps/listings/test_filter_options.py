@@ -0,0 +1,120 @@
+"""
+Tests for the cached filter-options payload, its signal-based invalidation
+and conditional GET support.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.listings.models import Listing
+from tests.factories.factories import ListingFactory
+
+URL = "/api/v1/listings/filter-options/"
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+def _get(client, **headers):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(URL, **headers)
+    return response, len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestFilterOptionsCache:
+    def test_second_request_is_served_from_cache(self, client):
+        ListingFactory(category="Bikes", dorm_location="Some Loft")
+
+        first, first_queries = _get(client)
+        second, second_queries = _get(client)
+
+        assert first_queries == 2
+        assert second_queries == 0
+        assert first.json() == second.json()
+        assert "Bikes" in second.json()["categories"]
+        assert "Some Loft" in second.json()["dorm_locations"]["other"]
+
+    def test_relevant_change_invalidates(self, client):
+        listing = ListingFactory(category="Bikes")
+        _get(client)
+
+        listing.category = "Skates"
+        listing.save()
+
+        response, queries = _get(client)
+        assert queries == 2
+        assert "Skates" in response.json()["categories"]
+        assert "Bikes" not in response.json()["categories"]
+
+    def test_status_change_and_delete_invalidate(self, client):
+        listing = ListingFactory(category="Bikes")
+        _get(client)
+
+        listing.status = "sold"
+        listing.save()
+        response, _ = _get(client)
+        assert "Bikes" not in response.json()["categories"]
+
+        listing.status = "active"
+        listing.save()
+        response, _ = _get(client)
+        assert "Bikes" in response.json()["categories"]
+
+        listing.delete()
+        response, _ = _get(client)
+        assert "Bikes" not in response.json()["categories"]
+
+    def test_unrelated_changes_keep_cache(self, client):
+        listing = ListingFactory(category="Bikes")
+        ListingFactory(category="Skates", status="sold")
+        _get(client)
+
+        listing.title = "New title"
+        listing.price = 12
+        listing.save()
+        # A listing that is neither active before nor after never matters
+        ListingFactory(category="Kites", status="inactive")
+        Listing.objects.get(category="Skates").delete()
+
+        _, queries = _get(client)
+        assert queries == 0
+
+
+@pytest.mark.django_db
+class TestFilterOptionsConditionalGet:
+    def test_validators_present(self, client):
+        response, _ = _get(client)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"].startswith('"')
+        assert response["Last-Modified"]
+        assert "max-age" in response["Cache-Control"]
+
+    def test_if_none_match_returns_304(self, client):
+        etag = _get(client)[0]["ETag"]
+
+        response, queries = _get(client, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response["ETag"] == etag
+        assert queries == 0
+
+    def test_if_modified_since_returns_304(self, client):
+        last_modified = _get(client)[0]["Last-Modified"]
+
+        response, _ = _get(client, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_stale_etag_gets_full_response(self, client):
+        etag = _get(client)[0]["ETag"]
+        ListingFactory(category="Bikes")
+
+        response, _ = _get(client, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert "Bikes" in response.json()["categories"]
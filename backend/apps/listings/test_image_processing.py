@@ -0,0 +1,291 @@
+"""
+Tests for listing image variants: rendering, the DB-backed processing queue
+and the process_image_jobs worker command.
+"""
+
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.listings.image_processing import (
+    MAX_ATTEMPTS,
+    DatabaseImageQueue,
+    InlineImageQueue,
+    render_variant,
+)
+from apps.listings.models import (
+    ImageProcessingJob,
+    Listing,
+    ListingImage,
+    S3DeletionJob,
+)
+from apps.listings.serializers import CompactListingSerializer
+from tests.factories.factories import ListingFactory, ListingImageFactory, UserFactory
+from utils.s3_service import get_s3_service
+
+ORIENTATION = 0x0112
+GPS_IFD = 0x8825
+
+
+def _jpeg_bytes(size=(1600, 800), orientation=None, mode="RGB", fmt="JPEG"):
+    image = Image.new(mode, size, color=(255, 0, 0, 128)[: len(mode)])
+    exif = Image.Exif()
+    if orientation:
+        exif[ORIENTATION] = orientation
+    exif[GPS_IFD] = {1: "N", 2: (40.0, 43.0, 50.0)}
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class FakeStorage:
+    """Stands in for s3_service's download/upload of variants"""
+
+    def __init__(self, data):
+        self.data = data
+        self.uploaded = {}
+        self.delete_calls = []
+        self.delete_errors = {}
+
+    def download_image(self, image_url):
+        return self.data
+
+    def variant_key(self, image_url, variant, extension):
+        return f"{image_url.rsplit('.', 1)[0]}_{variant}.{extension}"
+
+    def upload_bytes(self, data, key, content_type):
+        self.uploaded[key] = data
+        return f"https://cdn/{key}"
+
+    def delete_images(self, image_urls):
+        image_urls = list(image_urls)
+        self.delete_calls.append(image_urls)
+        return {
+            url: self.delete_errors[url]
+            for url in image_urls
+            if url in self.delete_errors
+        }
+
+
+@pytest.fixture
+def storage():
+    fake = FakeStorage(_jpeg_bytes())
+    with patch("apps.listings.image_processing.s3_service", fake):
+        yield fake
+
+
+class TestRenderVariant:
+    def test_resizes_and_strips_metadata(self):
+        out = Image.open(io.BytesIO(render_variant(_jpeg_bytes(), 400)))
+        assert out.format == "WEBP"
+        assert out.size == (400, 200)
+        assert not out.getexif()
+
+    def test_applies_exif_orientation_before_stripping(self):
+        # Orientation 6 = rotate 90 degrees: landscape pixels display as portrait
+        data = _jpeg_bytes(size=(1600, 800), orientation=6)
+        out = Image.open(io.BytesIO(render_variant(data, 400)))
+        assert out.size == (200, 400)
+
+    def test_never_upscales_and_keeps_alpha(self):
+        data = _jpeg_bytes(size=(100, 50), mode="RGBA", fmt="PNG")
+        out = Image.open(io.BytesIO(render_variant(data, 400)))
+        assert out.size == (100, 50)
+        assert out.mode == "RGBA"
+
+
+@pytest.mark.django_db
+class TestDatabaseImageQueue:
+    def test_run_once_stores_variants_and_thumbnail(self, storage):
+        listing = ListingFactory()
+        image = ListingImageFactory(listing=listing, image_url="https://b/l/1/a.jpg")
+        queue = DatabaseImageQueue()
+        queue.enqueue([image])
+        queue.enqueue([image])  # duplicates are ignored
+        assert ImageProcessingJob.objects.count() == 1
+
+        assert queue.run_once() == (1, 0)
+
+        image.refresh_from_db()
+        assert image.thumbnail_url == "https://cdn/https://b/l/1/a_thumbnail.webp"
+        assert image.medium_url == "https://cdn/https://b/l/1/a_medium.webp"
+        assert not ImageProcessingJob.objects.exists()
+
+        listing.refresh_from_db()
+        assert listing.primary_image_url == "https://b/l/1/a.jpg"
+        assert listing.primary_thumbnail_url == image.thumbnail_url
+        card = CompactListingSerializer(listing).data
+        assert card["primary_image"] == image.thumbnail_url
+
+    def test_failures_back_off_then_give_up(self, storage):
+        image = ListingImageFactory()
+        queue = DatabaseImageQueue()
+        queue.enqueue([image])
+        storage.data = b"not an image"
+
+        assert queue.run_once() == (0, 1)
+        job = ImageProcessingJob.objects.get()
+        assert job.status == "pending"
+        assert job.attempts == 1
+        assert job.run_after > timezone.now()
+        assert job.last_error
+        # Not due yet
+        assert queue.run_once() == (0, 0)
+
+        ImageProcessingJob.objects.update(attempts=MAX_ATTEMPTS - 1)
+        ImageProcessingJob.objects.update(run_after=timezone.now())
+        assert queue.run_once() == (0, 1)
+        job.refresh_from_db()
+        assert job.status == "failed"
+        assert queue.claim(10) == []
+
+    def test_stale_running_job_is_reclaimed(self, storage):
+        image = ListingImageFactory()
+        ImageProcessingJob.objects.create(
+            image=image,
+            status="running",
+            attempts=1,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        fresh = ListingImageFactory()
+        ImageProcessingJob.objects.create(
+            image=fresh, status="running", attempts=1, locked_at=timezone.now()
+        )
+
+        claimed = DatabaseImageQueue().claim(10)
+        assert [job.image_id for job in claimed] == [image.pk]
+        assert claimed[0].attempts == 2
+
+    def test_deleting_image_drops_its_job(self):
+        image = ListingImageFactory()
+        DatabaseImageQueue().enqueue([image])
+        image.delete()
+        assert not ImageProcessingJob.objects.exists()
+
+
+@pytest.mark.django_db
+class TestS3DeletionQueue:
+    def test_run_deletions_deletes_in_one_batch(self, storage):
+        queue = DatabaseImageQueue()
+        queue.delete_later(["https://b/1.jpg", None, "https://b/2.jpg"])
+
+        assert queue.run_deletions() == (2, 0)
+        assert storage.delete_calls == [["https://b/1.jpg", "https://b/2.jpg"]]
+        assert not S3DeletionJob.objects.exists()
+        assert queue.run_deletions() == (0, 0)
+
+    def test_failed_deletes_retry_then_dead_letter(self, storage):
+        queue = DatabaseImageQueue()
+        queue.delete_later(["https://b/ok.jpg", "https://b/stuck.jpg"])
+        storage.delete_errors = {"https://b/stuck.jpg": "AccessDenied: no"}
+
+        assert queue.run_deletions() == (1, 1)
+        job = S3DeletionJob.objects.get()
+        assert job.image_url == "https://b/stuck.jpg"
+        assert job.status == "pending"
+        assert job.run_after > timezone.now()
+        assert job.last_error == "AccessDenied: no"
+        # Not due yet
+        assert queue.run_deletions() == (0, 0)
+
+        S3DeletionJob.objects.update(
+            attempts=MAX_ATTEMPTS - 1, run_after=timezone.now()
+        )
+        assert queue.run_deletions() == (0, 1)
+        job.refresh_from_db()
+        assert job.status == "failed"
+        assert queue.claim_deletions(10) == []
+
+    def test_rolled_back_delete_queues_nothing(self):
+        from django.db import transaction
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                DatabaseImageQueue().delete_later(["https://b/1.jpg"])
+                raise RuntimeError
+
+        assert not S3DeletionJob.objects.exists()
+
+    def test_inline_queue_records_failures_for_retry(
+        self, storage, django_capture_on_commit_callbacks
+    ):
+        storage.delete_errors = {"https://b/stuck.jpg": "SlowDown: later"}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            InlineImageQueue().delete_later(["https://b/ok.jpg", "https://b/stuck.jpg"])
+
+        assert storage.delete_calls == [["https://b/ok.jpg", "https://b/stuck.jpg"]]
+        job = S3DeletionJob.objects.get()
+        assert job.image_url == "https://b/stuck.jpg"
+        assert job.attempts == 1
+        assert job.status == "pending"
+
+    def test_worker_command_drains_deletions(self, storage):
+        DatabaseImageQueue().delete_later(["https://b/1.jpg"])
+        out = io.StringIO()
+
+        call_command("process_image_jobs", "--once", stdout=out)
+
+        assert storage.delete_calls == [["https://b/1.jpg"]]
+        assert "deleted 1 files, 0 failed" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestImageProcessingWiring:
+    def test_create_listing_queues_new_images(self):
+        client = APIClient()
+        client.force_authenticate(user=UserFactory())
+        photo = io.BytesIO(_jpeg_bytes(size=(20, 20)))
+        photo.name = "photo.jpg"
+
+        with patch.object(
+            get_s3_service(),
+            "upload_image",
+            return_value="https://b/listings/1/photo.jpg",
+        ):
+            response = client.post(
+                "/api/v1/listings/",
+                {
+                    "title": "Lamp",
+                    "category": "Furniture",
+                    "description": "Bright",
+                    "price": "10.00",
+                    "images": [photo],
+                },
+                format="multipart",
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        listing = Listing.objects.get(pk=response.data["listing_id"])
+        assert list(
+            ImageProcessingJob.objects.values_list("image__listing", flat=True)
+        ) == [listing.pk]
+
+    def test_inline_queue_runs_after_commit(
+        self, storage, django_capture_on_commit_callbacks
+    ):
+        image = ListingImageFactory()
+        with django_capture_on_commit_callbacks(execute=True):
+            InlineImageQueue().enqueue([image])
+        image.refresh_from_db()
+        assert image.thumbnail_url.endswith("_thumbnail.webp")
+
+    def test_worker_command_backfills_and_drains(self, storage):
+        processed = ListingImageFactory()
+        ListingImage.objects.filter(pk=processed.pk).update(thumbnail_url="t.webp")
+        pending = ListingImageFactory()
+
+        out = io.StringIO()
+        call_command("process_image_jobs", "--enqueue-missing", "--once", stdout=out)
+
+        assert "Queued 1 unprocessed images" in out.getvalue()
+        assert "Processed 1 images, 0 failed" in out.getvalue()
+        pending.refresh_from_db()
+        assert pending.medium_url.endswith("_medium.webp")
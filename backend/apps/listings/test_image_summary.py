@@ -0,0 +1,188 @@
+"""
+Tests for the denormalized Listing.primary_image_url / image_count columns
+and the sync_listing_images management command.
+"""
+
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.listings.models import Listing
+from tests.factories.factories import ListingFactory, ListingImageFactory, UserFactory
+from utils.s3_service import get_s3_service
+
+
+def _image_file(name="photo.jpg"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (10, 10), color="red").save(buffer, format="JPEG")
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+@pytest.fixture
+def owner_client():
+    user = UserFactory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client, user
+
+
+@pytest.mark.django_db
+class TestListingImageSummarySync:
+    def test_create_sets_primary_image_and_count(self, owner_client):
+        client, _ = owner_client
+        with patch.object(get_s3_service(), "upload_image") as mock_upload:
+            # Uploads run concurrently, so derive the URL from the file
+            mock_upload.side_effect = lambda f, *args, **kwargs: (
+                f"http://example.com/{f.name}"
+            )
+            response = client.post(
+                "/api/v1/listings/",
+                {
+                    "title": "Lamp",
+                    "category": "Furniture",
+                    "description": "Bright",
+                    "price": "10.00",
+                    "images": [_image_file("a.jpg"), _image_file("b.jpg")],
+                },
+                format="multipart",
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        listing = Listing.objects.get(pk=response.data["listing_id"])
+        assert listing.primary_image_url == "http://example.com/a.jpg"
+        assert listing.image_count == 2
+
+    def test_remove_primary_falls_back_to_next_image(self, owner_client):
+        client, user = owner_client
+        listing = ListingFactory(user=user)
+        first = ListingImageFactory(
+            listing=listing, image_url="first.jpg", display_order=0, is_primary=True
+        )
+        ListingImageFactory(listing=listing, image_url="second.jpg", display_order=1)
+
+        with patch("utils.s3_service.s3_service.delete_image", return_value=True):
+            response = client.patch(
+                f"/api/v1/listings/{listing.listing_id}/",
+                {"remove_image_ids": json.dumps([first.image_id])},
+                format="multipart",
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        listing.refresh_from_db()
+        assert listing.primary_image_url == "second.jpg"
+        assert listing.image_count == 1
+
+    def test_add_images_updates_count(self, owner_client):
+        client, user = owner_client
+        listing = ListingFactory(user=user)
+        ListingImageFactory(listing=listing, image_url="old.jpg", is_primary=True)
+
+        with patch.object(
+            get_s3_service(),
+            "upload_image",
+            return_value="http://example.com/new.jpg",
+        ):
+            response = client.patch(
+                f"/api/v1/listings/{listing.listing_id}/",
+                {"new_images": [_image_file()]},
+                format="multipart",
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        listing.refresh_from_db()
+        assert listing.primary_image_url == "old.jpg"
+        assert listing.image_count == 2
+
+    def test_reorder_and_set_primary(self, owner_client):
+        client, user = owner_client
+        listing = ListingFactory(user=user)
+        a = ListingImageFactory(listing=listing, image_url="a.jpg", display_order=0)
+        b = ListingImageFactory(listing=listing, image_url="b.jpg", display_order=1)
+        assert Listing.objects.get(pk=listing.pk).primary_image_url == "a.jpg"
+
+        # Reorder only: with no primary flag the first image wins
+        response = client.patch(
+            f"/api/v1/listings/{listing.listing_id}/",
+            {
+                "update_images": [
+                    {"image_id": a.image_id, "display_order": 1},
+                    {"image_id": b.image_id, "display_order": 0},
+                ]
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert Listing.objects.get(pk=listing.pk).primary_image_url == "b.jpg"
+
+        # Explicit primary flag overrides display order
+        response = client.patch(
+            f"/api/v1/listings/{listing.listing_id}/",
+            {"update_images": [{"image_id": a.image_id, "is_primary": True}]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert Listing.objects.get(pk=listing.pk).primary_image_url == "a.jpg"
+
+    def test_failed_upload_still_syncs_removals(self, owner_client):
+        client, user = owner_client
+        listing = ListingFactory(user=user)
+        doomed = ListingImageFactory(listing=listing, image_url="doomed.jpg")
+
+        with patch(
+            "utils.s3_service.s3_service.delete_image", return_value=True
+        ), patch.object(
+            get_s3_service(),
+            "upload_image",
+            side_effect=Exception("S3 down"),
+        ):
+            response = client.patch(
+                f"/api/v1/listings/{listing.listing_id}/",
+                {
+                    "remove_image_ids": json.dumps([doomed.image_id]),
+                    "new_images": [_image_file()],
+                },
+                format="multipart",
+            )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        listing.refresh_from_db()
+        assert listing.primary_image_url is None
+        assert listing.image_count == 0
+
+
+@pytest.mark.django_db
+class TestSyncListingImagesCommand:
+    def test_verify_reports_drift_and_repair_fixes_it(self):
+        listing = ListingFactory()
+        ListingImageFactory(listing=listing, image_url="real.jpg")
+        Listing.objects.filter(pk=listing.pk).update(
+            primary_image_url="stale.jpg", image_count=5
+        )
+
+        with pytest.raises(CommandError, match="1 of 1 listings"):
+            call_command("sync_listing_images", "--verify", stdout=io.StringIO())
+
+        out = io.StringIO()
+        call_command("sync_listing_images", stdout=out)
+        assert "repaired 1" in out.getvalue()
+
+        listing.refresh_from_db()
+        assert listing.primary_image_url == "real.jpg"
+        assert listing.image_count == 1
+
+        out = io.StringIO()
+        call_command("sync_listing_images", "--verify", stdout=out)
+        assert "All 1 listings in sync" in out.getvalue()
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(CommandError):
+            call_command("sync_listing_images", "--batch-size", "0")
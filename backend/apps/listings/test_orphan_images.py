@@ -0,0 +1,135 @@
+"""
+Tests for the collect_orphan_images command, run against the in-memory S3
+stand-in (fake_s3 fixture).
+"""
+
+import io
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.profiles.models import Profile
+from tests.factories.factories import ListingFactory, ListingImageFactory
+from utils.s3_service import s3_service
+
+
+def _store(fake_s3, key, age=timedelta(days=2)):
+    fake_s3.put_object(Bucket="test-bucket", Key=key, Body=b"x")
+    fake_s3.modified[key] = timezone.now() - age
+    return s3_service.public_url(key)
+
+
+@pytest.fixture
+def bucket(fake_s3):
+    """A listing and a profile with referenced and orphaned objects"""
+    listing = ListingFactory()
+    ListingImageFactory(
+        listing=listing,
+        image_url=_store(fake_s3, f"listings/{listing.pk}/a.jpg"),
+        thumbnail_url=_store(fake_s3, f"listings/{listing.pk}/a_thumbnail.webp"),
+    )
+    _store(fake_s3, f"listings/{listing.pk}/failed-upload.jpg")
+    _store(fake_s3, f"listings/{listing.pk + 1000}/deleted-listing.jpg")
+    _store(fake_s3, f"listings/{listing.pk}/in-flight.jpg", age=timedelta(minutes=5))
+    _store(fake_s3, "listings/not-a-resource.jpg")
+
+    profile = Profile.objects.create(
+        user=listing.user, full_name="Alex", username="alex"
+    )
+    profile.avatar_url = _store(fake_s3, f"profiles/{listing.user_id}/new.png")
+    profile.save()
+    _store(fake_s3, f"profiles/{listing.user_id}/replaced.png")
+    return fake_s3, listing
+
+
+def _orphans(listing):
+    return {
+        f"listings/{listing.pk}/failed-upload.jpg",
+        f"listings/{listing.pk + 1000}/deleted-listing.jpg",
+        f"profiles/{listing.user_id}/replaced.png",
+    }
+
+
+@pytest.mark.django_db
+class TestCollectOrphanImages:
+    def test_deletes_only_old_unreferenced_objects(self, bucket):
+        fake_s3, listing = bucket
+        before = set(fake_s3.objects)
+        out = io.StringIO()
+
+        call_command("collect_orphan_images", "--page-size", "2", stdout=out)
+
+        assert before - set(fake_s3.objects) == _orphans(listing)
+        assert "8 objects: 3 orphaned, deleted 3, 0 failed, 2 skipped" in (
+            out.getvalue()
+        )
+
+    def test_dry_run_reports_without_deleting(self, bucket):
+        fake_s3, listing = bucket
+        before = set(fake_s3.objects)
+        out = io.StringIO()
+
+        call_command("collect_orphan_images", "--dry-run", stdout=out)
+
+        assert set(fake_s3.objects) == before
+        for key in _orphans(listing):
+            assert f"Orphan: {key}" in out.getvalue()
+        assert "would delete 3" in out.getvalue()
+
+    def test_one_delete_request_per_page(self, bucket):
+        fake_s3, listing = bucket
+        with patch.object(
+            fake_s3, "delete_objects", wraps=fake_s3.delete_objects
+        ) as delete_objects:
+            call_command("collect_orphan_images", "--prefix", "listings/")
+
+        (call,) = delete_objects.call_args_list
+        assert {o["Key"] for o in call.kwargs["Delete"]["Objects"]} == {
+            f"listings/{listing.pk}/failed-upload.jpg",
+            f"listings/{listing.pk + 1000}/deleted-listing.jpg",
+        }
+        assert f"profiles/{listing.user_id}/replaced.png" in fake_s3.objects
+
+    def test_checkpoint_resumes_after_interruption(self, bucket, tmp_path):
+        fake_s3, listing = bucket
+        checkpoint = tmp_path / "gc.json"
+        real_list = fake_s3.list_objects_v2
+        calls = []
+
+        def interrupted(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return real_list(**kwargs)
+
+        with patch.object(fake_s3, "list_objects_v2", side_effect=interrupted):
+            with pytest.raises(KeyboardInterrupt):
+                call_command(
+                    "collect_orphan_images",
+                    "--page-size",
+                    "2",
+                    "--checkpoint",
+                    str(checkpoint),
+                )
+        state = json.loads(checkpoint.read_text())
+        first_page_end = state["listings/"]["after"]
+        assert first_page_end and not state["listings/"]["done"]
+
+        with patch.object(fake_s3, "list_objects_v2", wraps=real_list) as list_objects:
+            call_command(
+                "collect_orphan_images",
+                "--page-size",
+                "2",
+                "--checkpoint",
+                str(checkpoint),
+                stdout=io.StringIO(),
+            )
+
+        assert list_objects.call_args_list[0].kwargs["StartAfter"] == first_page_end
+        assert not _orphans(listing) & set(fake_s3.objects)
+        # Finished runs clean up their checkpoint
+        assert not checkpoint.exists()
@@ -0,0 +1,119 @@
+"""
+Keyset (?pagination=cursor) mode of ListingPagination: walking every page
+returns each active listing exactly once in order, and a deep page costs
+the same single query as the first.
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.listings.pagination import _encode_cursor
+from tests.factories.factories import ListingFactory
+
+LIST_URL = "/api/v1/listings/"
+SEARCH_URL = "/api/v1/listings/search/"
+
+
+def _walk(client, url, params):
+    """Follow `next` links from the first page; returns every page"""
+    pages = []
+    response = client.get(url, {**params, "pagination": "cursor"})
+    while True:
+        assert response.status_code == 200
+        pages.append(response.data)
+        if response.data["next"] is None:
+            return pages
+        response = client.get(response.data["next"])
+
+
+def _ids(pages):
+    return [row["listing_id"] for page in pages for row in page["results"]]
+
+
+@pytest.fixture
+def listings(db):
+    # Repeated prices and titles so the listing_id tie-breaker matters
+    rows = [
+        ListingFactory(title=f"Item {i % 3}", price=Decimal(10 + i % 4))
+        for i in range(11)
+    ]
+    ListingFactory(status="sold", price=Decimal("12.00"))
+    return rows
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    @pytest.mark.parametrize("ordering", ["", "price", "-price", "title", "-title"])
+    def test_walk_returns_every_listing_once_in_order(self, listings, ordering):
+        client = APIClient()
+        params = {"page_size": 3}
+        if ordering:
+            params["ordering"] = ordering
+        pages = _walk(client, LIST_URL, params)
+
+        expected = client.get(LIST_URL, {**params, "page_size": 60}).data
+        assert _ids(pages) == [row["listing_id"] for row in expected["results"]]
+        assert len(pages) == 4
+        assert sorted(_ids(pages)) == sorted(listing.pk for listing in listings)
+
+    def test_response_has_no_count(self, listings):
+        response = APIClient().get(LIST_URL, {"pagination": "cursor"})
+
+        assert set(response.data) == {"next", "previous", "results"}
+        assert response.data["previous"] is None
+
+    def test_deep_page_is_one_query(self, listings):
+        client = APIClient()
+        pages = _walk(client, LIST_URL, {"page_size": 2})
+
+        # Measure the database path, not the browse response cache
+        cache.clear()
+        with CaptureQueriesContext(connection) as first:
+            client.get(LIST_URL, {"pagination": "cursor", "page_size": 2})
+        deep = pages[-2]["next"]
+        cache.clear()
+        with CaptureQueriesContext(connection) as last:
+            response = client.get(deep)
+
+        assert response.status_code == 200
+        assert len(first.captured_queries) == len(last.captured_queries) == 1
+        sql = last.captured_queries[0]["sql"].upper()
+        assert "COUNT(" not in sql and "OFFSET" not in sql
+
+    def test_invalid_cursor_is_not_found(self, listings):
+        response = APIClient().get(LIST_URL, {"cursor": "not-a-cursor"})
+
+        assert response.status_code == 404
+
+    def test_cursor_for_another_ordering_is_rejected(self, listings):
+        cursor = _encode_cursor("-created_at", "2026-01-01T00:00:00+00:00", 1)
+        response = APIClient().get(LIST_URL, {"cursor": cursor, "ordering": "price"})
+
+        assert response.status_code == 404
+
+    def test_filters_apply_to_every_page(self, listings):
+        pages = _walk(APIClient(), LIST_URL, {"page_size": 2, "max_price": "11"})
+
+        prices = [Decimal(row["price"]) for page in pages for row in page["results"]]
+        assert prices and all(price <= 11 for price in prices)
+        assert len(prices) == sum(1 for listing in listings if listing.price <= 11)
+
+    def test_search_walks_in_ordering_not_relevance(self, listings):
+        pages = _walk(APIClient(), SEARCH_URL, {"q": "Item", "page_size": 4})
+
+        ids = _ids(pages)
+        assert sorted(ids) == sorted(listing.pk for listing in listings)
+        # Newest first by default, as on the feed
+        assert ids == sorted(ids, reverse=True)
+
+    def test_page_number_mode_is_unchanged(self, listings):
+        response = APIClient().get(LIST_URL, {"page_size": 5, "page": 2})
+
+        assert response.data["count"] == 11
+        assert len(response.data["results"]) == 5
+        assert "page=3" in response.data["next"]
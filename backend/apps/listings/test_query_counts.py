@@ -0,0 +1,118 @@
+"""
+Query-count regression tests for endpoints serialized with
+CompactListingSerializer. Each endpoint must issue a constant number of
+queries regardless of how many listings (and images) are on the page.
+Cards read the denormalized Listing.primary_image_url, so no image
+queries are expected.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.listings.models import Watchlist
+from apps.listings.search import get_search_backend
+from tests.factories.factories import ListingFactory, ListingImageFactory, UserFactory
+
+
+def _make_listings(count, user=None):
+    listings = []
+    for i in range(count):
+        kwargs = {"title": f"Desk {i}"}
+        if user is not None:
+            kwargs["user"] = user
+        listing = ListingFactory(**kwargs)
+        ListingImageFactory(listing=listing, image_url=f"a{i}.jpg", display_order=0)
+        ListingImageFactory(
+            listing=listing, image_url=f"b{i}.jpg", display_order=1, is_primary=True
+        )
+        listings.append(listing)
+    return listings
+
+
+def _count_queries(client, url, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    return len(ctx.captured_queries), response
+
+
+@pytest.mark.django_db
+class TestCompactListingQueryCounts:
+    def test_list_query_count_is_constant(self):
+        client = APIClient()
+        _make_listings(2)
+        small, _ = _count_queries(client, "/api/v1/listings/")
+        _make_listings(8)
+        large, response = _count_queries(client, "/api/v1/listings/")
+
+        assert small == large == 2  # count + listings/users
+        assert all(r["primary_image"].startswith("b") for r in response.data["results"])
+
+    def test_authenticated_list_adds_one_saved_lookup(self):
+        user = UserFactory()
+        client = APIClient()
+        client.force_authenticate(user=user)
+        for listing in _make_listings(2):
+            Watchlist.objects.create(user=user, listing=listing)
+        small, _ = _count_queries(client, "/api/v1/listings/")
+        _make_listings(8)
+        large, response = _count_queries(client, "/api/v1/listings/")
+
+        assert small == large == 3  # count + listings/users + saved ids
+        assert sum(r["is_saved"] for r in response.data["results"]) == 2
+
+    def test_search_query_count_is_constant(self):
+        client = APIClient()
+        get_search_backend()  # one-off index probe, not part of the request cost
+        _make_listings(2)
+        small, _ = _count_queries(client, "/api/v1/listings/search/", {"q": "Desk"})
+        _make_listings(8)
+        large, _ = _count_queries(client, "/api/v1/listings/search/", {"q": "Desk"})
+
+        assert small == large == 2
+
+    def test_user_listings_query_count_is_constant(self):
+        user = UserFactory()
+        client = APIClient()
+        client.force_authenticate(user=user)
+        _make_listings(2, user=user)
+        small, _ = _count_queries(client, "/api/v1/listings/user/")
+        _make_listings(8, user=user)
+        large, response = _count_queries(client, "/api/v1/listings/user/")
+
+        assert small == large == 2  # listings/users + saved ids
+        assert len(response.data) == 10
+
+    def test_watchlist_query_count_is_constant(self):
+        user = UserFactory()
+        client = APIClient()
+        client.force_authenticate(user=user)
+        for listing in _make_listings(2):
+            Watchlist.objects.create(user=user, listing=listing)
+        small, _ = _count_queries(client, "/api/v1/watchlist/")
+        for listing in _make_listings(8):
+            Watchlist.objects.create(user=user, listing=listing)
+        large, response = _count_queries(client, "/api/v1/watchlist/")
+
+        assert small == large == 1  # watchlist/listings/users, no COUNT
+        assert len(response.data) == 10
+
+
+@pytest.mark.django_db
+def test_detail_reads_saved_state_without_extra_queries():
+    user = UserFactory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+    listing = _make_listings(1)[0]
+    Watchlist.objects.create(user=user, listing=listing)
+    client.get(f"/api/v1/listings/{listing.listing_id}/")  # warm unique_viewers
+
+    queries, response = _count_queries(
+        client, f"/api/v1/listings/{listing.listing_id}/"
+    )
+
+    assert queries == 2  # listing/user with is_saved + images
+    assert response.data["is_saved"] is True
+    assert response.data["save_count"] == 1
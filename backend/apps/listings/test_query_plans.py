@@ -0,0 +1,117 @@
+"""
+Query-plan regression tests for the public listing feed: every browse
+scenario of the benchmark_listing_queries command must read listings
+through an index, and sort through one where SCENARIOS says so.
+"""
+
+import io
+
+import pytest
+from django.core.management import call_command
+
+from apps.listings.management.commands.benchmark_listing_queries import (
+    SCENARIOS,
+    SEED_TITLE_PREFIX,
+    plan_problems,
+)
+from apps.listings.models import Listing
+
+
+@pytest.mark.django_db
+def test_feed_plans_use_indexes():
+    out = io.StringIO()
+
+    call_command(
+        "benchmark_listing_queries",
+        "--seed",
+        "500",
+        "--repeat",
+        "1",
+        "--check",
+        stdout=out,
+    )
+
+    assert f"{len(SCENARIOS)} scenarios, 0 with plan problems" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_clear_removes_only_seeded_rows():
+    call_command(
+        "benchmark_listing_queries",
+        "--seed",
+        "20",
+        "--repeat",
+        "1",
+        stdout=io.StringIO(),
+    )
+    kept = Listing.objects.create(
+        title="Real desk", description="d", category="Furniture", price=5
+    )
+
+    call_command("benchmark_listing_queries", "--clear", stdout=io.StringIO())
+
+    assert list(Listing.objects.all()) == [kept]
+    assert not Listing.objects.filter(title__startswith=SEED_TITLE_PREFIX).exists()
+
+
+def _mysql_plan(*rows):
+    """EXPLAIN FORMAT=TRADITIONAL rows as QuerySet.explain() joins them"""
+    return "\n".join(" ".join(str(column) for column in row) for row in rows)
+
+
+@pytest.mark.parametrize(
+    "vendor, plan, index_ordered, expected",
+    [
+        (
+            "sqlite",
+            "SCAN listings\nUSE TEMP B-TREE FOR ORDER BY",
+            True,
+            ["full scan", "sort"],
+        ),
+        ("sqlite", "SCAN listings USING INDEX listings_status_805c52_idx", True, []),
+        (
+            "sqlite",
+            "SEARCH listings USING INDEX x (status=?)\n" "USE TEMP B-TREE FOR ORDER BY",
+            False,
+            [],
+        ),
+        (
+            "postgresql",
+            "Limit\n  ->  Sort\n        ->  Seq Scan on listings",
+            True,
+            ["full scan", "sort"],
+        ),
+        (
+            "mysql",
+            _mysql_plan(
+                (1, "SIMPLE", "listings", None, "ALL", None, None, None, None)
+                + (1000, 10.0, "Using where; Using filesort")
+            ),
+            True,
+            ["full scan", "sort"],
+        ),
+        (
+            "mysql",
+            _mysql_plan(
+                (1, "SIMPLE", "listings", None, "ref", "listings_status_805c52_idx")
+                + ("listings_status_805c52_idx", "82", "const", 500, 100.0, None)
+            ),
+            True,
+            [],
+        ),
+        (
+            # MariaDB has no partitions column; a full scan of a joined
+            # table is not a feed problem
+            "mysql",
+            _mysql_plan(
+                (1, "SIMPLE", "listings", "range", "listings_price_idx")
+                + ("listings_price_idx", "6", None, 40, "Using where; Using filesort"),
+                (1, "SIMPLE", "users", "ALL", "PRIMARY", None, None, None, 3, None),
+            ),
+            False,
+            [],
+        ),
+    ],
+)
+def test_plan_problems(vendor, plan, index_ordered, expected):
+    assert plan_problems(vendor, plan, index_ordered) == expected
@@ -0,0 +1,102 @@
+"""
+Tests for the listing search backends (apps/listings/search.py) behind
+/api/v1/listings/search/ and the list endpoint's ?search=.
+"""
+
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.listings.models import Listing
+from apps.listings.search import (
+    IContainsSearchBackend,
+    SQLiteFTS5SearchBackend,
+    get_search_backend,
+    search_listings,
+    search_terms,
+)
+from tests.factories.factories import ListingFactory
+
+
+def _titles(response):
+    return [row["title"] for row in response.data["results"]]
+
+
+def test_search_terms():
+    assert search_terms("  Desk, LAMP!  ") == ["desk", "lamp"]
+    assert search_terms("***") == []
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    def test_sqlite_uses_fts5_backend(self):
+        assert isinstance(get_search_backend(), SQLiteFTS5SearchBackend)
+
+    def test_prefix_and_all_terms_required(self):
+        ListingFactory(title="Standing desk", description="oak")
+        ListingFactory(title="Desk lamp", description="LED")
+        ListingFactory(title="Lamp shade", description="linen")
+
+        qs = Listing.objects.all()
+        assert set(search_listings(qs, "des").values_list("title", flat=True)) == {
+            "Standing desk",
+            "Desk lamp",
+        }
+        assert list(
+            search_listings(qs, "desk lamp").values_list("title", flat=True)
+        ) == ["Desk lamp"]
+
+    def test_index_follows_updates_and_deletes(self):
+        listing = ListingFactory(title="Bookshelf", description="pine")
+        qs = Listing.objects.all()
+        assert search_listings(qs, "bookshelf").count() == 1
+
+        listing.title = "Wardrobe"
+        listing.save()
+        assert search_listings(qs, "bookshelf").count() == 0
+        assert search_listings(qs, "wardrobe").count() == 1
+
+        Listing.objects.filter(pk=listing.pk).update(description="walnut veneer")
+        assert search_listings(qs, "walnut").count() == 1
+
+        listing.delete()
+        assert search_listings(qs, "wardrobe").count() == 0
+
+    def test_ranked_by_relevance_unless_ordering_given(self):
+        ListingFactory(title="Chair", description="comes with a desk", price=5)
+        ListingFactory(title="Desk", description="Big desk, desk drawers", price=50)
+
+        client = APIClient()
+        r = client.get("/api/v1/listings/search/", {"q": "desk"})
+        assert r.status_code == status.HTTP_200_OK
+        assert _titles(r) == ["Desk", "Chair"]
+
+        r = client.get("/api/v1/listings/search/", {"q": "desk", "ordering": "price"})
+        assert _titles(r) == ["Chair", "Desk"]
+
+    def test_list_endpoint_search_param(self):
+        ListingFactory(title="Mini fridge", category="Electronics")
+        ListingFactory(title="Sofa", category="Furniture")
+
+        r = APIClient().get("/api/v1/listings/", {"search": "fridge"})
+        assert r.status_code == status.HTTP_200_OK
+        assert _titles(r) == ["Mini fridge"]
+
+        r = APIClient().get("/api/v1/listings/", {"search": ""})
+        assert len(r.data["results"]) == 2
+
+    def test_query_without_terms_falls_back_to_substring(self):
+        ListingFactory(title="C++ primer")
+        ListingFactory(title="Python primer")
+
+        qs = Listing.objects.all()
+        assert list(search_listings(qs, "++").values_list("title", flat=True)) == [
+            "C++ primer"
+        ]
+
+    def test_icontains_backend_matches_substrings(self):
+        ListingFactory(title="Bookshelf")
+
+        qs = Listing.objects.all()
+        assert IContainsSearchBackend().search(qs, "kshel").count() == 1
+        assert SQLiteFTS5SearchBackend().search(qs, "kshel").count() == 0
@@ -3,7 +3,7 @@ import json
 from unittest.mock import MagicMock, patch
 
 import pytest
-from apps.listings.models import ListingImage
+from apps.listings.models import ListingImage, S3DeletionJob
 from apps.listings.serializers import (
     CompactListingSerializer,
     JSONSerializerField,
@@ -349,11 +349,15 @@ class TestListingUpdateSerializer:
         assert not serializer.is_valid()
         assert "update_images" in serializer.errors
 
-    def test_update_with_image_deletion_failure(self):
-        """Test that image deletion failures are logged but don't stop update"""
+    def test_update_queues_removed_images_for_s3_deletion(self):
+        """Removed images leave the DB at once; their files are queued"""
         user = UserFactory()
         listing = ListingFactory(user=user)
-        image = ListingImageFactory(listing=listing)
+        image = ListingImageFactory(
+            listing=listing,
+            image_url="http://example.com/a.jpg",
+            thumbnail_url="http://example.com/a_thumbnail.webp",
+        )
         factory = APIRequestFactory()
         request = factory.patch(f"/api/v1/listings/{listing.listing_id}/")
         request.user = user
@@ -365,16 +369,17 @@ class TestListingUpdateSerializer:
             partial=True,
         )
 
-        with patch("apps.listings.serializers.s3_service.delete_image") as mock_delete:
-            mock_delete.side_effect = Exception("S3 delete failed")
-
+        with patch("utils.s3_service.s3_service.delete_image") as mock_delete:
             assert serializer.is_valid()
             updated_listing = serializer.save()
 
-            # Update should succeed
-            assert updated_listing.title == "Updated"
-            # Image should still exist because deletion failed
-            assert ListingImage.objects.filter(image_id=image.image_id).exists()
+        assert updated_listing.title == "Updated"
+        assert not ListingImage.objects.filter(image_id=image.image_id).exists()
+        mock_delete.assert_not_called()
+        assert set(S3DeletionJob.objects.values_list("image_url", flat=True)) == {
+            "http://example.com/a.jpg",
+            "http://example.com/a_thumbnail.webp",
+        }
 
     def test_update_exceeding_image_limit(self):
         """Test that adding images beyond the 10 image limit is rejected"""
@@ -0,0 +1,156 @@
+"""
+Tests for the in-process suggest index and GET /api/v1/listings/suggest/.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.listings.models import Listing
+from apps.listings.suggest import SuggestIndex, suggest_index
+from tests.factories.factories import ListingFactory
+
+URL = "/api/v1/listings/suggest/"
+
+
+def _listing(pk, title, category="Other", status="active"):
+    return SimpleNamespace(pk=pk, title=title, category=category, status=status)
+
+
+def _texts(results):
+    return [r["text"] for r in results]
+
+
+class TestSuggestIndex:
+    def _index(self, *listings):
+        index = SuggestIndex(loader=lambda: list(listings))
+        index.rebuild()
+        return index
+
+    def test_prefix_matches_title_start_and_inner_words(self):
+        index = self._index(
+            _listing(1, "Lamp shade"),
+            _listing(2, "Desk lamp"),
+            _listing(3, "Desk"),
+        )
+        assert _texts(index.suggest("lam")) == ["Lamp shade", "Desk lamp"]
+        assert _texts(index.suggest("  DESK ")) == ["Desk", "Desk lamp"]
+        assert index.suggest("") == []
+        assert index.suggest("zzz") == []
+
+    def test_categories_and_popularity(self):
+        index = self._index(
+            _listing(1, "Blender", category="Electronics"),
+            _listing(2, "Ebook reader", category="Electronics"),
+            _listing(3, "Easel", category="Other"),
+        )
+        results = index.suggest("e")
+        assert results[0] == {"text": "Electronics", "type": "category"}
+        assert {"text": "Easel", "type": "title"} in results
+        assert len(index.suggest("e", limit=2)) == 2
+
+    def test_incremental_updates(self):
+        index = self._index(_listing(1, "Desk"), _listing(2, "Desk"))
+
+        index.update_listing(_listing(1, "Dresser"))
+        assert _texts(index.suggest("d")) == ["Desk", "Dresser"]
+
+        index.update_listing(_listing(2, "Desk", status="sold"))
+        assert _texts(index.suggest("de")) == []
+
+        index.remove_listing(1)
+        assert _texts(index.suggest("dr")) == []
+
+    def test_updates_before_first_build_are_ignored(self):
+        loaded = [_listing(1, "Kettle")]
+        index = SuggestIndex(loader=lambda: loaded)
+        index.update_listing(_listing(2, "Kayak"))
+        assert _texts(index.suggest("k")) == ["Kettle"]
+
+    def test_periodic_rebuild(self):
+        rows = [_listing(1, "Kettle")]
+        index = SuggestIndex(loader=lambda: list(rows), rebuild_interval=0)
+        assert _texts(index.suggest("k")) == ["Kettle"]
+        rows.append(_listing(2, "Kayak"))
+        assert _texts(index.suggest("k")) == ["Kayak", "Kettle"]
+
+    def test_stale_index_is_served_while_rebuilding(self):
+        loading, release = threading.Event(), threading.Event()
+        loads = []
+
+        def loader():
+            loads.append(1)
+            if len(loads) > 1:
+                loading.set()
+                release.wait(5)
+                return [_listing(1, "Kettle"), _listing(2, "Kayak")]
+            return [_listing(1, "Kettle")]
+
+        index = SuggestIndex(loader=loader, rebuild_interval=0)
+        index.rebuild()
+        rebuilding = threading.Thread(target=index.suggest, args=("k",))
+        rebuilding.start()
+        assert loading.wait(5)
+
+        # Lookups during the rebuild neither wait nor load again
+        assert _texts(index.suggest("k")) == ["Kettle"]
+        assert len(loads) == 2
+
+        release.set()
+        rebuilding.join(5)
+        assert _texts(index.suggest("ka")) == ["Kayak"]
+
+
+@pytest.mark.django_db
+class TestSuggestEndpoint:
+    @pytest.fixture(autouse=True)
+    def _fresh_index(self):
+        suggest_index.reset()
+        yield
+        suggest_index.reset()
+
+    def test_served_without_database_queries(self):
+        ListingFactory(title="Mini fridge", category="Electronics")
+        ListingFactory(title="Mirror", status="sold")
+        client = APIClient()
+        client.get(URL, {"q": "m"})  # first lookup loads the index
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(URL, {"q": "mi"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(ctx.captured_queries) == 0
+        assert response.json() == {
+            "suggestions": [{"text": "Mini fridge", "type": "title"}]
+        }
+
+    def test_signals_update_index_on_commit(self, django_capture_on_commit_callbacks):
+        client = APIClient()
+        client.get(URL, {"q": "x"})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            listing = ListingFactory(title="Xbox controller")
+        assert _texts(client.get(URL, {"q": "xb"}).json()["suggestions"]) == [
+            "Xbox controller"
+        ]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            listing.title = "Gamepad"
+            listing.save()
+        assert client.get(URL, {"q": "xb"}).json()["suggestions"] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Listing.objects.get(pk=listing.pk).delete()
+        assert client.get(URL, {"q": "game"}).json()["suggestions"] == []
+
+    def test_limit_validation(self):
+        client = APIClient()
+        assert client.get(URL).json() == {"suggestions": []}
+        assert client.get(URL, {"q": "a", "limit": "0"}).status_code == 400
+        assert client.get(URL, {"q": "a", "limit": "x"}).status_code == 400
+        assert client.get(URL, {"q": "a", "limit": "500"}).status_code == 200
@@ -0,0 +1,413 @@
+"""
+Tests for the write-behind listing view counter (apps/listings/view_counts.py).
+"""
+
+import io
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.listings.models import Listing, ListingViewSketch
+from apps.listings.view_counts import (
+    FLUSH_DUE_KEY,
+    FLUSH_LOCK_KEY,
+    MAX_STATS_DAYS,
+    PENDING_KEY,
+    VIEW_DEDUP_TIMEOUT,
+    flush_view_counts,
+    prune_view_sketches,
+    record_view,
+    unique_viewers,
+    write_through,
+)
+from core.shared_backends import build_caches
+from tests.factories.factories import ListingFactory, UserFactory
+from utils.hyperloglog import HyperLogLog
+
+
+@pytest.fixture(autouse=True)
+def buffered(settings):
+    """The tests run on LocMemCache, which would write views straight through"""
+    settings.VIEW_COUNT_WRITE_THROUGH = False
+
+
+@pytest.fixture
+def no_auto_flush():
+    """Keep record_view() from flushing on its own"""
+    cache.set(FLUSH_DUE_KEY, 1, timeout=None)
+
+
+@contextmanager
+def _seconds_later(seconds):
+    """Run record_view() as if `seconds` had passed"""
+    later = time.time() + seconds
+    with patch("apps.listings.view_counts.time.time", return_value=later):
+        yield
+
+
+@pytest.fixture
+def redis_cache(settings):
+    """The shared Redis cache backend (fakeredis), as in production"""
+    settings.CACHES = build_caches("fakeredis://")
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _view_count(listing):
+    return Listing.objects.values_list("view_count", flat=True).get(pk=listing.pk)
+
+
+@pytest.mark.django_db
+class TestRecordView:
+    def test_same_viewer_counted_once(self, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+
+        assert record_view(listing.pk, "viewer-a") is True
+        assert record_view(listing.pk, "viewer-a") is False
+        assert record_view(listing.pk, "viewer-b") is True
+
+        assert cache.get(PENDING_KEY.format(listing.pk)) == 2
+
+    def test_dedup_window_slides(self, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+        record_view(listing.pk, "viewer-a")
+
+        # Not counted again until a full window after the counted view
+        with _seconds_later(VIEW_DEDUP_TIMEOUT - 5):
+            assert record_view(listing.pk, "viewer-a") is False
+        with _seconds_later(VIEW_DEDUP_TIMEOUT + 5):
+            assert record_view(listing.pk, "viewer-a") is True
+            assert record_view(listing.pk, "viewer-a") is False
+
+        assert cache.get(PENDING_KEY.format(listing.pk)) == 2
+
+    def test_every_distinct_viewer_is_counted(self, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+
+        counted = sum(record_view(listing.pk, f"viewer-{i}") for i in range(1000))
+
+        assert counted == 1000
+        assert cache.get(PENDING_KEY.format(listing.pk)) == 1000
+
+    def test_dedup_keeps_no_per_viewer_keys(self, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+        record_view(listing.pk, "viewer-a")
+        entries = len(cache._cache)
+
+        for i in range(50):
+            record_view(listing.pk, f"viewer-{i}")
+
+        # Only the sketches and pending count, however many viewers
+        assert len(cache._cache) == entries
+
+    def test_views_are_buffered_until_flush(self, no_auto_flush):
+        listing = ListingFactory(view_count=5)
+        for i in range(3):
+            record_view(listing.pk, f"viewer-{i}")
+
+        assert _view_count(listing) == 5
+        assert flush_view_counts() == 3
+        assert _view_count(listing) == 8
+        assert cache.get(PENDING_KEY.format(listing.pk)) == 0
+
+    def test_flushes_opportunistically_once_per_interval(self):
+        listing = ListingFactory(view_count=0)
+
+        record_view(listing.pk, "viewer-a")
+        record_view(listing.pk, "viewer-b")
+
+        # The first view flushed; the second waits for the next interval
+        assert _view_count(listing) == 1
+        assert cache.get(PENDING_KEY.format(listing.pk)) == 1
+
+
+@pytest.mark.django_db
+class TestRedisCache:
+    def test_dedup_is_exact_with_one_key_per_listing(self, redis_cache, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+        client = caches["default"]._cache.get_client(write=True)
+        record_view(listing.pk, "viewer-0")
+        keys = client.dbsize()
+
+        counted = sum(record_view(listing.pk, f"viewer-{i}") for i in range(1000))
+
+        assert counted == 999
+        assert record_view(listing.pk, "viewer-500") is False
+        assert client.dbsize() == keys
+        with _seconds_later(VIEW_DEDUP_TIMEOUT + 5):
+            assert record_view(listing.pk, "viewer-500") is True
+
+    def test_views_and_sketches_flush(self, redis_cache, no_auto_flush):
+        assert write_through() is False
+        listing = ListingFactory(view_count=0)
+        for viewer in ("a", "b", "c", "a"):
+            record_view(listing.pk, viewer)
+
+        assert flush_view_counts() == 3
+        assert _view_count(listing) == 3
+        assert unique_viewers([listing.pk]) == {listing.pk: 3}
+
+
+@pytest.mark.django_db
+class TestWriteThrough:
+    def test_per_process_cache_writes_through(self, settings):
+        settings.VIEW_COUNT_WRITE_THROUGH = None
+        listing = ListingFactory(view_count=0)
+
+        assert record_view(listing.pk, "viewer-a") is True
+        assert record_view(listing.pk, "viewer-a") is False
+
+        assert _view_count(listing) == 1
+        assert cache.get(PENDING_KEY.format(listing.pk)) is None
+        assert unique_viewers([listing.pk]) == {listing.pk: 1}
+
+    def test_shared_cache_buffers(self, settings):
+        settings.VIEW_COUNT_WRITE_THROUGH = None
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}
+        }
+
+        assert write_through() is False
+
+
+@pytest.mark.django_db
+class TestFlushViewCounts:
+    def test_single_update_for_all_listings(self, no_auto_flush):
+        listings = ListingFactory.create_batch(3, view_count=0)
+        for n, listing in enumerate(listings, start=1):
+            for i in range(n):
+                record_view(listing.pk, f"viewer-{i}:{listing.pk}")
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert flush_view_counts() == 6
+
+        updates = [
+            q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")
+        ]
+        assert len(updates) == 1 and '"listings"' in updates[0]
+
+        assert [_view_count(listing) for listing in listings] == [1, 2, 3]
+
+    def test_nothing_to_flush(self, no_auto_flush, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert flush_view_counts() == 0
+
+    def test_views_after_flush_are_counted_next_time(self, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+        record_view(listing.pk, "viewer-a")
+        flush_view_counts()
+
+        record_view(listing.pk, "viewer-b")
+        record_view(listing.pk, "viewer-c")
+
+        assert flush_view_counts() == 2
+        assert _view_count(listing) == 3
+
+    def test_failed_update_keeps_views(self, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+        record_view(listing.pk, "viewer-a")
+        record_view(listing.pk, "viewer-b")
+
+        with patch(
+            "apps.listings.view_counts._apply", side_effect=Exception("DB down")
+        ):
+            with pytest.raises(Exception, match="DB down"):
+                flush_view_counts()
+        assert _view_count(listing) == 0
+
+        assert flush_view_counts() == 2
+        assert _view_count(listing) == 2
+
+    def test_skips_while_another_flush_runs(self, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+        record_view(listing.pk, "viewer-a")
+        cache.add(FLUSH_LOCK_KEY, 1)
+
+        assert flush_view_counts() == 0
+        assert _view_count(listing) == 0
+
+        cache.delete(FLUSH_LOCK_KEY)
+        assert flush_view_counts() == 1
+
+    def test_deleted_listing_is_ignored(self, no_auto_flush):
+        gone, kept = ListingFactory.create_batch(2, view_count=0)
+        record_view(gone.pk, f"viewer-a:{gone.pk}")
+        record_view(kept.pk, f"viewer-a:{kept.pk}")
+        Listing.objects.filter(pk=gone.pk).delete()
+
+        flush_view_counts()
+
+        assert _view_count(kept) == 1
+
+
+@pytest.mark.django_db
+def test_flush_view_counts_command(no_auto_flush):
+    listing = ListingFactory(view_count=0)
+    record_view(listing.pk, "viewer-a")
+    out = io.StringIO()
+
+    call_command("flush_view_counts", stdout=out)
+
+    assert "Flushed 1 listing views" in out.getvalue()
+    assert _view_count(listing) == 1
+
+
+@pytest.mark.django_db
+class TestPruneViewSketches:
+    def _sketch(self, listing, age):
+        day = timezone.localdate() - timedelta(days=age)
+        return ListingViewSketch.objects.create(
+            listing=listing, day=day, registers=HyperLogLog().to_bytes()
+        )
+
+    def test_deletes_days_no_window_reads(self):
+        listing = ListingFactory()
+        kept = [self._sketch(listing, age) for age in (0, MAX_STATS_DAYS - 1)]
+        for age in (MAX_STATS_DAYS, MAX_STATS_DAYS + 30):
+            self._sketch(listing, age)
+
+        assert prune_view_sketches() == 2
+        assert set(ListingViewSketch.objects.all()) == set(kept)
+
+    def test_command_prunes_once_per_interval(self, no_auto_flush):
+        self._sketch(ListingFactory(), MAX_STATS_DAYS)
+        first, second = io.StringIO(), io.StringIO()
+
+        call_command("flush_view_counts", stdout=first)
+        call_command("flush_view_counts", stdout=second)
+
+        assert "Pruned 1 listing view sketches" in first.getvalue()
+        assert "Pruned" not in second.getvalue()
+        assert not ListingViewSketch.objects.exists()
+
+
+def _sketch_count(listing):
+    row = ListingViewSketch.objects.get(listing=listing, day=timezone.localdate())
+    return HyperLogLog.from_bytes(bytes(row.registers)).count()
+
+
+@pytest.mark.django_db
+class TestUniqueViewers:
+    def test_flush_stores_day_sketch(self, no_auto_flush):
+        listing = ListingFactory()
+        for i in range(5):
+            record_view(listing.pk, f"viewer-{i}")
+        # A returning viewer past the dedup window is not a new unique viewer
+        with _seconds_later(VIEW_DEDUP_TIMEOUT + 5):
+            assert record_view(listing.pk, "viewer-0") is True
+
+        flush_view_counts()
+
+        assert ListingViewSketch.objects.filter(listing=listing).count() == 1
+        assert _sketch_count(listing) == 5
+        assert unique_viewers([listing.pk]) == {listing.pk: 5}
+
+    def test_later_flushes_merge_into_same_row(self, no_auto_flush):
+        listing = ListingFactory()
+        record_view(listing.pk, "viewer-a")
+        flush_view_counts()
+        record_view(listing.pk, "viewer-b")
+        flush_view_counts()
+
+        assert ListingViewSketch.objects.filter(listing=listing).count() == 1
+        assert _sketch_count(listing) == 2
+
+    def test_sketch_size_is_constant(self, no_auto_flush):
+        listing = ListingFactory()
+        record_view(listing.pk, "viewer-0")
+        flush_view_counts()
+        size = len(ListingViewSketch.objects.get(listing=listing).registers)
+
+        # Stays under LocMemCache's default 300-entry cap
+        for i in range(1, 200):
+            record_view(listing.pk, f"viewer-{i}")
+        flush_view_counts()
+
+        row = ListingViewSketch.objects.get(listing=listing)
+        assert len(row.registers) == size
+        assert abs(_sketch_count(listing) - 200) <= 20
+
+
+@pytest.mark.django_db
+class TestListingStats:
+    def _view(self, listing, viewers):
+        for viewer in viewers:
+            record_view(listing.pk, viewer)
+
+    def test_owner_sees_listing_stats(self, no_auto_flush):
+        listing = ListingFactory(view_count=0)
+        self._view(listing, ["a", "b", "c"])
+        flush_view_counts()
+        client = APIClient()
+        client.force_authenticate(user=listing.user)
+
+        response = client.get(f"/api/v1/listings/{listing.listing_id}/stats/?days=7")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["view_count"] == 3
+        assert data["unique_viewers"] == 3
+        assert len(data["daily"]) == 7
+        assert data["daily"][-1] == {
+            "date": timezone.localdate().isoformat(),
+            "unique_viewers": 3,
+        }
+
+    def test_non_owner_forbidden(self):
+        listing = ListingFactory()
+        client = APIClient()
+        client.force_authenticate(user=UserFactory())
+
+        response = client.get(f"/api/v1/listings/{listing.listing_id}/stats/")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_invalid_days(self):
+        listing = ListingFactory()
+        client = APIClient()
+        client.force_authenticate(user=listing.user)
+
+        response = client.get(f"/api/v1/listings/{listing.listing_id}/stats/?days=0")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_dashboard_merges_viewers_across_listings(self, no_auto_flush):
+        first = ListingFactory()
+        second = ListingFactory(user=first.user)
+        self._view(first, ["a", "b"])
+        self._view(second, ["b", "c"])
+        flush_view_counts()
+        client = APIClient()
+        client.force_authenticate(user=first.user)
+
+        response = client.get("/api/v1/listings/user/stats/")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["unique_viewers"] == 3
+        assert {
+            row["listing_id"]: row["unique_viewers"] for row in data["listings"]
+        } == {
+            first.pk: 2,
+            second.pk: 2,
+        }
+
+    def test_detail_includes_unique_viewers(self, no_auto_flush):
+        listing = ListingFactory()
+        self._view(listing, ["a", "b"])
+        flush_view_counts()
+
+        response = APIClient().get(f"/api/v1/listings/{listing.listing_id}/")
+
+        assert response.json()["unique_viewers"] == 2
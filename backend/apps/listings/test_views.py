@@ -2,14 +2,16 @@ import io
 import json
 from unittest.mock import patch
 import pytest
-from apps.listings.models import Listing
+from apps.listings.models import Listing, S3DeletionJob
 from rest_framework import serializers, status
 from rest_framework.test import APIClient, APIRequestFactory
 from tests.factories.factories import ListingFactory, ListingImageFactory, UserFactory
 from django.core.cache import cache
 from django.contrib.sessions.middleware import SessionMiddleware
 from apps.listings.views import ListingViewSet
+from apps.listings.view_counts import flush_view_counts
 from django.contrib.auth.models import AnonymousUser
+from utils.s3_service import get_s3_service
 
 
 @pytest.fixture
@@ -46,7 +48,7 @@ class TestListingViewSet:
         Verify that an authenticated user can successfully create a listing.
         """
         client, user = authenticated_client
-        with patch("utils.s3_service.s3_service.upload_image") as mock_upload:
+        with patch.object(get_s3_service(), "upload_image") as mock_upload:
             mock_upload.return_value = "http://example.com/mock-image.jpg"
             response = client.post(
                 "/api/v1/listings/",
@@ -176,7 +178,7 @@ class TestListingViewSet:
         # Mocks are simple objects; no need for real image data
         # for this validation test.
         images = ["image"] * 11
-        with patch("utils.s3_service.s3_service.upload_image") as mock_upload:
+        with patch.object(get_s3_service(), "upload_image") as mock_upload:
             mock_upload.return_value = "http://example.com/mock-image.jpg"
             response = client.post(
                 "/api/v1/listings/",
@@ -198,7 +200,7 @@ class TestListingViewSet:
         and the error is logged.
         """
         client, user = authenticated_client
-        with patch("utils.s3_service.s3_service.upload_image") as mock_upload, patch(
+        with patch.object(get_s3_service(), "upload_image") as mock_upload, patch(
             "apps.listings.serializers.logger"
         ):
             mock_upload.side_effect = serializers.ValidationError("S3 is down")
@@ -241,7 +243,7 @@ class TestListingViewSet:
         mock_file.seek(0)
         mock_file.name = "new_image.jpg"
 
-        with patch("utils.s3_service.s3_service.upload_image") as mock_upload, patch(
+        with patch.object(get_s3_service(), "upload_image") as mock_upload, patch(
             "utils.s3_service.s3_service.delete_image"
         ) as mock_delete:
             mock_upload.return_value = "http://example.com/new-image.jpg"
@@ -307,15 +309,15 @@ class TestListingViewSet:
         listing = ListingFactory(user=user)
         ListingImageFactory(listing=listing)
 
-        with patch("utils.s3_service.s3_service.delete_image") as mock_delete, patch(
-            "apps.listings.views.logger"
-        ) as mock_logger:
+        with patch("utils.s3_service.s3_service.delete_images") as mock_delete:
             mock_delete.side_effect = Exception("S3 delete failed")
             response = client.delete(f"/api/v1/listings/{listing.listing_id}/")
 
             assert response.status_code == status.HTTP_204_NO_CONTENT
             assert not Listing.objects.filter(pk=listing.pk).exists()
-            mock_logger.error.assert_called_once()
+            # S3 is only called by the worker; the file waits in the queue
+            mock_delete.assert_not_called()
+            assert S3DeletionJob.objects.count() == 1
 
     def test_compact_serializer_primary_image_logic(self, api_client):
         """
@@ -476,6 +478,7 @@ class TestListingViewSetTracking:
         listing = ListingFactory(view_count=0)
         r = api_client.get(f"/api/v1/listings/{listing.listing_id}/")
         assert r.status_code == 200
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 0
 
@@ -492,12 +495,14 @@ class TestListingViewSetTracking:
         # Only query param -> increments to 1
         r1 = api_client.get(base + "?track_view=1")
         assert r1.status_code == 200
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 1
 
         # Only header, same viewer -> should NOT increment again
         r2 = api_client.get(base, HTTP_X_TRACK_VIEW="1")
         assert r2.status_code == 200
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 1
 
@@ -516,6 +521,7 @@ class TestListingViewSetTracking:
             REMOTE_ADDR="1.1.1.1",
         )
         assert r1.status_code == 200
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 1
 
@@ -527,6 +533,7 @@ class TestListingViewSetTracking:
             REMOTE_ADDR="1.1.1.1",
         )
         assert r2.status_code == 200
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 1
 
@@ -541,6 +548,7 @@ class TestListingViewSetTracking:
         _ = api_client.get(
             url, HTTP_X_TRACK_VIEW="1", HTTP_USER_AGENT="UA-A", REMOTE_ADDR="1.1.1.1"
         )
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 1
 
@@ -548,6 +556,7 @@ class TestListingViewSetTracking:
         _ = api_client.get(
             url, HTTP_X_TRACK_VIEW="1", HTTP_USER_AGENT="UA-B", REMOTE_ADDR="1.1.1.1"
         )
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 2
 
@@ -558,6 +567,7 @@ class TestListingViewSetTracking:
             HTTP_USER_AGENT="UA-B",
             HTTP_X_FORWARDED_FOR="2.2.2.2, 3.3.3.3",
         )
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 3
 
@@ -571,6 +581,7 @@ class TestListingViewSetTracking:
 
         # user1
         _ = client1.get(url, HTTP_X_TRACK_VIEW="1")
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 1
 
@@ -579,17 +590,19 @@ class TestListingViewSetTracking:
         user2 = UserFactory()
         client2.force_authenticate(user=user2)
         _ = client2.get(url, HTTP_X_TRACK_VIEW="1")
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 2
 
         # user1 again -> no increment
         _ = client1.get(url, HTTP_X_TRACK_VIEW="1")
+        flush_view_counts()
         listing.refresh_from_db()
         assert listing.view_count == 2
 
 
 @pytest.mark.django_db
-class TestViewerCacheKey:
+class TestViewerIdentity:
     def _attach_session(self, request):
         """Attach a Django session to a factory-made request."""
         middleware = SessionMiddleware(lambda x: x)
@@ -603,17 +616,16 @@ class TestViewerCacheKey:
         """
         factory = APIRequestFactory()
         view = ListingViewSet()
-        listing_id = 123
 
         req1 = factory.get("/x", HTTP_USER_AGENT="UA1", REMOTE_ADDR="10.0.0.1")
         req1.user = AnonymousUser()
-        key1 = view._viewer_cache_key(req1, listing_id)
+        key1 = view._viewer_identity(req1)
         assert isinstance(key1, str) and key1
 
         # Different UA => different key
         req2 = factory.get("/x", HTTP_USER_AGENT="UA2", REMOTE_ADDR="10.0.0.1")
         req2.user = AnonymousUser()
-        key2 = view._viewer_cache_key(req2, listing_id)
+        key2 = view._viewer_identity(req2)
         assert key2 and key2 != key1
 
         # X-Forwarded-For (first IP)
@@ -623,7 +635,7 @@ class TestViewerCacheKey:
             HTTP_X_FORWARDED_FOR="20.20.20.20, 30.30.30.30",
         )
         req3.user = AnonymousUser()
-        key3 = view._viewer_cache_key(req3, listing_id)
+        key3 = view._viewer_identity(req3)
         assert key3 and key3 != key2
 
     def test_cache_key_anonymous_with_session_prefers_session(self):
@@ -632,40 +644,38 @@ class TestViewerCacheKey:
         """
         factory = APIRequestFactory()
         view = ListingViewSet()
-        listing_id = 456
 
         req_ip_ua = factory.get("/x", HTTP_USER_AGENT="UA1", REMOTE_ADDR="1.2.3.4")
         req_ip_ua.user = AnonymousUser()
-        key_ip_ua = view._viewer_cache_key(req_ip_ua, listing_id)
+        key_ip_ua = view._viewer_identity(req_ip_ua)
 
         req_session = factory.get("/x")
         self._attach_session(req_session)
         req_session.user = AnonymousUser()
-        key_session_1 = view._viewer_cache_key(req_session, listing_id)
-        key_session_2 = view._viewer_cache_key(req_session, listing_id)
+        key_session_1 = view._viewer_identity(req_session)
+        key_session_2 = view._viewer_identity(req_session)
 
         assert key_session_1 and key_session_1 != key_ip_ua
         assert key_session_1 == key_session_2  # stable for same session
 
     def test_cache_key_authenticated_user(self):
         """
-        Authenticated users -> user-based key (stable per user+listing).
+        Authenticated users -> user-based key (stable per user).
         """
         factory = APIRequestFactory()
         view = ListingViewSet()
-        listing_id = 789
 
         user_a = UserFactory()
         req_a = factory.get("/x")
         req_a.user = user_a
-        key_a1 = view._viewer_cache_key(req_a, listing_id)
-        key_a2 = view._viewer_cache_key(req_a, listing_id)
+        key_a1 = view._viewer_identity(req_a)
+        key_a2 = view._viewer_identity(req_a)
         assert key_a1 == key_a2 and key_a1
 
         user_b = UserFactory()
         req_b = factory.get("/x")
         req_b.user = user_b
-        key_b = view._viewer_cache_key(req_b, listing_id)
+        key_b = view._viewer_identity(req_b)
         assert key_b and key_b != key_a1
 
 
@@ -760,51 +770,60 @@ class TestListingViewSetAdditional:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["conversation_id"] == str(conv.id)
 
-    def test_perform_destroy_with_s3_delete_failure(self, authenticated_client):
-        """Test perform_destroy continues even if S3 delete fails."""
+    def test_perform_destroy_queues_s3_deletes(self, authenticated_client):
+        """perform_destroy returns without calling S3; files are queued"""
         client, user = authenticated_client
         listing = ListingFactory(user=user)
-        ListingImageFactory(listing=listing)
+        ListingImageFactory(
+            listing=listing,
+            image_url="http://example.com/img.jpg",
+            thumbnail_url="http://example.com/img_thumbnail.webp",
+            medium_url="http://example.com/img_medium.webp",
+        )
 
         with patch("utils.s3_service.s3_service.delete_image") as mock_delete, patch(
-            "apps.listings.views.logger"
-        ) as mock_logger:
-            mock_delete.return_value = False  # S3 delete fails
-
+            "utils.s3_service.s3_service.delete_images"
+        ) as mock_delete_images:
             response = client.delete(f"/api/v1/listings/{listing.listing_id}/")
 
-            assert response.status_code == status.HTTP_204_NO_CONTENT
-            assert not Listing.objects.filter(pk=listing.pk).exists()
-            # Verify logger was called
-            mock_logger.info.assert_called()
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Listing.objects.filter(pk=listing.pk).exists()
+        mock_delete.assert_not_called()
+        mock_delete_images.assert_not_called()
+        assert S3DeletionJob.objects.filter(status="pending").count() == 3
 
-    def test_perform_destroy_with_s3_exception(self, authenticated_client):
-        """Test perform_destroy handles S3 exceptions gracefully."""
+    def test_perform_destroy_inline_queue_deletes_after_commit(
+        self, authenticated_client, settings, django_capture_on_commit_callbacks
+    ):
+        """With the inline queue all files go in one batch after commit"""
+        settings.IMAGE_QUEUE_BACKEND = "inline"
         client, user = authenticated_client
         listing = ListingFactory(user=user)
-        ListingImageFactory(listing=listing)
-
-        with patch("utils.s3_service.s3_service.delete_image") as mock_delete, patch(
-            "apps.listings.views.logger"
-        ) as mock_logger:
-            mock_delete.side_effect = Exception("S3 error")
+        ListingImageFactory(listing=listing, image_url="http://example.com/1.jpg")
+        ListingImageFactory(listing=listing, image_url="http://example.com/2.jpg")
 
+        with patch(
+            "utils.s3_service.s3_service.delete_images", return_value={}
+        ) as mock_delete_images, django_capture_on_commit_callbacks(execute=True):
             response = client.delete(f"/api/v1/listings/{listing.listing_id}/")
 
-            assert response.status_code == status.HTTP_204_NO_CONTENT
-            assert not Listing.objects.filter(pk=listing.pk).exists()
-            # Verify error was logged
-            mock_logger.error.assert_called()
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        mock_delete_images.assert_called_once()
+        assert sorted(mock_delete_images.call_args.args[0]) == [
+            "http://example.com/1.jpg",
+            "http://example.com/2.jpg",
+        ]
+        assert not S3DeletionJob.objects.exists()
 
     def test_retrieve_with_exception_handling(self, api_client):
         """Test retrieve handles exceptions gracefully."""
         listing = ListingFactory()
 
         # Test that retrieve handles exceptions in the try-except block
-        # by patching cache.get to raise an exception
-        with patch("apps.listings.views.cache.get") as mock_cache_get:
+        # by making view recording raise an exception
+        with patch("apps.listings.views.record_view") as mock_record_view:
             # Simulate an exception during cache operations
-            mock_cache_get.side_effect = Exception("Cache error")
+            mock_record_view.side_effect = Exception("Cache error")
 
             # Should still return response (exception is caught)
             response = api_client.get(
@@ -850,23 +869,86 @@ class TestListingViewSetAdditional:
         serializer_class = view.get_serializer_class()
         assert serializer_class == ListingCreateSerializer
 
-    def test_perform_destroy_with_successful_s3_deletes(self, authenticated_client):
-        """Test perform_destroy counts successful S3 deletions."""
+    def test_perform_destroy_without_images_queues_nothing(self, authenticated_client):
+        """Test perform_destroy of a listing without images."""
         client, user = authenticated_client
         listing = ListingFactory(user=user)
-        ListingImageFactory(listing=listing, image_url="http://example.com/img1.jpg")
-        ListingImageFactory(listing=listing, image_url="http://example.com/img2.jpg")
-
-        with patch("utils.s3_service.s3_service.delete_image") as mock_delete, patch(
-            "apps.listings.views.logger"
-        ) as mock_logger:
-            mock_delete.return_value = True  # Both deletions succeed
 
+        with patch("apps.listings.views.logger") as mock_logger:
             response = client.delete(f"/api/v1/listings/{listing.listing_id}/")
 
-            assert response.status_code == status.HTTP_204_NO_CONTENT
-            assert not Listing.objects.filter(pk=listing.pk).exists()
-            # Verify logger was called with count of 2
-            mock_logger.info.assert_called()
-            # Check that delete_image was called twice
-            assert mock_delete.call_count == 2
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Listing.objects.filter(pk=listing.pk).exists()
+        assert not S3DeletionJob.objects.exists()
+        mock_logger.info.assert_called()
+
+
+def _jpeg(name):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (10, 10), color="red").save(buffer, format="JPEG")
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def _upload_by_name(image_file, *args, **kwargs):
+    # Uploads run concurrently; fail the file named bad.jpg
+    if image_file.name == "bad.jpg":
+        raise Exception("S3 timeout")
+    return f"http://example.com/{image_file.name}"
+
+
+@pytest.mark.django_db
+class TestBatchImageUpload:
+    def test_create_reports_failed_images_and_keeps_order(self, authenticated_client):
+        client, _ = authenticated_client
+        with patch.object(
+            get_s3_service(), "upload_image", side_effect=_upload_by_name
+        ):
+            response = client.post(
+                "/api/v1/listings/",
+                {
+                    "title": "Bundle",
+                    "category": "Other",
+                    "description": "Three photos",
+                    "price": "5.00",
+                    "images": [_jpeg("bad.jpg"), _jpeg("b.jpg"), _jpeg("c.jpg")],
+                },
+                format="multipart",
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["failed_images"] == [
+            {"index": 0, "name": "bad.jpg", "error": "S3 timeout"}
+        ]
+        listing = Listing.objects.get(pk=response.data["listing_id"])
+        rows = list(
+            listing.images.order_by("display_order").values_list(
+                "image_url", "display_order", "is_primary"
+            )
+        )
+        assert rows == [
+            ("http://example.com/b.jpg", 1, True),
+            ("http://example.com/c.jpg", 2, False),
+        ]
+
+    def test_update_saves_successes_and_rejects_failures(self, authenticated_client):
+        client, user = authenticated_client
+        listing = ListingFactory(user=user)
+        ListingImageFactory(listing=listing, display_order=0, is_primary=True)
+
+        with patch.object(
+            get_s3_service(), "upload_image", side_effect=_upload_by_name
+        ):
+            response = client.patch(
+                f"/api/v1/listings/{listing.listing_id}/",
+                {"new_images": [_jpeg("a.jpg"), _jpeg("bad.jpg")]},
+                format="multipart",
+            )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "bad.jpg" in response.data["new_images"][0]
+        assert listing.images.filter(image_url="http://example.com/a.jpg").get()
+        assert listing.images.count() == 2
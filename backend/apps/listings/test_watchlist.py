@@ -277,3 +277,222 @@ class TestWatchlistInListingDetailSerializer:
         response = client.get(f"/api/v1/listings/{listing.listing_id}/is_saved/")
         assert response.status_code == status.HTTP_200_OK
         assert response.data["is_saved"] is True
+
+    def test_save_count_follows_api_add_and_remove(
+        self, authenticated_client, another_authenticated_client
+    ):
+        """save_count is a column kept current as watchlist rows change"""
+        client1, _ = authenticated_client
+        client2, _ = another_authenticated_client
+        listing = ListingFactory()
+
+        client1.post("/api/v1/watchlist/", {"listing_id": listing.listing_id})
+        client2.post("/api/v1/watchlist/", {"listing_id": listing.listing_id})
+        # Saving twice does not count twice
+        client2.post("/api/v1/watchlist/", {"listing_id": listing.listing_id})
+        listing.refresh_from_db()
+        assert listing.save_count == 2
+
+        client1.delete(f"/api/v1/watchlist/{listing.listing_id}/")
+        listing.refresh_from_db()
+        assert listing.save_count == 1
+
+    def test_save_count_drops_when_saving_user_is_deleted(self, authenticated_client):
+        _, user = authenticated_client
+        listing = ListingFactory()
+        Watchlist.objects.create(user=user, listing=listing)
+
+        user.delete()
+
+        listing.refresh_from_db()
+        assert listing.save_count == 0
+
+
+@pytest.mark.django_db
+class TestWatchlistInListingCards:
+    """is_saved on list/search/watchlist cards"""
+
+    def test_list_marks_saved_cards(self, authenticated_client):
+        client, user = authenticated_client
+        saved, other = ListingFactory.create_batch(2)
+        Watchlist.objects.create(user=user, listing=saved)
+
+        response = client.get("/api/v1/listings/")
+
+        assert response.status_code == status.HTTP_200_OK
+        flags = {r["listing_id"]: r["is_saved"] for r in response.data["results"]}
+        assert flags == {saved.listing_id: True, other.listing_id: False}
+        saved_card = next(
+            r for r in response.data["results"] if r["listing_id"] == saved.listing_id
+        )
+        assert saved_card["save_count"] == 1
+
+    def test_search_marks_saved_cards(self, authenticated_client):
+        client, user = authenticated_client
+        listing = ListingFactory(title="Desk lamp")
+        Watchlist.objects.create(user=user, listing=listing)
+
+        response = client.get("/api/v1/listings/search/", {"q": "lamp"})
+
+        assert response.data["results"][0]["is_saved"] is True
+
+    def test_anonymous_cards_are_not_saved(self, api_client):
+        ListingFactory()
+
+        response = api_client.get("/api/v1/listings/")
+
+        assert response.data["results"][0]["is_saved"] is False
+
+    def test_watchlist_cards_are_saved(self, authenticated_client):
+        client, user = authenticated_client
+        Watchlist.objects.create(user=user, listing=ListingFactory())
+
+        response = client.get("/api/v1/watchlist/")
+
+        assert response.data[0]["is_saved"] is True
+
+
+@pytest.mark.django_db
+class TestWatchlistStatus:
+    """POST /api/v1/watchlist/status/"""
+
+    url = "/api/v1/watchlist/status/"
+
+    def test_returns_saved_subset(self, authenticated_client):
+        client, user = authenticated_client
+        saved, other = ListingFactory.create_batch(2)
+        Watchlist.objects.create(user=user, listing=saved)
+
+        response = client.post(
+            self.url,
+            {"listing_ids": [saved.listing_id, other.listing_id, 999999]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"saved": [saved.listing_id]}
+
+    def test_requires_authentication(self, api_client):
+        response = api_client.post(self.url, {"listing_ids": [1]}, format="json")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.parametrize(
+        "body",
+        [{}, {"listing_ids": []}, {"listing_ids": ["x"]}, {"listing_ids": [0]}],
+    )
+    def test_invalid_body(self, authenticated_client, body):
+        client, _ = authenticated_client
+        response = client.post(self.url, body, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_too_many_ids(self, authenticated_client):
+        client, _ = authenticated_client
+        response = client.post(
+            self.url, {"listing_ids": list(range(1, 62))}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_repeat_lookup_is_cached(
+        self, authenticated_client, django_assert_num_queries
+    ):
+        client, user = authenticated_client
+        listing = ListingFactory()
+        Watchlist.objects.create(user=user, listing=listing)
+        body = {"listing_ids": [listing.listing_id]}
+        client.post(self.url, body, format="json")
+
+        with django_assert_num_queries(0):
+            response = client.post(self.url, body, format="json")
+
+        assert response.data == {"saved": [listing.listing_id]}
+
+    def test_add_and_remove_invalidate_cache(self, authenticated_client):
+        client, _ = authenticated_client
+        listing = ListingFactory()
+        body = {"listing_ids": [listing.listing_id]}
+        assert client.post(self.url, body, format="json").data["saved"] == []
+
+        client.post("/api/v1/watchlist/", {"listing_id": listing.listing_id})
+        assert client.post(self.url, body, format="json").data["saved"] == [
+            listing.listing_id
+        ]
+
+        client.delete(f"/api/v1/watchlist/{listing.listing_id}/")
+        assert client.post(self.url, body, format="json").data["saved"] == []
+
+    def test_users_do_not_share_entries(
+        self, authenticated_client, another_authenticated_client
+    ):
+        client1, user1 = authenticated_client
+        client2, _ = another_authenticated_client
+        listing = ListingFactory()
+        Watchlist.objects.create(user=user1, listing=listing)
+        body = {"listing_ids": [listing.listing_id]}
+
+        assert client1.post(self.url, body, format="json").data["saved"] == [
+            listing.listing_id
+        ]
+        assert client2.post(self.url, body, format="json").data["saved"] == []
+
+
+@pytest.mark.django_db
+class TestWatchlistPagination:
+    """GET /api/v1/watchlist/?pagination=cursor pages"""
+
+    def _save(self, user, count, **listing_kwargs):
+        return [
+            Watchlist.objects.create(
+                user=user, listing=ListingFactory(**listing_kwargs)
+            )
+            for _ in range(count)
+        ]
+
+    def test_walks_pages_newest_first(self, authenticated_client):
+        client, user = authenticated_client
+        items = self._save(user, 5)
+
+        seen = []
+        url = "/api/v1/watchlist/?pagination=cursor&page_size=2"
+        while url:
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data["results"]) <= 2
+            seen += [card["listing_id"] for card in response.data["results"]]
+            url = response.data["next"]
+
+        assert seen == [item.listing_id for item in reversed(items)]
+
+    def test_cards_carry_saved_at_and_status(self, authenticated_client):
+        client, user = authenticated_client
+        (item,) = self._save(user, 1, status="sold")
+
+        card = client.get("/api/v1/watchlist/").data[0]
+
+        assert card["status"] == "sold"
+        assert card["saved_at"].startswith(str(item.created_at.date()))
+
+    def test_status_filter(self, authenticated_client):
+        client, user = authenticated_client
+        (active,) = self._save(user, 1)
+        self._save(user, 1, status="sold")
+        self._save(user, 1, status="inactive")
+
+        response = client.get("/api/v1/watchlist/?status=active")
+
+        assert [card["listing_id"] for card in response.data] == [active.listing_id]
+
+    def test_default_response_is_the_whole_list(self, authenticated_client):
+        client, user = authenticated_client
+        items = self._save(user, 25)
+
+        response = client.get("/api/v1/watchlist/")
+
+        assert isinstance(response.data, list)
+        assert [card["listing_id"] for card in response.data] == [
+            item.listing_id for item in reversed(items)
+        ]
+
+    def test_invalid_status_filter(self, authenticated_client):
+        client, _ = authenticated_client
+        response = client.get("/api/v1/watchlist/?status=gone")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
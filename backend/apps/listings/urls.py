@@ -16,15 +16,40 @@ urlpatterns = router.urls
     1. POST   Y   /api/v1/listings/              create a listing
        Fields: category, title, description, price, status,
                dorm_location, images (optional, max 10)
+       Returns: listing fields, uploaded_images and failed_images
+                ([{index, name, error}] for uploads that failed)
 
     2. GET    N   /api/v1/listings/              list all listings
        Fields: listing_id, category, title, price, status,
-               primary_image
+               primary_image, image_count, view_count, save_count,
+               is_saved (false for anonymous users)
+       Note: primary_image is the 400px thumbnail variant once the image
+             worker has processed it, the original until then.
+       Filters: category, categories, location, locations (partial
+               match; "Off-Campus" also matches unset and non-default
+               locations), area (washington_square, downtown, other;
+               comma-separated), min_price, max_price, posted_within
+       Paging: ?page=<n>&page_size=<n> (default) returns
+               {count, count_is_estimate, next, previous, results}.
+               count is cached per filter combination; count_is_estimate
+               is true when it predates the latest listing change (only
+               for large result sets, refreshed within 5 minutes).
+               ?pagination=cursor (infinite scroll) returns
+               {next, previous: null, results} without a count; follow
+               next (it carries ?cursor=) until it is null.
+       Cache: anonymous responses are cached per filter/ordering/page
+              combination until a listing changes (view_count and
+              save_count may lag up to a minute); X-Cache: HIT | MISS.
 
     3. GET    N   /api/v1/listings/<id>/         retrieve single
        Fields: listing_id, category, title, description, price,
                status, dorm_location, created_at, updated_at, images,
-               user_email, user_netid
+               user_email, user_netid, is_saved, save_count,
+               unique_viewers (estimated distinct viewers, last 30 days)
+       Query: track_view=1 (or header X-Track-View: 1) counts a view;
+              view counts are buffered and written about once a minute
+       images[]: image_id, image_url, display_order, is_primary,
+                 thumbnail_url, medium_url (null until processed)
 
     4. PUT/PATCH Y* /api/v1/listings/<id>/       update a listing
        Fields: category, title, description, price, status,
@@ -32,15 +57,53 @@ urlpatterns = router.urls
                remove_image_ids (optional), update_images (optional)
 
     5. DELETE Y*  /api/v1/listings/<id>/         delete a listing
-       (deletes listing and all associated images from S3)
+       (deletes listing; its images and variants are queued for
+        removal from S3 and deleted in batches after commit)
+
+    5a. POST  Y*  /api/v1/listings/<id>/images/presign/
+       presign a direct-to-S3 upload of one image
+       Fields: content_type (image/jpeg, image/png, image/gif,
+               image/webp), method (optional: "POST" or "PUT")
+       Returns: {upload: {method, url, fields, headers}, upload_token,
+                 key, expires_in}
+       Send the file to upload.url: for POST, a multipart form with every
+       upload.fields entry followed by a "file" field (max 10MB, enforced
+       by S3); for PUT, the raw bytes with upload.headers.
+
+    5b. POST  Y*  /api/v1/listings/<id>/images/confirm/
+       attach an uploaded image to the listing
+       Fields: upload_token
+       Returns: the new image (201), or the existing one (200) if the
+                token was already confirmed. The object must exist, be at
+                most 10MB and match the presigned content type and image
+                format; otherwise it is deleted and 400 is returned.
 
     6. GET    Y   /api/v1/listings/user/         get user's listings
        Fields: listing_id, category, title, price, status,
                primary_image
 
+    6a. GET   Y   /api/v1/listings/user/stats/?days=<n>  owner dashboard
+       Returns: {days, unique_viewers (across all listings; a viewer of
+                 several counts once), daily: [{date, unique_viewers}],
+                 listings: [{listing_id, title, view_count,
+                             unique_viewers}]}
+       days: 1-90, default 30. Unique viewers are HyperLogLog estimates
+             (~2% error).
+
+    6b. GET   Y*  /api/v1/listings/<id>/stats/?days=<n>  listing stats
+       Returns: {listing_id, days, view_count, unique_viewers,
+                 daily: [{date, unique_viewers}]}
+
     7. GET    Y   /api/v1/listings/search/q=<query>  search listings
        Fields: listing_id, category, title, price, status,
                primary_image
+       Paging: as in 2. Results are ranked by relevance unless
+               ?ordering= is given; in cursor mode they follow
+               ?ordering= (newest first by default).
+
+    7a. GET   N   /api/v1/listings/suggest/?q=<prefix>&limit=<n>
+       autocomplete (in-process prefix index, no DB access)
+       Returns: {suggestions: [{text, type: "title" | "category"}, ...]}
 
     8. GET    N   /api/v1/listings/filter-options/  get filter options
        Returns: {
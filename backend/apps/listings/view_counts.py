@@ -0,0 +1,436 @@
+"""
+Write-behind view counter for GET /api/v1/listings/<id>/?track_view=1.
+
+A tracked view no longer updates the listings row. It only touches the
+cache (Redis in production, see core/shared_backends.py):
+
+1. dedup: one entry per listing (a Redis sorted set, or a dict with a
+   per-process cache) maps the viewers counted in the last
+   VIEW_DEDUP_TIMEOUT (5 minutes) to when they were counted, so the same
+   viewer is counted once per sliding window, exactly, without a cache
+   key per viewer
+2. buffer: cache.incr() of a per-listing pending counter; the first view
+   since the last flush also appends the listing id to a "dirty" log
+   (sequence-numbered keys, so any cache backend works)
+3. unique viewers: the viewer is added to a HyperLogLog sketch of the
+   listing's viewers today (utils/hyperloglog.py, 2KB whatever the number
+   of viewers); the sketch is only rewritten when a register changes,
+   under WATCH (Redis) or a lock, so racing views do not drop registers.
+   Day sketches older than MAX_STATS_DAYS are deleted by
+   prune_view_sketches()
+
+flush_view_counts() drains the dirty log and adds every pending count to
+Listing.view_count in a single UPDATE ... CASE statement, so a popular
+listing gets one write per flush instead of one per view, and merges the
+day sketches into ListingViewSketch rows. Merging is a register-wise max,
+so flushing the same sketch twice is harmless and the cached sketch is
+simply left to expire. It runs opportunistically from record_view() at
+most once per VIEW_COUNT_FLUSH_INTERVAL, and from the `viewcounts` process
+in the Procfile (`python manage.py flush_view_counts --interval 60`) so
+counts of listings nobody is viewing still land.
+
+Counts are eventually consistent: view_count lags by up to one interval.
+
+Buffering needs a cache every process shares. With a per-process cache
+(LocMemCache when REDIS_URL is unset) a worker's buffer is invisible to
+the flush command and can be culled before it is flushed, so record_view()
+writes each counted view straight through to the database instead
+(write_through(), VIEW_COUNT_WRITE_THROUGH).
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from utils.hyperloglog import HyperLogLog
+
+from .models import Listing, ListingViewSketch
+
+logger = logging.getLogger(__name__)
+
+VIEW_DEDUP_TIMEOUT = 5 * 60  # seconds a viewer is counted once per listing
+FLUSH_LOCK_TIMEOUT = 60
+UPDATE_BATCH_SIZE = 500
+# Dirty-log entries consumed per flush; the rest wait for the next one
+MAX_DIRTY_PER_FLUSH = 10000
+# Cached day sketches outlive the day long enough for a late flush
+SKETCH_TIMEOUT = 2 * 24 * 60 * 60
+# Default window of the unique_viewers figure on listing pages
+UNIQUE_VIEWERS_DAYS = 30
+# Longest window the owner stats endpoints accept
+MAX_STATS_DAYS = 90
+# Seconds between prune_view_sketches() runs of the flush command
+PRUNE_INTERVAL = 24 * 60 * 60
+
+PENDING_KEY = "listing:views:pending:{}"
+DIRTY_KEY = "listing:views:dirty:{}"
+DIRTY_SEQ_KEY = "listing:views:dirty-seq"
+FLUSHED_SEQ_KEY = "listing:views:flushed-seq"
+FLUSH_LOCK_KEY = "listing:views:flush-lock"
+FLUSH_DUE_KEY = "listing:views:flush-due"
+PRUNE_DUE_KEY = "listing:views:prune-due"
+STALLED_SEQ_KEY = "listing:views:stalled-seq"
+SKETCH_KEY = "listing:views:hll:{}:{}"
+RECENT_KEY = "listing:views:recent:{}"
+UNIQUE_VIEWERS_KEY = "listing:views:unique:{}"
+
+# Cache backends whose entries are not shared between processes
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+# Guards read-modify-writes of cache entries when the cache is per-process;
+# on Redis the server makes them atomic instead
+_local_lock = threading.Lock()
+
+
+def flush_interval():
+    return getattr(settings, "VIEW_COUNT_FLUSH_INTERVAL", 60)
+
+
+def write_through():
+    """
+    Whether counted views go straight to the database rather than the
+    cache buffer. VIEW_COUNT_WRITE_THROUGH forces it either way; unset, it
+    follows the default cache: on when the cache is per-process.
+    """
+    setting = getattr(settings, "VIEW_COUNT_WRITE_THROUGH", None)
+    if setting is not None:
+        return setting
+    return settings.CACHES["default"]["BACKEND"] in LOCAL_CACHE_BACKENDS
+
+
+def _incr(key, delta=1):
+    """Atomic increment that creates the key (no expiry) when missing"""
+    cache.add(key, 0, timeout=None)
+    return cache.incr(key, delta)
+
+
+def _mark_dirty(listing_id):
+    seq = _incr(DIRTY_SEQ_KEY)
+    cache.set(DIRTY_KEY.format(seq), listing_id, timeout=None)
+
+
+def _redis():
+    """The Redis client of the default cache, None for other backends"""
+    backend = caches["default"]
+    return backend._cache if isinstance(backend, RedisCache) else None
+
+
+def _first_view(listing_id, viewer):
+    """
+    Note a view of the listing unless the viewer was counted within the
+    last VIEW_DEDUP_TIMEOUT seconds; True if it was noted (is counted).
+    """
+    now = time.time()
+    redis = _redis()
+    if redis is None:
+        key = RECENT_KEY.format(listing_id)
+        with _local_lock:
+            recent = cache.get(key) or {}
+            if recent.get(viewer, 0) > now - VIEW_DEDUP_TIMEOUT:
+                return False
+            recent = {
+                other: at
+                for other, at in recent.items()
+                if at > now - VIEW_DEDUP_TIMEOUT
+            }
+            recent[viewer] = now
+            cache.set(key, recent, timeout=VIEW_DEDUP_TIMEOUT)
+        return True
+
+    key = caches["default"].make_and_validate_key(RECENT_KEY.format(listing_id))
+    # MULTI/EXEC: drop viewers past the window, then add this one unless
+    # it is still there
+    pipe = redis.get_client(key, write=True).pipeline()
+    pipe.zremrangebyscore(key, "-inf", now - VIEW_DEDUP_TIMEOUT)
+    pipe.zadd(key, {viewer: now}, nx=True)
+    pipe.expire(key, VIEW_DEDUP_TIMEOUT)
+    return pipe.execute()[1] == 1
+
+
+def _add_to_sketch(key, viewer, timeout):
+    """Add viewer to the HyperLogLog sketch cached under key"""
+
+    def added(data):
+        """The sketch bytes with viewer added, None if unchanged"""
+        sketch = HyperLogLog() if data is None else HyperLogLog.from_bytes(data)
+        return sketch.to_bytes() if sketch.add(viewer) else None
+
+    redis = _redis()
+    if redis is None:
+        with _local_lock:
+            data = added(cache.get(key))
+            if data is not None:
+                cache.set(key, data, timeout=timeout)
+        return
+
+    key = caches["default"].make_and_validate_key(key)
+
+    def update(pipe):
+        # redis-py reruns this if the key changes before EXEC
+        stored = pipe.get(key)
+        data = added(None if stored is None else redis._serializer.loads(stored))
+        if data is not None:
+            pipe.multi()
+            pipe.set(key, redis._serializer.dumps(data), ex=timeout)
+
+    redis.get_client(key, write=True).transaction(update, key)
+
+
+def record_view(listing_id, viewer):
+    """
+    Count one view of a listing unless this viewer was counted within the
+    last VIEW_DEDUP_TIMEOUT seconds. The view is buffered for the next
+    flush, or written to the database at once when write_through().
+
+    Args:
+        listing_id: The viewed listing.
+        viewer: Identity of the viewer; the same value across listings
+            lets sketches of several listings merge.
+
+    Returns:
+        bool: True if the view was counted.
+    """
+    if not _first_view(listing_id, viewer):
+        return False
+    # Before the pending count, so a flush that sees the count sees the viewer
+    _add_to_sketch(
+        SKETCH_KEY.format(listing_id, timezone.localdate().isoformat()),
+        viewer,
+        SKETCH_TIMEOUT,
+    )
+    if write_through():
+        with transaction.atomic():
+            _apply({listing_id: 1})
+            _merge_sketches([listing_id])
+        return True
+
+    if _incr(PENDING_KEY.format(listing_id)) == 1:
+        # First buffered view since the last flush
+        _mark_dirty(listing_id)
+
+    if cache.add(FLUSH_DUE_KEY, 1, timeout=flush_interval()):
+        try:
+            flush_view_counts()
+        except Exception as e:
+            logger.error(f"Flushing listing view counts failed: {str(e)}")
+    return True
+
+
+def _take_pending(listing_ids):
+    """Move the buffered counts out of the cache: {listing_id: views}"""
+    pending = cache.get_many([PENDING_KEY.format(pk) for pk in listing_ids])
+    counts = {}
+    for pk in listing_ids:
+        n = pending.get(PENDING_KEY.format(pk)) or 0
+        if n <= 0:
+            continue
+        # decr (not delete) keeps views that arrived since get_many
+        if cache.decr(PENDING_KEY.format(pk), n) > 0:
+            # Those views saw a count above 1 and did not mark the listing
+            _mark_dirty(pk)
+        counts[pk] = n
+    return counts
+
+
+def _apply(counts):
+    """Add the counts to Listing.view_count, one UPDATE per batch"""
+    items = list(counts.items())
+    for start in range(0, len(items), UPDATE_BATCH_SIZE):
+        batch = items[start : start + UPDATE_BATCH_SIZE]
+        Listing.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+            view_count=F("view_count")
+            + Case(
+                *[When(pk=pk, then=Value(n)) for pk, n in batch],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+
+def _merge_sketches(listing_ids):
+    """Merge the cached sketches of today and yesterday into the database"""
+    today = timezone.localdate()
+    days = [today - timedelta(days=1), today]
+    keys = {
+        SKETCH_KEY.format(pk, day.isoformat()): (pk, day)
+        for pk in listing_ids
+        for day in days
+    }
+    cached = cache.get_many(list(keys))
+    if not cached:
+        return
+
+    pks = {keys[key][0] for key in cached}
+    live = set(Listing.objects.filter(pk__in=pks).values_list("pk", flat=True))
+    stored = {
+        (row.listing_id, row.day): row
+        for row in ListingViewSketch.objects.filter(listing_id__in=live, day__in=days)
+    }
+    changed, created = [], []
+    for key, data in cached.items():
+        pk, day = keys[key]
+        if pk not in live:
+            continue
+        row = stored.get((pk, day))
+        if row is None:
+            created.append(ListingViewSketch(listing_id=pk, day=day, registers=data))
+            continue
+        merged = HyperLogLog.from_bytes(bytes(row.registers))
+        merged.merge(HyperLogLog.from_bytes(data))
+        if merged.to_bytes() != bytes(row.registers):
+            row.registers = merged.to_bytes()
+            changed.append(row)
+    ListingViewSketch.objects.bulk_update(changed, ["registers"])
+    ListingViewSketch.objects.bulk_create(created)
+
+
+def _readable_end(first, last, dirty):
+    """
+    Last sequence number that is safe to consume. A slot is missing while
+    its writer is between incrementing the sequence and storing the id, so
+    stop before it; if it is still missing on the next flush (writer died,
+    key evicted), skip it.
+    """
+    for seq in range(first, last + 1):
+        if DIRTY_KEY.format(seq) in dirty:
+            continue
+        if cache.get(STALLED_SEQ_KEY) == seq:
+            continue
+        cache.set(STALLED_SEQ_KEY, seq, timeout=None)
+        return seq - 1
+    return last
+
+
+def flush_view_counts():
+    """
+    Write every buffered view to the database.
+
+    Returns:
+        int: The number of views written (0 if another flush is running).
+    """
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        first = (cache.get(FLUSHED_SEQ_KEY) or 0) + 1
+        last = min(cache.get(DIRTY_SEQ_KEY) or 0, first + MAX_DIRTY_PER_FLUSH - 1)
+        if last < first:
+            return 0
+        dirty = cache.get_many(
+            [DIRTY_KEY.format(seq) for seq in range(first, last + 1)]
+        )
+        last = _readable_end(first, last, dirty)
+        dirty_keys = [DIRTY_KEY.format(seq) for seq in range(first, last + 1)]
+        listing_ids = sorted({dirty[key] for key in dirty_keys if key in dirty})
+
+        counts = _take_pending(listing_ids)
+        try:
+            with transaction.atomic():
+                _apply(counts)
+                _merge_sketches(list(counts))
+        except Exception:
+            # Put the views back for the next flush
+            for pk, n in counts.items():
+                if _incr(PENDING_KEY.format(pk), n) == n:
+                    _mark_dirty(pk)
+            raise
+
+        cache.set(FLUSHED_SEQ_KEY, last, timeout=None)
+        cache.delete_many(dirty_keys)
+        return sum(counts.values())
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def prune_view_sketches():
+    """
+    Delete day sketches older than MAX_STATS_DAYS, which no unique-viewer
+    window reads.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    cutoff = timezone.localdate() - timedelta(days=MAX_STATS_DAYS)
+    deleted, _ = ListingViewSketch.objects.filter(day__lte=cutoff).delete()
+    return deleted
+
+
+def _sketches(listing_ids, days):
+    """(listing_id, day, HyperLogLog) of the last `days` days, today included"""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = ListingViewSketch.objects.filter(
+        listing_id__in=listing_ids, day__gte=since
+    ).values_list("listing_id", "day", "registers")
+    for listing_id, day, registers in rows.iterator():
+        yield listing_id, day, HyperLogLog.from_bytes(bytes(registers))
+
+
+def unique_viewers(listing_ids, days=UNIQUE_VIEWERS_DAYS):
+    """
+    Estimated distinct viewers of each listing over the last `days` days.
+
+    Returns:
+        dict: {listing_id: viewers}, 0 for listings nobody viewed.
+    """
+    merged = {}
+    for listing_id, _, sketch in _sketches(listing_ids, days):
+        if listing_id in merged:
+            merged[listing_id].merge(sketch)
+        else:
+            merged[listing_id] = sketch
+    return {pk: merged[pk].count() if pk in merged else 0 for pk in listing_ids}
+
+
+def cached_unique_viewers(listing_id):
+    """unique_viewers() of one listing, cached until the next flush"""
+    key = UNIQUE_VIEWERS_KEY.format(listing_id)
+    viewers = cache.get(key)
+    if viewers is None:
+        viewers = unique_viewers([listing_id])[listing_id]
+        cache.set(key, viewers, timeout=flush_interval())
+    return viewers
+
+
+def viewer_stats(listing_ids, days=UNIQUE_VIEWERS_DAYS):
+    """
+    Owner dashboard figures over the last `days` days.
+
+    Returns:
+        dict: "unique_viewers" across all the listings (a viewer of several
+        counts once), "listings" {listing_id: unique viewers} and "daily"
+        [{"date", "unique_viewers"}] oldest first, days without views
+        included.
+    """
+    total = HyperLogLog()
+    per_listing = {}
+    per_day = {}
+    for listing_id, day, sketch in _sketches(listing_ids, days):
+        total.merge(sketch)
+        per_listing.setdefault(listing_id, HyperLogLog()).merge(sketch)
+        per_day.setdefault(day, HyperLogLog()).merge(sketch)
+
+    today = timezone.localdate()
+    daily = []
+    for offset in range(days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        sketch = per_day.get(day)
+        daily.append({"date": day, "unique_viewers": sketch.count() if sketch else 0})
+    return {
+        "unique_viewers": total.count(),
+        "listings": {
+            pk: per_listing[pk].count() if pk in per_listing else 0
+            for pk in listing_ids
+        },
+        "daily": daily,
+    }
@@ -1,12 +1,11 @@
 import logging
 
 from django.db import transaction
-from django.db.models import Q, F
-from django.core.cache import cache
+from django.db.models import Count, Exists, Max, OuterRef
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, pagination, status, viewsets
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import (
     SAFE_METHODS,
@@ -17,25 +16,47 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 from django.core.exceptions import RequestDataTooBig
-
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from utils.direct_uploads import (
+    ConfirmUploadSerializer,
+    PresignUploadSerializer,
+    UploadRejected,
+    confirm_upload,
+    issue_upload,
+)
+from utils.pagination import parse_limit
 from utils.s3_service import s3_service
+from utils.upload_handlers import ImageUploadViewMixin
 
 from apps.chat.models import Conversation, ConversationParticipant
-from .constants import (
-    DEFAULT_CATEGORIES,
-    DEFAULT_DORM_LOCATIONS_FLAT,
-    WASHINGTON_SQUARE_DORMS,
-    DOWNTOWN_DORMS,
-    OTHER,
+from .feed_cache import lookup_browse_response, store_browse_response
+from .filter_options import get_filter_options
+from .filters import ListingFilter, ListingSearchFilter
+from .image_processing import delete_images_later, enqueue_unprocessed
+from .models import Listing, ListingImage, Watchlist
+from .pagination import ListingPagination, is_keyset_request
+from .search import search_listings
+from .suggest import (
+    DEFAULT_LIMIT as DEFAULT_SUGGEST_LIMIT,
+    MAX_LIMIT as MAX_SUGGEST_LIMIT,
+    suggest_index,
 )
-from .filters import ListingFilter
-from .models import Listing
 from .serializers import (
     CompactListingSerializer,
     ListingCreateSerializer,
     ListingDetailSerializer,
+    ListingImageSerializer,
     ListingUpdateSerializer,
 )
+from .view_counts import (
+    MAX_STATS_DAYS,
+    UNIQUE_VIEWERS_DAYS,
+    record_view,
+    viewer_stats,
+)
+from .watchlist_status import saved_listing_ids
 
 logger = logging.getLogger(__name__)
 
@@ -55,13 +76,8 @@ class IsOwnerOrReadOnly(BasePermission):
         return obj.user == request.user
 
 
-class ListingPagination(pagination.PageNumberPagination):
-    page_size = 12
-    page_size_query_param = "page_size"
-    max_page_size = 60
-
-
 class ListingViewSet(
+    ImageUploadViewMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
@@ -80,20 +96,20 @@ class ListingViewSet(
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     pagination_class = ListingPagination
+    image_upload_actions = ["create", "update", "partial_update"]
 
     filter_backends = [
         DjangoFilterBackend,
         filters.OrderingFilter,
-        filters.SearchFilter,
+        ListingSearchFilter,
     ]
     filterset_class = ListingFilter
     ordering_fields = ["created_at", "price", "title"]
     ordering = ["-created_at"]
 
-    # TODO: add location to search_fields when we implement geographical location
+    # Searched fields live in search.SEARCH_FIELDS (and the full-text index).
+    # TODO: add location there when we implement geographical location
     # via Google Maps API
-    # search_fields = ["title", "description", "location", "dorm_location", "category"]
-    search_fields = ["title", "description", "dorm_location", "category"]
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -114,11 +130,55 @@ class ListingViewSet(
         else:
             queryset = queryset.order_by("-created_at")
 
-        # Performance optimizations to avoid N+1
-        queryset = queryset.select_related("user").prefetch_related("images")
+        # Performance optimizations to avoid N+1. Cards render the
+        # denormalized primary_image_url, so only detail views need images.
+        queryset = queryset.select_related("user")
+        if self.action not in ["list", "search"]:
+            queryset = queryset.prefetch_related("images")
+
+        # Detail pages read is_saved from the same query as the listing
+        if self.action == "retrieve" and self.request.user.is_authenticated:
+            queryset = queryset.annotate(
+                is_saved_by_user=Exists(
+                    Watchlist.objects.filter(
+                        user=self.request.user, listing=OuterRef("pk")
+                    )
+                )
+            )
 
         return queryset
 
+    def _card_context(self, listings):
+        """Serializer context for a page of cards, saved state in one query"""
+        context = self.get_serializer_context()
+        context["saved_listing_ids"] = saved_listing_ids(
+            self.request.user, [listing.pk for listing in listings]
+        )
+        return context
+
+    def list(self, request, *args, **kwargs):
+        # Anonymous browse pages are the same for everyone (no is_saved)
+        cacheable = not request.user.is_authenticated
+        if cacheable:
+            key, data = lookup_browse_response(request)
+            if data is not None:
+                # Links are built from this request, not the cached one
+                self.paginator.restore_page(request, data["page"])
+                response = self.get_paginated_response(data["results"])
+                response["X-Cache"] = "HIT"
+                return response
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = CompactListingSerializer(
+            page, many=True, context=self._card_context(page)
+        )
+        response = self.get_paginated_response(serializer.data)
+        if cacheable:
+            store_browse_response(key, serializer.data, self.paginator.page_state())
+            response["X-Cache"] = "MISS"
+        return response
+
     def get_serializer_class(self):
         if self.action == "create":
             return ListingCreateSerializer
@@ -136,17 +196,17 @@ class ListingViewSet(
         """
         Set different permissions for different actions:
 
-        - list / retrieve / search: public (no auth required)
+        - list / retrieve / search / suggest: public (no auth required)
         - user_listings: must be authenticated
         - contact_seller: must be authenticated (handled by @action decorator)
         - everything else: default (create/update/delete protected)
         """
         # Public read-only endpoints
-        if self.action in ["list", "retrieve", "search"]:
+        if self.action in ["list", "retrieve", "search", "suggest"]:
             return [AllowAny()]
 
-        # User's own listings require auth
-        if self.action == "user_listings":
+        # User's own listings (and their stats) require auth
+        if self.action in ["user_listings", "user_listing_stats", "stats"]:
             return [IsAuthenticated()]
 
         # contact_seller uses IsAuthenticated from @action decorator
@@ -248,18 +308,78 @@ class ListingViewSet(
         Get all listings for the authenticated user.
         Endpoint: GET /api/v1/listings/user/
         """
-        user_listings = Listing.objects.filter(user=request.user)
-        serializer = self.get_serializer(user_listings, many=True)
+        user_listings = list(
+            Listing.objects.filter(user=request.user).select_related("user")
+        )
+        serializer = self.get_serializer(
+            user_listings, many=True, context=self._card_context(user_listings)
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def _stats_days(self, request):
+        try:
+            days = int(request.query_params.get("days", UNIQUE_VIEWERS_DAYS))
+        except ValueError:
+            raise ValidationError({"days": ["Must be an integer."]})
+        if not 1 <= days <= MAX_STATS_DAYS:
+            raise ValidationError(
+                {"days": [f"Must be between 1 and {MAX_STATS_DAYS}."]}
+            )
+        return days
+
+    @action(detail=False, methods=["get"], url_path="user/stats")
+    def user_listing_stats(self, request):
+        """
+        Views and estimated unique viewers of the authenticated user's listings.
+        GET /api/v1/listings/user/stats/?days=30
+        """
+        days = self._stats_days(request)
+        listings = list(
+            Listing.objects.filter(user=request.user).values(
+                "listing_id", "title", "view_count"
+            )
+        )
+        stats = viewer_stats([row["listing_id"] for row in listings], days)
+        for row in listings:
+            row["unique_viewers"] = stats["listings"][row["listing_id"]]
+        return Response(
+            {
+                "days": days,
+                "unique_viewers": stats["unique_viewers"],
+                "daily": stats["daily"],
+                "listings": listings,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["get"], url_path="stats")
+    def stats(self, request, pk=None):
+        """
+        Views and estimated unique viewers of one listing, for its owner.
+        GET /api/v1/listings/{id}/stats/?days=30
+        """
+        listing = self.get_object()
+        if listing.user_id != request.user.id:
+            raise PermissionDenied("Only the owner can see listing stats.")
+        days = self._stats_days(request)
+        stats = viewer_stats([listing.pk], days)
+        return Response(
+            {
+                "listing_id": listing.pk,
+                "days": days,
+                "view_count": listing.view_count,
+                "unique_viewers": stats["unique_viewers"],
+                "daily": stats["daily"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
     @action(detail=True, methods=["get"], url_path="is_saved")
     def is_saved(self, request, pk=None):
         """
         Check if listing is saved by current user
         GET /api/v1/listings/:id/is_saved/
         """
-        from .models import Watchlist
-
         listing = self.get_object()
         is_saved = Watchlist.objects.filter(user=request.user, listing=listing).exists()
         return Response({"is_saved": is_saved}, status=status.HTTP_200_OK)
@@ -287,42 +407,63 @@ class ListingViewSet(
         q = request.query_params.get("q", "")
         base_qs = self.get_queryset()
 
-        if q != "":
-            qs = base_qs.filter(
-                Q(title__icontains=q)
-                | Q(description__icontains=q)
-                | Q(dorm_location__icontains=q)
-                | Q(category__icontains=q)
-            )
-        else:
-            qs = base_qs
+        # Empty q applies no text filter; otherwise rank by relevance unless
+        # an explicit ordering was requested. Cursor pages are keyed on the
+        # ordering field, so they keep get_queryset's ordering.
+        rank = not request.query_params.get("ordering") and not is_keyset_request(
+            request
+        )
+        qs = search_listings(base_qs, q, rank=rank)
 
         paginator = ListingPagination()
         page = paginator.paginate_queryset(qs, self.request, view=self)
-        serializer = CompactListingSerializer(page, many=True)
+        serializer = CompactListingSerializer(
+            page, many=True, context=self._card_context(page)
+        )
         return paginator.get_paginated_response(serializer.data)
 
-    def perform_destroy(self, instance):
-        """Delete listing and associated S3 images"""
-        listing_id = instance.listing_id
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="suggest",
+        # Public and DB-free: skip JWT auth, which would load the user
+        authentication_classes=[],
+    )
+    def suggest(self, request):
+        """
+        Title/category suggestions for search-as-you-type.
 
-        # Delete all images from S3
-        images = instance.images.all()
-        deleted_count = 0
+        Usage:
+          GET /api/v1/listings/suggest/?q=des
+          GET /api/v1/listings/suggest/?q=des&limit=5
 
-        for image in images:
-            try:
-                success = s3_service.delete_image(image.image_url)
-                if success:
-                    deleted_count += 1
-            except Exception as e:
-                logger.error(f"Error deleting image {image.image_id} from S3: {str(e)}")
-                # Continue with deletion even if individual image deletion fails
+        Served from the in-process prefix index in suggest.py; a missing or
+        blank q returns no suggestions.
+        Response: {"suggestions": [{"text": "Desk lamp", "type": "title"}, ...]}
+        """
+        limit = parse_limit(
+            request.query_params.get("limit"), DEFAULT_SUGGEST_LIMIT, MAX_SUGGEST_LIMIT
+        )
 
-        logger.info(f"Deleted {deleted_count} images from S3 for listing {listing_id}")
+        suggestions = suggest_index.suggest(request.query_params.get("q", ""), limit)
+        return Response({"suggestions": suggestions}, status=status.HTTP_200_OK)
 
-        # Delete the listing (will cascade delete ListingImage records)
-        instance.delete()
+    def perform_destroy(self, instance):
+        """Delete listing and queue its S3 images for deletion"""
+        listing_id = instance.listing_id
+
+        with transaction.atomic():
+            image_urls = [
+                url for image in instance.images.all() for url in image.stored_urls()
+            ]
+            # Files are removed in one batch after commit, off the request path
+            delete_images_later(image_urls)
+            # Delete the listing (will cascade delete ListingImage records)
+            instance.delete()
+
+        logger.info(
+            f"Queued {len(image_urls)} S3 files for deletion for listing {listing_id}"
+        )
 
     @action(detail=False, methods=["get"], url_path="filter-options")
     def filter_options(self, request):
@@ -351,61 +492,24 @@ class ListingViewSet(
         Note: Currently, "locations" contains dorm locations only. In the future,
         "location" may be used for non-dorm geographic locations
         (e.g., via Google Maps API).
-        """
-        # Get distinct categories from active listings (non-empty, sorted)
-        available_categories = set(
-            Listing.objects.filter(status="active")
-            .exclude(Q(category__isnull=True) | Q(category=""))
-            .values_list("category", flat=True)
-            .distinct()
-        )
-
-        # Merge with defaults and sort
-        all_categories = sorted(set(DEFAULT_CATEGORIES) | available_categories)
 
-        # Get distinct dorm locations from active listings
-        # (non-empty, non-null, sorted)
-        available_locations = set(
-            Listing.objects.filter(status="active")
-            .exclude(Q(dorm_location__isnull=True) | Q(dorm_location=""))
-            .values_list("dorm_location", flat=True)
-            .distinct()
-        )
-
-        # Merge with defaults
-        all_dorm_locations = set(DEFAULT_DORM_LOCATIONS_FLAT) | available_locations
-
-        # Group dorm locations by area
-        # Include defaults and any matching locations from DB
-        grouped_dorm_locations = {
-            "washington_square": sorted(
-                set(WASHINGTON_SQUARE_DORMS)
-                | (all_dorm_locations & set(WASHINGTON_SQUARE_DORMS))
-            ),
-            "downtown": sorted(
-                set(DOWNTOWN_DORMS) | (all_dorm_locations & set(DOWNTOWN_DORMS))
-            ),
-            "other": sorted(
-                set(OTHER)
-                | (
-                    all_dorm_locations
-                    - set(WASHINGTON_SQUARE_DORMS)
-                    - set(DOWNTOWN_DORMS)
-                )
-            ),
-        }
-
-        # Flat list for backward compatibility (sorted)
-        flat_locations = sorted(all_dorm_locations)
-
-        return Response(
-            {
-                "categories": all_categories,
-                "dorm_locations": grouped_dorm_locations,
-                "locations": flat_locations,  # Backward compatibility
-            },
-            status=status.HTTP_200_OK,
+        The payload is cached and invalidated by apps.listings.signals. Responses
+        carry ETag/Last-Modified; a matching If-None-Match or If-Modified-Since
+        gets an empty 304.
+        """
+        entry = get_filter_options()
+        response = get_conditional_response(
+            request,
+            etag=entry["etag"],
+            last_modified=entry["last_modified"],
         )
+        if response is None:
+            response = Response(entry["payload"], status=status.HTTP_200_OK)
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        # Let browsers keep it briefly, then revalidate with If-None-Match
+        response["Cache-Control"] = "public, max-age=60, must-revalidate"
+        return response
 
     @action(
         detail=True,
@@ -442,35 +546,101 @@ class ListingViewSet(
 
         return Response({"conversation_id": str(conv.id)}, status=200)
 
-    # Record listing view-count
-    def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
+    @action(detail=True, methods=["post"], url_path="images/presign")
+    def presign_image(self, request, pk=None):
+        """
+        Presign a direct-to-S3 upload of one image for this listing.
+        POST /api/v1/listings/{id}/images/presign/
+        """
+        listing = self.get_object()
+        serializer = PresignUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if listing.images.count() >= 10:
+            raise ValidationError(
+                {"detail": "Listing already has 10 images. Maximum is 10."}
+            )
+
+        upload = issue_upload(
+            request.user, listing.listing_id, "listings", **serializer.validated_data
+        )
+        return Response(upload, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"], url_path="images/confirm")
+    def confirm_image(self, request, pk=None):
+        """
+        Attach a finished direct upload to this listing as a ListingImage.
+        POST /api/v1/listings/{id}/images/confirm/
+        """
+        listing = self.get_object()
+        serializer = ConfirmUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
         try:
-            should_track = request.headers.get(
-                "X-Track-View"
-            ) == "1" or request.query_params.get("track_view") in {"1", "true", "yes"}
-            if not should_track:
-                return response
+            image_url = confirm_upload(
+                serializer.validated_data["upload_token"],
+                request.user,
+                listing.listing_id,
+                "listings",
+            )
+        except UploadRejected as e:
+            raise ValidationError({"upload_token": [str(e)]})
+
+        with transaction.atomic():
+            # Serialize confirms for one listing so the 10-image limit holds
+            Listing.objects.select_for_update().filter(pk=listing.pk).first()
+            images = ListingImage.objects.filter(listing=listing)
+
+            # Confirming the same token twice returns the existing image
+            existing = images.filter(image_url=image_url).first()
+            if existing is not None:
+                return Response(
+                    ListingImageSerializer(existing).data, status=status.HTTP_200_OK
+                )
 
-            obj = self.get_object()
-            cache_key = self._viewer_cache_key(request, obj.pk)  # obj.pk: listing_id
-            if not cache.get(cache_key):
-                Listing.objects.filter(pk=obj.pk).update(view_count=F("view_count") + 1)
-                cache.set(
-                    cache_key, 1, timeout=300
-                )  # Same visit won't be counted in 5 minutes
-        except Exception:
-            pass
+            stats = images.aggregate(count=Count("pk"), max_order=Max("display_order"))
+            if stats["count"] >= 10:
+                s3_service.delete_image(image_url)
+                raise ValidationError(
+                    {"detail": "Listing already has 10 images. Maximum is 10."}
+                )
+
+            image = ListingImage.objects.create(
+                listing=listing,
+                image_url=image_url,
+                display_order=(
+                    0 if stats["max_order"] is None else stats["max_order"] + 1
+                ),
+                is_primary=stats["count"] == 0,
+            )
+            listing.refresh_image_summary()
+            enqueue_unprocessed(listing)
+
+        return Response(
+            ListingImageSerializer(image).data, status=status.HTTP_201_CREATED
+        )
+
+    # Record listing view-count
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        should_track = request.headers.get(
+            "X-Track-View"
+        ) == "1" or request.query_params.get("track_view") in {"1", "true", "yes"}
+        if should_track:
+            try:
+                # Buffered in the cache and written to view_count in batches;
+                # the same viewer isn't counted again within 5 minutes
+                record_view(instance.pk, self._viewer_identity(request))
+            except Exception as e:
+                logger.warning(f"Could not record view of {instance.pk}: {str(e)}")
         return response
 
-    def _viewer_cache_key(self, request, listing_id):
+    def _viewer_identity(self, request):
         if request.user.is_authenticated:
-            ident = f"user:{request.user.id}"
-        else:
-            ip = (request.META.get("HTTP_X_FORWARDED_FOR") or "").split(",")[
-                0
-            ].strip() or request.META.get("REMOTE_ADDR", "")
-            ua = (request.META.get("HTTP_USER_AGENT") or "")[:64]
-            ident = f"ip:{ip}|ua:{ua}"
-
-        return f"listing:view:{listing_id}:{ident}"
+            return f"user:{request.user.id}"
+        ip = (request.META.get("HTTP_X_FORWARDED_FOR") or "").split(",")[
+            0
+        ].strip() or request.META.get("REMOTE_ADDR", "")
+        ua = (request.META.get("HTTP_USER_AGENT") or "")[:64]
+        return f"ip:{ip}|ua:{ua}"
@@ -0,0 +1,74 @@
+"""
+Cached "which of these listings did this user save" lookups, used by
+POST /api/v1/watchlist/status/ and by card pages (list, search, the
+user's listings).
+
+Each user has one cache entry mapping listing_id -> saved for every id
+asked about so far. A request only queries the ids missing from it, in
+one query on the (user, listing) unique index, and adds them.
+
+Entries are keyed by a per-user generation that the Watchlist signal
+receivers replace whenever the user saves or unsaves a listing (see
+signals.py). A lookup that read the database just before the change
+writes under the old generation, where nobody reads it again, so answers
+are never stale; CACHE_TIMEOUT only bounds how long unused entries live.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Watchlist
+
+CACHE_KEY = "watchlist:status:{}:{}"
+GENERATION_KEY = "watchlist:status-generation:{}"
+CACHE_TIMEOUT = 15 * 60
+# Entries that grow past this are started over
+MAX_CACHED_IDS = 1000
+# Ids per status request: one page of cards (ListingPagination.max_page_size)
+MAX_STATUS_IDS = 60
+
+
+def _entry_key(user_id):
+    generation_key = GENERATION_KEY.format(user_id)
+    generation = cache.get(generation_key)
+    if generation is None:
+        cache.add(generation_key, time.time_ns(), timeout=None)
+        generation = cache.get(generation_key)
+    return CACHE_KEY.format(user_id, generation)
+
+
+def saved_listing_ids(user, listing_ids):
+    """
+    The subset of listing_ids the user has saved.
+
+    Returns:
+        set: Saved listing ids; empty for anonymous users.
+    """
+    if not user or not user.is_authenticated or not listing_ids:
+        return set()
+
+    key = _entry_key(user.pk)
+    known = cache.get(key) or {}
+    missing = [pk for pk in set(listing_ids) if pk not in known]
+    if missing:
+        saved = Watchlist.saved_listing_ids(user, missing)
+        if len(known) + len(missing) > MAX_CACHED_IDS:
+            known = {}
+        known.update((pk, pk in saved) for pk in missing)
+        cache.set(key, known, CACHE_TIMEOUT)
+    return {pk for pk in listing_ids if known.get(pk)}
+
+
+def invalidate_saved_listing_ids(user_id):
+    """
+    Start a new generation for the user now and again once the current
+    transaction commits, so lookups that ran before the commit are not
+    reused.
+    """
+    generation_key = GENERATION_KEY.format(user_id)
+    cache.set(generation_key, time.time_ns(), timeout=None)
+    transaction.on_commit(
+        lambda: cache.set(generation_key, time.time_ns(), timeout=None)
+    )
@@ -1,15 +1,27 @@
-from rest_framework import viewsets, status
+from rest_framework import pagination, serializers, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from .models import Watchlist, Listing
-from .serializers import CompactListingSerializer
+from .pagination import is_keyset_request
+from .serializers import CompactListingSerializer, WatchlistStatusSerializer
+from .watchlist_status import saved_listing_ids
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class WatchlistPagination(pagination.CursorPagination):
+    """Newest saves first; no COUNT and no OFFSET however long the list"""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 60
+    ordering = ("-created_at", "-watchlist_id")
+
+
 class WatchlistViewSet(viewsets.ViewSet):
     """
     ViewSet for managing user watchlist
@@ -19,17 +31,47 @@ class WatchlistViewSet(viewsets.ViewSet):
 
     def list(self, request):
         """
-        Get user's watchlist
-        GET /api/v1/watchlist/
+        Get user's watchlist, newest saves first
+        GET /api/v1/watchlist/?status=<status>
+        Returns: [listing card + saved_at]
+        GET /api/v1/watchlist/?pagination=cursor&page_size=<n> (then the
+        `next` link, which carries ?cursor=)
+        Returns: {next, previous, results: [listing card + saved_at]}
+        Sold/inactive listings are included (see their status) unless
+        ?status= picks one.
         """
         watchlist_items = Watchlist.objects.filter(user=request.user).select_related(
-            "listing"
+            "listing", "listing__user"
         )
-        listings = [item.listing for item in watchlist_items]
+        listing_status = request.query_params.get("status")
+        if listing_status:
+            if listing_status not in dict(Listing.STATUS_CHOICES):
+                raise ValidationError({"status": ["Invalid status."]})
+            watchlist_items = watchlist_items.filter(listing__status=listing_status)
+
+        # Cursor pages are opt-in; existing clients expect the whole list
+        paginator = WatchlistPagination() if is_keyset_request(request) else None
+        if paginator is None:
+            page = list(watchlist_items.order_by("-created_at", "-watchlist_id"))
+        else:
+            page = paginator.paginate_queryset(watchlist_items, request, view=self)
+        listings = [item.listing for item in page]
         serializer = CompactListingSerializer(
-            listings, many=True, context={"request": request}
+            listings,
+            many=True,
+            context={
+                "request": request,
+                # Everything on the watchlist is saved; no lookup needed
+                "saved_listing_ids": {listing.pk for listing in listings},
+            },
         )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        saved_at = serializers.DateTimeField()
+        results = serializer.data
+        for card, item in zip(results, page):
+            card["saved_at"] = saved_at.to_representation(item.created_at)
+        if paginator is None:
+            return Response(results, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(results)
 
     def create(self, request):
         """
@@ -78,6 +120,23 @@ class WatchlistViewSet(viewsets.ViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @action(detail=False, methods=["post"], url_path="status")
+    def saved_status(self, request):
+        """
+        Which of a page of listings the user has saved, in one request
+        POST /api/v1/watchlist/status/
+        Body: { "listing_ids": [<id>, ...] }  (at most 60)
+        Returns: { "saved": [<id>, ...] }
+        """
+        serializer = WatchlistStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        listing_ids = serializer.validated_data["listing_ids"]
+        saved = saved_listing_ids(request.user, listing_ids)
+        return Response(
+            {"saved": sorted(saved)},
+            status=status.HTTP_200_OK,
+        )
+
     @action(detail=True, methods=["get"], url_path="is_saved")
     def is_saved(self, request, pk=None):
         """
@@ -1,6 +1,7 @@
 from django.db import transaction
 from rest_framework import serializers
 
+from apps.listings.image_processing import delete_images_later
 from utils.s3_service import s3_service
 
 from .models import Profile
@@ -205,17 +206,17 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        # Handle avatar removal
+        # Handle avatar removal (the file is deleted after commit)
         if remove_avatar and old_avatar_url:
-            s3_service.delete_image(old_avatar_url)
+            delete_images_later([old_avatar_url])
             instance.avatar_url = None
 
         # Handle avatar upload
         if new_avatar:
             try:
                 # Delete old avatar if exists
-                if old_avatar_url:
-                    s3_service.delete_image(old_avatar_url)
+                if old_avatar_url and not remove_avatar:
+                    delete_images_later([old_avatar_url])
 
                 # Upload new avatar
                 avatar_url = s3_service.upload_image(
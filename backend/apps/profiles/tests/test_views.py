@@ -329,3 +329,119 @@ def test_user_cannot_create_multiple_profiles(user_with_profile):
     )
 
     assert res.status_code == 400
+
+
+def _upload_avatar(fake_s3, c, data=b"\x89PNG\r\n\x1a\n" + b"\0" * 64):
+    presigned = c.post(
+        "/api/v1/profiles/me/avatar/presign/",
+        {"content_type": "image/png"},
+        format="json",
+    ).json()
+    fake_s3.put_object(
+        Bucket="test-bucket", Key=presigned["key"], Body=data, ContentType="image/png"
+    )
+    return presigned
+
+
+def test_presign_avatar_requires_profile(fake_s3, client):
+    """Test that presigning an avatar upload requires a profile."""
+    c, _ = client
+
+    res = c.post(
+        "/api/v1/profiles/me/avatar/presign/",
+        {"content_type": "image/png"},
+        format="json",
+    )
+
+    assert res.status_code == 404
+
+
+def test_confirm_avatar_replaces_old_avatar(fake_s3, user_with_profile):
+    """Test that a confirmed direct upload becomes the avatar."""
+    from apps.listings.image_processing import DatabaseImageQueue
+    from utils.s3_service import s3_service
+
+    user, profile = user_with_profile
+    c = APIClient()
+    c.force_authenticate(user=user)
+    old_key = f"profiles/{user.id}/old.png"
+    fake_s3.put_object(Bucket="test-bucket", Key=old_key, Body=b"old")
+    profile.avatar_url = s3_service.public_url(old_key)
+    profile.save()
+
+    presigned = _upload_avatar(fake_s3, c)
+    assert presigned["key"].startswith(f"profiles/{user.id}/")
+
+    res = c.post(
+        "/api/v1/profiles/me/avatar/confirm/",
+        {"upload_token": presigned["upload_token"]},
+        format="json",
+    )
+
+    assert res.status_code == 200
+    profile.refresh_from_db()
+    assert profile.avatar_url == s3_service.public_url(presigned["key"])
+    assert res.json()["avatar_url"] == profile.avatar_url
+    # The old avatar is removed by the deletion worker
+    assert old_key in fake_s3.objects
+    DatabaseImageQueue().run_deletions()
+    assert old_key not in fake_s3.objects
+
+
+def test_confirm_avatar_rejects_invalid_upload(fake_s3, user_with_profile):
+    """Test that a non-image upload is rejected and removed."""
+    user, profile = user_with_profile
+    c = APIClient()
+    c.force_authenticate(user=user)
+    presigned = _upload_avatar(fake_s3, c, data=b"<script>")
+
+    res = c.post(
+        "/api/v1/profiles/me/avatar/confirm/",
+        {"upload_token": presigned["upload_token"]},
+        format="json",
+    )
+
+    assert res.status_code == 400
+    profile.refresh_from_db()
+    assert profile.avatar_url is None
+    assert presigned["key"] not in fake_s3.objects
+
+
+def test_confirm_avatar_rejects_other_users_token(fake_s3, two_users, profile_factory):
+    """Test that an upload token cannot be confirmed by another user."""
+    u1, u2 = two_users
+    profile_factory(u1)
+    p2 = profile_factory(u2)
+    c1 = APIClient()
+    c1.force_authenticate(user=u1)
+    presigned = _upload_avatar(fake_s3, c1)
+
+    c2 = APIClient()
+    c2.force_authenticate(user=u2)
+    res = c2.post(
+        "/api/v1/profiles/me/avatar/confirm/",
+        {"upload_token": presigned["upload_token"]},
+        format="json",
+    )
+
+    assert res.status_code == 400
+    p2.refresh_from_db()
+    assert p2.avatar_url is None
+
+
+def test_delete_profile_queues_avatar_deletion(user_with_profile):
+    """Test that deleting a profile queues its avatar for S3 deletion."""
+    from apps.listings.models import S3DeletionJob
+
+    user, profile = user_with_profile
+    profile.avatar_url = "https://example.com/profiles/1/avatar.png"
+    profile.save()
+    c = APIClient()
+    c.force_authenticate(user=user)
+
+    res = c.delete("/api/v1/profiles/me/")
+
+    assert res.status_code == 204
+    assert list(S3DeletionJob.objects.values_list("image_url", flat=True)) == [
+        "https://example.com/profiles/1/avatar.png"
+    ]
@@ -17,7 +17,9 @@ urlpatterns = router.urls
     3. GET       Y       /api/v1/profiles/<id>/                 retrieve a single profile    profile_id, user_id, full_name, username, email, phone, location, bio, avatar_url, active_listings, sold_items, member_since, created_at, updated_at
     4. GET       Y       /api/v1/profiles/me/                   get current user's profile   profile_id, user_id, full_name, username, email, phone, location, bio, avatar_url, active_listings, sold_items, member_since, created_at, updated_at
     5. PUT/PATCH Y*      /api/v1/profiles/me/                   update user's own profile    full_name, username, phone, location, bio, new_avatar (optional), remove_avatar (optional)
-    6. DELETE    Y*      /api/v1/profiles/me/                   delete user's own profile    (deletes profile and avatar from S3)
+    6. DELETE    Y*      /api/v1/profiles/me/                   delete user's own profile    (deletes profile; avatar is removed from S3 after commit)
+    7. POST      Y*      /api/v1/profiles/me/avatar/presign/    presign avatar upload        content_type (image/jpeg, image/png, image/gif, image/webp), method (optional: POST or PUT)
+    8. POST      Y*      /api/v1/profiles/me/avatar/confirm/    attach uploaded avatar       upload_token (returns the updated profile)
 
     * AUTH Y with OWNERSHIP CHECK: User must be authenticated AND own the profile
 
@@ -47,6 +49,16 @@ urlpatterns = router.urls
     - new_avatar: Image file to upload (replaces existing avatar)
     - remove_avatar: Boolean to remove current avatar without uploading new one
 
+    Direct avatar upload (no file passes through the API server):
+    1. POST /api/v1/profiles/me/avatar/presign/ {"content_type": "image/jpeg"}
+       -> {"upload": {method, url, fields, headers}, "upload_token", "key", "expires_in"}
+    2. Send the file to upload.url: for POST, a multipart form with every
+       upload.fields entry followed by a "file" field; for PUT, the raw bytes
+       with upload.headers. Files over 10MB are rejected.
+    3. POST /api/v1/profiles/me/avatar/confirm/ {"upload_token": "..."}
+       The object is checked (exists, <= 10MB, content type and image bytes
+       match) before it replaces the current avatar.
+
     Example create request body (multipart/form-data):
     {
         "full_name": "Alex Morgan",
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
@@ -9,7 +10,15 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 
-from utils.s3_service import s3_service
+from apps.listings.image_processing import delete_images_later
+from utils.direct_uploads import (
+    ConfirmUploadSerializer,
+    PresignUploadSerializer,
+    UploadRejected,
+    confirm_upload,
+    issue_upload,
+)
+from utils.upload_handlers import ImageUploadViewMixin
 
 from .models import Profile
 from .serializers import (
@@ -36,6 +45,7 @@ class IsOwnerOrReadOnly(BasePermission):
 
 
 class ProfileViewSet(
+    ImageUploadViewMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -53,11 +63,15 @@ class ProfileViewSet(
     - GET /api/v1/profiles/me/ - Get current user's profile (auth)
     - PUT/PATCH /api/v1/profiles/me/ - Update user's profile (auth)
     - DELETE /api/v1/profiles/me/ - Delete user's profile (auth)
+    - POST /api/v1/profiles/me/avatar/presign/ - Presign avatar upload (auth)
+    - POST /api/v1/profiles/me/avatar/confirm/ - Attach uploaded avatar (auth)
     """
 
     queryset = Profile.objects.all()
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    # Avatar uploads (avatar on create, new_avatar on me/)
+    image_upload_actions = ["create", "update", "partial_update", "me"]
 
     # Filtering and searching
     filter_backends = [
@@ -100,12 +114,13 @@ class ProfileViewSet(
         """
         user = instance.user
 
-        # Delete S3 avatar if exists
-        if instance.avatar_url:
-            s3_service.delete_image(instance.avatar_url)
+        with transaction.atomic():
+            # Delete S3 avatar if exists (after commit, off the request path)
+            if instance.avatar_url:
+                delete_images_later([instance.avatar_url])
 
-        # Delete the user (cascades to profile due to OneToOne relationship)
-        user.delete()
+            # Delete the user (cascades to profile due to OneToOne relationship)
+            user.delete()
 
     @action(detail=False, methods=["get", "put", "patch", "delete"], url_path="me")
     def me(self, request):
@@ -145,3 +160,69 @@ class ProfileViewSet(
                 {"detail": "Profile deleted successfully."},
                 status=status.HTTP_204_NO_CONTENT,
             )
+
+    def _own_profile(self, request):
+        try:
+            return request.user.profile
+        except Profile.DoesNotExist:
+            return None
+
+    @action(detail=False, methods=["post"], url_path="me/avatar/presign")
+    def presign_avatar(self, request):
+        """
+        Presign a direct-to-S3 upload of a new avatar.
+
+        POST /api/v1/profiles/me/avatar/presign/
+        """
+        if self._own_profile(request) is None:
+            return Response(
+                {"detail": "Profile not found. Please create one first."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = PresignUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        upload = issue_upload(
+            request.user, request.user.id, "profiles", **serializer.validated_data
+        )
+        return Response(upload, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"], url_path="me/avatar/confirm")
+    def confirm_avatar(self, request):
+        """
+        Replace the current user's avatar with a finished direct upload.
+
+        POST /api/v1/profiles/me/avatar/confirm/
+        """
+        profile = self._own_profile(request)
+        if profile is None:
+            return Response(
+                {"detail": "Profile not found. Please create one first."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = ConfirmUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            avatar_url = confirm_upload(
+                serializer.validated_data["upload_token"],
+                request.user,
+                request.user.id,
+                "profiles",
+            )
+        except UploadRejected as e:
+            return Response(
+                {"upload_token": [str(e)]}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        old_avatar_url = profile.avatar_url
+        if old_avatar_url != avatar_url:
+            with transaction.atomic():
+                profile.avatar_url = avatar_url
+                profile.save(update_fields=["avatar_url", "updated_at"])
+                if old_avatar_url:
+                    delete_images_later([old_avatar_url])
+
+        return Response(
+            ProfileDetailSerializer(profile).data, status=status.HTTP_200_OK
+        )
@@ -30,3 +30,30 @@ except Exception:
 def _media_settings(tmp_path, settings):
     settings.MEDIA_ROOT = tmp_path / "media"
     return settings
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # Cached payloads (e.g. filter-options) must not leak between tests whose
+    # database changes are rolled back without firing model signals
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
+@pytest.fixture
+def fake_s3(settings):
+    """Point s3_service at an in-memory bucket (tests.fake_s3.FakeS3Client)"""
+    from unittest.mock import patch
+
+    from tests.fake_s3 import FakeS3Client
+    from utils import s3_service as s3_module
+
+    settings.AWS_STORAGE_BUCKET_NAME = "test-bucket"
+    settings.AWS_S3_REGION_NAME = "us-east-1"
+    s3_module._reset_s3_service()
+    with patch("utils.s3_service.boto3.client", return_value=FakeS3Client()):
+        service = s3_module.get_s3_service()
+    yield service.s3_client
+    s3_module._reset_s3_service()
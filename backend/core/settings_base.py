@@ -4,6 +4,8 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+from .shared_backends import build_caches, build_channel_layers
+
 # Conditionally import pymysql only if using MySQL
 # This allows SQLite-based settings (like settings_local) to work without pymysql
 try:
@@ -70,8 +72,14 @@ TEMPLATES = [
 
 ASGI_APPLICATION = "core.asgi.application"
 
-# Dev in-memory channel layer (use Redis in prod)
-CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+# Shared backends for chat broadcasts and the cache (OTPs, throttles, view
+# dedup). Set REDIS_URL (redis://host:6379/0) when running more than one
+# worker; unset falls back to per-process in-memory backends and
+# "fakeredis://" uses an in-process fake server (tests).
+# See core/shared_backends.py
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+CHANNEL_LAYERS = build_channel_layers(REDIS_URL)
 
 WSGI_APPLICATION = "core.wsgi.application"
 
@@ -143,12 +151,20 @@ AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
 AWS_S3_REGION_NAME = os.environ.get("AWS_S3_REGION_NAME", "us-east-1")
 AWS_STORAGE_BUCKET_NAME = os.environ.get("AWS_STORAGE_BUCKET_NAME")
 
-# Cache Configuration (for OTP storage)
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-    }
-}
+# Listing image variants (apps/listings/image_processing.py): "database" queues
+# jobs for `manage.py process_image_jobs`; "inline" renders after each request
+IMAGE_QUEUE_BACKEND = os.environ.get("IMAGE_QUEUE_BACKEND", "database")
+
+# Cache Configuration (OTP storage, throttles, listing view dedup and
+# buffered view counts)
+CACHES = build_caches(REDIS_URL)
+
+# Seconds between writes of buffered listing views to Listing.view_count
+# (apps/listings/view_counts.py)
+VIEW_COUNT_FLUSH_INTERVAL = int(os.environ.get("VIEW_COUNT_FLUSH_INTERVAL", "60"))
+# Write each view straight to the database instead of buffering it; None
+# (default) does so only when the cache is per-process (REDIS_URL unset)
+VIEW_COUNT_WRITE_THROUGH = None
 
 # Email Configuration
 EMAIL_BACKEND = os.environ.get(
@@ -171,8 +187,10 @@ EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
 
 # Django upload size limits
-# Configure to allow uploads up to 120MB (10MB × 10 images + overhead)
-# This matches nginx client_max_body_size configuration
-DATA_UPLOAD_MAX_MEMORY_SIZE = 120 * 1024 * 1024  # 120MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 120 * 1024 * 1024  # 120MB
+# nginx client_max_body_size allows 120MB (10MB × 10 images + overhead).
+# Listing and avatar uploads are parsed by ImageUploadHandler (installed per
+# view through utils.upload_handlers.ImageUploadViewMixin): each file is
+# spooled to a temp file in 64KB chunks and rejected once it passes 10MB.
+# Only non-file form fields / JSON bodies are read into memory
+DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000  # Allow for many images and form fields
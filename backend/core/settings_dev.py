@@ -50,9 +50,6 @@ DATABASES = {
     }
 }
 
-# settings.py (DEV ONLY)
-CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
-
 
 SECURE_SSL_REDIRECT = False
 SESSION_COOKIE_SECURE = False
@@ -45,9 +45,6 @@ INSTALLED_APPS += ["django_extensions"]  # noqa: F405
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "dev-test-secret-key")
 
 
-# Channels: in-memory layer for tests
-CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
-
 # DRF defaults so APIClient works without extra config
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -78,5 +75,3 @@ if os.environ.get("PYTEST_CURRENT_TEST"):
             "NAME": ":memory:",
         }
     }
-
-CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
@@ -0,0 +1,83 @@
+"""
+Settings helpers for the process-shared backends: Django's CACHES and
+Channels' CHANNEL_LAYERS.
+
+Both are selected by a single URL (REDIS_URL in the environment):
+
+- empty / unset   -> per-process LocMemCache + InMemoryChannelLayer
+                     (single worker only: OTPs, throttles, view dedup keys and
+                     chat broadcasts do not cross processes)
+- redis://...     -> django.core.cache.backends.redis.RedisCache +
+  rediss://...       channels_redis RedisChannelLayer on the same server
+- fakeredis://    -> the same Redis backends wired to an in-process fakeredis
+                     server, so tests exercise the shared code paths without
+                     running Redis
+
+redis/channels_redis are only imported when the matching URL is selected.
+fakeredis is a test-only dependency (requirements-dev.txt) and is imported
+only for fakeredis:// URLs, so production installs do not need it.
+"""
+
+FAKE_REDIS_SCHEME = "fakeredis://"
+
+_fake_server = None
+
+
+def get_fake_redis_server():
+    """Process-wide fakeredis server shared by the cache and channel layer"""
+    global _fake_server
+    if _fake_server is None:
+        import fakeredis
+
+        _fake_server = fakeredis.FakeServer()
+    return _fake_server
+
+
+def build_caches(redis_url, key_prefix="nyu-marketplace"):
+    """Return a CACHES setting for the given backend URL"""
+    if not redis_url:
+        return {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            }
+        }
+
+    cache = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": redis_url,
+        "KEY_PREFIX": key_prefix,
+    }
+    if redis_url.startswith(FAKE_REDIS_SCHEME):
+        import fakeredis
+
+        # RedisCache passes OPTIONS through to redis.ConnectionPool
+        cache["LOCATION"] = "redis://fakeredis"
+        cache["OPTIONS"] = {
+            "connection_class": fakeredis.FakeConnection,
+            "server": get_fake_redis_server(),
+        }
+    return {"default": cache}
+
+
+def build_channel_layers(redis_url, prefix="nyu-marketplace"):
+    """Return a CHANNEL_LAYERS setting for the given backend URL"""
+    if not redis_url:
+        return {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+    if redis_url.startswith(FAKE_REDIS_SCHEME):
+        from fakeredis import aioredis as fake_aioredis
+
+        # channels_redis builds a redis.asyncio.ConnectionPool(**host)
+        host = {
+            "connection_class": fake_aioredis.FakeConnection,
+            "server": get_fake_redis_server(),
+        }
+    else:
+        host = {"address": redis_url}
+
+    return {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [host], "prefix": prefix},
+        }
+    }
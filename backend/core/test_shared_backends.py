@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from channels.layers import get_channel_layer
+from channels_redis.core import RedisChannelLayer
+from django.core.cache.backends.redis import RedisCache
+
+from core.shared_backends import build_caches, build_channel_layers
+
+
+def _redis_cache(config):
+    """Instantiate the cache backend the way django.core.cache would"""
+    params = {k: v for k, v in config.items() if k not in ("BACKEND", "LOCATION")}
+    return RedisCache(config["LOCATION"], params)
+
+
+def test_empty_url_selects_in_process_backends():
+    assert (
+        build_caches("")["default"]["BACKEND"]
+        == "django.core.cache.backends.locmem.LocMemCache"
+    )
+    assert (
+        build_channel_layers("")["default"]["BACKEND"]
+        == "channels.layers.InMemoryChannelLayer"
+    )
+
+
+def test_redis_url_selects_redis_backends():
+    url = "redis://cache.internal:6379/1"
+    cache = build_caches(url)["default"]
+    layer = build_channel_layers(url)["default"]
+
+    assert cache["BACKEND"] == "django.core.cache.backends.redis.RedisCache"
+    assert cache["LOCATION"] == url
+    assert layer["BACKEND"] == "channels_redis.core.RedisChannelLayer"
+    assert layer["CONFIG"]["hosts"] == [{"address": url}]
+
+
+def test_fake_cache_is_shared_between_instances():
+    # Two cache instances stand in for two worker processes
+    config = build_caches("fakeredis://")["default"]
+    worker_a, worker_b = _redis_cache(config), _redis_cache(config)
+
+    worker_a.set("otp:someone@nyu.edu", "123456", timeout=60)
+    assert worker_b.get("otp:someone@nyu.edu") == "123456"
+    worker_a.set("throttle:someone", 1, timeout=60)
+    assert worker_b.incr("throttle:someone") == 2
+    worker_a.delete_many(["otp:someone@nyu.edu", "throttle:someone"])
+
+
+@pytest.mark.asyncio
+async def test_fake_channel_layer_broadcasts_across_instances():
+    config = build_channel_layers("fakeredis://")["default"]["CONFIG"]
+    worker_a = RedisChannelLayer(**config)
+    worker_b = RedisChannelLayer(**config)
+
+    channel = await worker_a.new_channel()
+    await worker_a.group_add("chat.shared-test", channel)
+    await worker_b.group_send(
+        "chat.shared-test", {"type": "message.new", "message": {"text": "hi"}}
+    )
+
+    event = await asyncio.wait_for(worker_a.receive(channel), timeout=3)
+    assert event["message"] == {"text": "hi"}
+    await worker_a.flush()
+
+
+@pytest.mark.asyncio
+async def test_settings_channel_layer_is_usable():
+    # Whatever REDIS_URL selected, the configured layer must round-trip
+    layer = get_channel_layer()
+    channel = await layer.new_channel()
+    await layer.send(channel, {"type": "ping"})
+    assert (await asyncio.wait_for(layer.receive(channel), timeout=3)) == {
+        "type": "ping"
+    }
@@ -38,6 +38,13 @@ class ListingFactory(factory.django.DjangoModelFactory):
 class ListingImageFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = ListingImage
+        skip_postgeneration_save = True
 
     listing = factory.SubFactory(ListingFactory)
     image_url = "http://example.com/image.png"
+
+    @factory.post_generation
+    def sync_listing(self, create, extracted, **kwargs):
+        # Mirror the serializers, which keep Listing.primary_image_url in sync
+        if create:
+            self.listing.refresh_image_summary()
@@ -0,0 +1,85 @@
+"""
+In-memory stand-in for the boto3 S3 client, for tests that exercise the
+direct upload flow end to end. Presigned requests are recorded rather than
+signed; tests "upload" by calling put_object() with what a client would send.
+"""
+
+import io
+
+from botocore.exceptions import ClientError
+from django.utils import timezone
+
+
+def _not_found(operation):
+    return ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, operation)
+
+
+class FakeS3Client:
+    def __init__(self, bucket="test-bucket"):
+        self.bucket = bucket
+        self.objects = {}  # key -> (bytes, content type)
+        self.modified = {}  # key -> LastModified
+        self.presigned = []  # recorded presign requests
+
+    def generate_presigned_post(
+        self, Bucket, Key, Fields=None, Conditions=None, ExpiresIn=3600
+    ):
+        self.presigned.append(
+            {"method": "POST", "key": Key, "conditions": Conditions or []}
+        )
+        fields = dict(Fields or {})
+        fields.update({"key": Key, "policy": "fake-policy", "x-amz-signature": "sig"})
+        return {"url": f"https://{Bucket}.s3.amazonaws.com/", "fields": fields}
+
+    def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600):
+        self.presigned.append({"method": "PUT", "key": Params["Key"], "params": Params})
+        return (
+            f"https://{Params['Bucket']}.s3.amazonaws.com/{Params['Key']}"
+            "?X-Amz-Signature=sig"
+        )
+
+    def put_object(self, Bucket, Key, Body, ContentType="", **kwargs):
+        self.objects[Key] = (bytes(Body), ContentType)
+        self.modified[Key] = timezone.now()
+        return {}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise _not_found("HeadObject")
+        data, content_type = self.objects[Key]
+        return {"ContentLength": len(data), "ContentType": content_type}
+
+    def get_object(self, Bucket, Key, Range=None):
+        if Key not in self.objects:
+            raise _not_found("GetObject")
+        data, content_type = self.objects[Key]
+        if Range:
+            start, end = Range.removeprefix("bytes=").split("-")
+            data = data[int(start) : int(end) + 1]
+        return {"Body": io.BytesIO(data), "ContentType": content_type}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"], None)
+        return {}
+
+    def list_objects_v2(
+        self, Bucket, Prefix="", MaxKeys=1000, StartAfter="", ContinuationToken=""
+    ):
+        # The continuation token is simply the last key of the previous page
+        after = ContinuationToken or StartAfter
+        keys = sorted(k for k in self.objects if k.startswith(Prefix) and k > after)
+        page = keys[:MaxKeys]
+        response = {
+            "Contents": [
+                {"Key": key, "LastModified": self.modified[key]} for key in page
+            ],
+            "IsTruncated": len(keys) > MaxKeys,
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
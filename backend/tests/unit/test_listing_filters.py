@@ -7,7 +7,7 @@ from decimal import Decimal
 from django.http import QueryDict
 from faker import Faker
 from rest_framework.exceptions import ValidationError
-from apps.listings.models import Listing
+from apps.listings.models import Dorm, Listing
 from apps.listings.filters import ListingFilter
 from apps.users.models import User
 
@@ -565,3 +565,107 @@ class TestListingFilterPostedWithin:
         filterset = ListingFilter(data={}, queryset=Listing.objects.all())
         with pytest.raises(ValidationError):
             filterset.filter_posted_within(Listing.objects.all(), "posted_within", None)
+
+
+@pytest.mark.django_db
+class TestListingFilterDorms:
+    """Test location and area filters resolved through the dorms table."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Create test data."""
+        self.user = User.objects.create_user(
+            email=f"{fake.user_name()}@nyu.edu",
+            password="testpass123",
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+        )
+
+        def create(title, location):
+            return Listing.objects.create(
+                user=self.user,
+                category="Books",
+                title=title,
+                description="Test",
+                price=Decimal("10.00"),
+                status="active",
+                dorm_location=location,
+            )
+
+        self.othmer = create("Othmer", "othmer hall ")
+        self.mercer = create("Mercer", "194 Mercer")
+        self.off_campus = create("Off campus", "Off-Campus")
+        self.legacy = create("Legacy", "Brooklyn, NY")
+        self.blank = create("Blank", "")
+        self.unset = create("Unset", None)
+
+    def _titles(self, data):
+        filterset = ListingFilter(data=data, queryset=Listing.objects.all())
+        assert filterset.is_valid()
+        return {listing.title for listing in filterset.qs}
+
+    def test_dorm_and_area_follow_dorm_location(self):
+        """Test saved listings point at the matching dorm and its area."""
+        assert self.othmer.dorm == Dorm.objects.get(name="Othmer Hall")
+        assert self.othmer.area == "washington_square"
+        assert self.mercer.area == "downtown"
+        assert self.legacy.dorm.is_default is False
+        assert self.legacy.area == "other"
+        assert self.blank.dorm is None and self.unset.area is None
+
+    def test_changing_location_moves_dorm(self):
+        """Test updating dorm_location resyncs dorm and area."""
+        self.legacy.dorm_location = "Clark Hall"
+        self.legacy.save()
+
+        self.legacy.refresh_from_db()
+        assert self.legacy.dorm.name == "Clark Hall"
+        assert self.legacy.area == "washington_square"
+
+    def test_update_fields_location_save_moves_dorm(self):
+        """Test save(update_fields=["dorm_location"]) resyncs dorm and area."""
+        self.legacy.dorm_location = "194 Mercer"
+        self.legacy.save(update_fields=["dorm_location"])
+
+        self.legacy.refresh_from_db()
+        assert self.legacy.dorm.name == "194 Mercer"
+        assert self.legacy.area == "downtown"
+
+    def test_update_fields_without_location_keeps_dorm(self):
+        """Test saves that leave dorm_location out do not touch the dorm."""
+        self.othmer.dorm_location = "194 Mercer"
+        self.othmer.title = "Renamed"
+        self.othmer.save(update_fields=["title"])
+
+        self.othmer.refresh_from_db()
+        assert self.othmer.dorm_location == "othmer hall "
+        assert self.othmer.area == "washington_square"
+
+    def test_off_campus_matches_legacy_and_unset(self):
+        """Test Off-Campus matches itself, legacy locations and no location."""
+        assert self._titles({"locations": "Off-Campus"}) == {
+            "Off campus",
+            "Legacy",
+            "Blank",
+            "Unset",
+        }
+
+    def test_location_partial_match_uses_dorm(self):
+        """Test partial location terms match legacy and default dorms."""
+        assert self._titles({"location": "brook"}) == {"Legacy"}
+        assert self._titles({"locations": "Othmer,Mercer"}) == {"Othmer", "Mercer"}
+
+    def test_filter_by_area(self):
+        """Test area filter accepts comma-separated and repeated values."""
+        assert self._titles({"area": "downtown"}) == {"Mercer"}
+        query_dict = QueryDict(mutable=True)
+        query_dict.setlist("area", ["downtown", "washington_square"])
+        assert self._titles(query_dict) == {"Mercer", "Othmer"}
+
+    def test_filter_by_invalid_area(self):
+        """Test unknown area raises ValidationError."""
+        filterset = ListingFilter(
+            data={"area": "uptown"}, queryset=Listing.objects.all()
+        )
+        with pytest.raises(ValidationError):
+            filterset.filter_areas(Listing.objects.all(), "area", "uptown")
@@ -0,0 +1,137 @@
+"""
+Direct-to-S3 image uploads.
+
+Instead of streaming the file through a web worker, the client asks for a
+presigned upload, sends the bytes straight to the bucket and then confirms:
+
+1. issue_upload():  picks the object key ({folder}/{resource_id}/<uuid>.ext)
+   and returns presigned POST/PUT details plus a signed upload_token that
+   records who may confirm what
+2. the client uploads to S3 (POST enforces the size limit on S3's side)
+3. confirm_upload(): checks the token, HEADs the object (exists, size,
+   content type), reads its first bytes to sniff the real format, and
+   returns the public URL for the caller to attach (ListingImage,
+   Profile.avatar_url). Rejected objects are deleted from the bucket.
+
+The token is stateless (django.core.signing), so nothing is written to the
+database until the upload is confirmed.
+"""
+
+from django.core import signing
+from rest_framework import serializers
+
+from .s3_service import s3_service
+from .upload_handlers import MAX_IMAGE_SIZE, sniff_image_format
+
+# content type -> (file extension, format sniffed from the magic bytes)
+ALLOWED_CONTENT_TYPES = {
+    "image/jpeg": ("jpg", "JPEG"),
+    "image/png": ("png", "PNG"),
+    "image/gif": ("gif", "GIF"),
+    "image/webp": ("webp", "WEBP"),
+}
+
+UPLOAD_EXPIRES_IN = 15 * 60  # seconds, for both the signature and the token
+TOKEN_SALT = "utils.direct_uploads"
+SNIFF_LENGTH = 16
+
+
+class UploadRejected(ValueError):
+    """The upload token or the uploaded object failed validation"""
+
+
+class PresignUploadSerializer(serializers.Serializer):
+    content_type = serializers.ChoiceField(choices=list(ALLOWED_CONTENT_TYPES))
+    method = serializers.ChoiceField(choices=["POST", "PUT"], default="POST")
+
+
+class ConfirmUploadSerializer(serializers.Serializer):
+    upload_token = serializers.CharField()
+
+
+def issue_upload(user, resource_id, folder_name, content_type, method="POST"):
+    """
+    Presign an upload of one image for `user` under folder_name/resource_id
+
+    Returns:
+        dict: {"upload": presigned request details, "upload_token": str,
+        "key": str, "expires_in": int}
+    """
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise UploadRejected(
+            f"Invalid content type. Allowed: {', '.join(ALLOWED_CONTENT_TYPES)}"
+        )
+    extension, _ = ALLOWED_CONTENT_TYPES[content_type]
+    key = s3_service.new_key(resource_id, folder_name, extension)
+    upload = s3_service.presigned_upload(
+        key,
+        content_type,
+        MAX_IMAGE_SIZE,
+        expires_in=UPLOAD_EXPIRES_IN,
+        method=method,
+    )
+    token = signing.dumps(
+        {
+            "user": user.pk,
+            "resource": f"{folder_name}/{resource_id}",
+            "key": key,
+            "content_type": content_type,
+        },
+        salt=TOKEN_SALT,
+    )
+    return {
+        "upload": upload,
+        "upload_token": token,
+        "key": key,
+        "expires_in": UPLOAD_EXPIRES_IN,
+    }
+
+
+def _load_token(token, user, resource_id, folder_name):
+    try:
+        # The client may finish the upload right before the signature
+        # expires; give it the same window again to confirm
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=2 * UPLOAD_EXPIRES_IN)
+    except signing.SignatureExpired:
+        raise UploadRejected("Upload token has expired")
+    except signing.BadSignature:
+        raise UploadRejected("Invalid upload token")
+    resource = f"{folder_name}/{resource_id}"
+    if data.get("user") != user.pk or data.get("resource") != resource:
+        raise UploadRejected("Upload token does not belong to this resource")
+    return data
+
+
+def _check_object(key, content_type):
+    head = s3_service.head_object(key)
+    if head is None:
+        raise UploadRejected("Uploaded file not found")
+    if head["size"] > MAX_IMAGE_SIZE:
+        raise UploadRejected("Image file size cannot exceed 10MB")
+    if head["size"] == 0:
+        raise UploadRejected("Uploaded file is empty")
+    if head["content_type"] != content_type:
+        raise UploadRejected("Uploaded file has the wrong content type")
+    # The Content-Type header is whatever the client sent; check the bytes
+    _, expected_format = ALLOWED_CONTENT_TYPES[content_type]
+    if sniff_image_format(s3_service.read_head(key, SNIFF_LENGTH)) != expected_format:
+        raise UploadRejected("Invalid image file")
+
+
+def confirm_upload(token, user, resource_id, folder_name):
+    """
+    Validate a finished direct upload and return its public URL
+
+    Raises:
+        UploadRejected: If the token is invalid for this user/resource or
+        the object is missing, too large, or not the promised image type.
+        A rejected object is deleted.
+    """
+    data = _load_token(token, user, resource_id, folder_name)
+    url = s3_service.public_url(data["key"])
+    try:
+        _check_object(data["key"], data["content_type"])
+    except UploadRejected:
+        s3_service.delete_image(url)
+        raise
+    return url
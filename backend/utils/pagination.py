@@ -0,0 +1,18 @@
+"""
+Query-param helpers shared by paginated endpoints.
+"""
+
+from rest_framework.exceptions import ValidationError
+
+
+def parse_limit(raw, default, maximum, param="limit"):
+    """Parse a page-size query param, clamped to [1, maximum]"""
+    if raw in (None, ""):
+        return default
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({param: ["Must be a positive integer."]})
+    if limit < 1:
+        raise ValidationError({param: ["Must be a positive integer."]})
+    return min(limit, maximum)
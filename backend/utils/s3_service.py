@@ -1,13 +1,45 @@
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from django.conf import settings
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent uploads per upload_images() call
+UPLOAD_MAX_WORKERS = 4
+
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+# upload_fileobj streams files over 8MB as a multipart upload, reading the
+# (spooled) upload 5MB at a time with at most 2 parts in flight: memory per
+# file stays ~10MB, and per request UPLOAD_MAX_WORKERS times that, whatever
+# the number of images.
+UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=5 * 1024 * 1024,
+    max_concurrency=2,
+)
+
+
+class UploadResult(NamedTuple):
+    """Outcome of one file in an upload_images() batch"""
+
+    index: int  # position in the input list
+    name: str
+    url: str = None
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
 
 class S3Service:
     """Generic service class for handling S3 image operations"""
@@ -39,9 +71,7 @@ class S3Service:
 
             # Generate unique filename
             file_extension = image_file.name.split(".")[-1].lower()
-            unique_filename = (
-                f"{folder_name}/{resource_id}/{uuid.uuid4()}.{file_extension}"
-            )
+            unique_filename = self.new_key(resource_id, folder_name, file_extension)
 
             # Upload to S3 with public-read ACL
             self.s3_client.upload_fileobj(
@@ -52,10 +82,11 @@ class S3Service:
                     "ContentType": image_file.content_type,
                     "ACL": "public-read",
                 },
+                Config=UPLOAD_TRANSFER_CONFIG,
             )
 
             # Construct public URL
-            public_url = f"https://{self.bucket_name}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{unique_filename}"  # noqa: E501
+            public_url = self._public_url(unique_filename)
 
             logger.info(f"Successfully uploaded image to S3: {public_url}")
             return public_url
@@ -67,6 +98,187 @@ class S3Service:
             logger.error(f"Unexpected error uploading image: {str(e)}")
             raise
 
+    def upload_images(
+        self, image_files, resource_id, folder_name="listings", max_workers=None
+    ):
+        """
+        Upload several images concurrently on a bounded thread pool
+
+        Args:
+            image_files: Django UploadedFile objects
+            resource_id: ID of the resource these images belong to
+            folder_name: S3 folder/prefix (default: 'listings')
+            max_workers: Pool size (default: UPLOAD_MAX_WORKERS)
+
+        Returns:
+            list[UploadResult]: One result per file, in input order. Failures
+            are reported per image (result.error) instead of raised.
+        """
+        image_files = list(image_files)
+        if not image_files:
+            return []
+
+        def upload(index, image_file):
+            name = getattr(image_file, "name", "") or ""
+            try:
+                url = self.upload_image(image_file, resource_id, folder_name)
+                return UploadResult(index, name, url=url)
+            except Exception as e:
+                return UploadResult(index, name, error=str(e))
+
+        workers = min(max_workers or UPLOAD_MAX_WORKERS, len(image_files))
+        if workers == 1:
+            return [upload(i, f) for i, f in enumerate(image_files)]
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="s3-upload"
+        ) as pool:
+            return list(pool.map(upload, range(len(image_files)), image_files))
+
+    def new_key(self, resource_id, folder_name, extension):
+        """Unique key for a new object: {folder_name}/{resource_id}/<uuid>.ext"""
+        return f"{folder_name}/{resource_id}/{uuid.uuid4()}.{extension}"
+
+    def presigned_upload(
+        self, key, content_type, max_size, expires_in=900, method="POST"
+    ):
+        """
+        Let a client upload one object straight to the bucket
+
+        Args:
+            key: Object key the client may write
+            content_type: Content-Type the object must be stored with
+            max_size: Largest accepted object in bytes (enforced by S3 for
+                POST uploads; PUT uploads are only checked on confirm)
+            expires_in: Seconds the signature stays valid
+            method: "POST" (browser form upload) or "PUT"
+
+        Returns:
+            dict: method, url, fields (form fields to send before the file,
+            POST only) and headers (to send with the request, PUT only)
+        """
+        try:
+            if method == "PUT":
+                url = self.s3_client.generate_presigned_url(
+                    "put_object",
+                    Params={
+                        "Bucket": self.bucket_name,
+                        "Key": key,
+                        "ContentType": content_type,
+                        "ACL": "public-read",
+                    },
+                    ExpiresIn=expires_in,
+                )
+                return {
+                    "method": "PUT",
+                    "url": url,
+                    "fields": {},
+                    "headers": {
+                        "Content-Type": content_type,
+                        "x-amz-acl": "public-read",
+                    },
+                }
+
+            post = self.s3_client.generate_presigned_post(
+                Bucket=self.bucket_name,
+                Key=key,
+                Fields={"Content-Type": content_type, "acl": "public-read"},
+                Conditions=[
+                    {"Content-Type": content_type},
+                    {"acl": "public-read"},
+                    ["content-length-range", 1, max_size],
+                ],
+                ExpiresIn=expires_in,
+            )
+        except ClientError as e:
+            logger.error(f"Error presigning upload for {key}: {str(e)}")
+            raise Exception(f"Failed to presign S3 upload: {str(e)}")
+        return {
+            "method": "POST",
+            "url": post["url"],
+            "fields": post["fields"],
+            "headers": {},
+        }
+
+    def head_object(self, key):
+        """
+        Return the stored size and content type of an object, or None if
+        it does not exist
+        """
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return None
+            logger.error(f"Error reading {key} metadata from S3: {str(e)}")
+            raise Exception(f"Failed to read S3 object metadata: {str(e)}")
+        return {
+            "size": response["ContentLength"],
+            "content_type": response.get("ContentType", ""),
+        }
+
+    def read_head(self, key, length):
+        """Return the first `length` bytes of an object (ranged GET)"""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name, Key=key, Range=f"bytes=0-{length - 1}"
+            )
+        except ClientError as e:
+            logger.error(f"Error reading {key} from S3: {str(e)}")
+            raise Exception(f"Failed to read S3 object: {str(e)}")
+        return response["Body"].read(length)
+
+    def public_url(self, key):
+        """Public URL of an object in this bucket"""
+        return self._public_url(key)
+
+    def upload_bytes(self, data, key, content_type):
+        """
+        Upload in-memory bytes (e.g. a generated image variant) under an
+        explicit key and return the public URL
+        """
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+                ACL="public-read",
+                CacheControl="public, max-age=31536000, immutable",
+            )
+        except ClientError as e:
+            logger.error(f"Error uploading {key} to S3: {str(e)}")
+            raise Exception(f"Failed to upload image to S3: {str(e)}")
+        return self._public_url(key)
+
+    def download_image(self, image_url):
+        """
+        Return the bytes of an image previously uploaded to this bucket
+
+        Raises:
+            ValueError: If the URL does not belong to this bucket
+        """
+        key = self._extract_key_from_url(image_url)
+        if not key:
+            raise ValueError(f"Not an image in this bucket: {image_url}")
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            logger.error(f"Error downloading {key} from S3: {str(e)}")
+            raise Exception(f"Failed to download image from S3: {str(e)}")
+        return response["Body"].read()
+
+    def variant_key(self, image_url, variant, extension):
+        """
+        Key for a derived copy of an image, stored next to the original:
+        listings/12/<uuid>.jpg -> listings/12/<uuid>_thumbnail.webp
+        """
+        key = self._extract_key_from_url(image_url)
+        if not key:
+            raise ValueError(f"Not an image in this bucket: {image_url}")
+        stem = key.rsplit(".", 1)[0]
+        return f"{stem}_{variant}.{extension}"
+
     def delete_image(self, image_url):
         """
         Delete an image from S3 given its URL
@@ -99,6 +311,85 @@ class S3Service:
             logger.error(f"Unexpected error deleting image: {str(e)}")
             return False
 
+    def delete_images(self, image_urls):
+        """
+        Delete many images with DeleteObjects, up to DELETE_BATCH_SIZE keys
+        per request
+
+        Args:
+            image_urls: Public URLs of the images to delete. URLs outside
+                this bucket are skipped (nothing to delete).
+
+        Returns:
+            dict: {url: error} for every image that could not be deleted;
+            empty if all succeeded
+        """
+        keys = {}
+        for url in image_urls:
+            key = self._extract_key_from_url(url)
+            if key:
+                keys.setdefault(key, url)
+            else:
+                logger.warning(f"Could not extract key from URL: {url}")
+
+        failed = {}
+        items = list(keys.items())
+        for start in range(0, len(items), DELETE_BATCH_SIZE):
+            batch = items[start : start + DELETE_BATCH_SIZE]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={
+                        "Objects": [{"Key": key} for key, _ in batch],
+                        "Quiet": True,
+                    },
+                )
+            except Exception as e:
+                logger.error(f"Error deleting {len(batch)} images from S3: {str(e)}")
+                failed.update((url, str(e)) for _, url in batch)
+                continue
+            # Quiet mode only reports the keys that failed
+            for error in response.get("Errors", []):
+                url = keys.get(error.get("Key"))
+                if url is not None:
+                    failed[url] = f"{error.get('Code')}: {error.get('Message')}"
+
+        logger.info(f"Deleted {len(keys) - len(failed)} of {len(keys)} images from S3")
+        return failed
+
+    def list_objects(self, prefix, start_after=None, page_size=1000):
+        """
+        Stream the objects under a prefix in key order, one page at a time
+
+        Args:
+            prefix: Key prefix, e.g. "listings/"
+            start_after: Resume after this key (exclusive)
+            page_size: Keys per ListObjectsV2 request (max 1000)
+
+        Yields:
+            list[tuple[str, datetime]]: (key, last_modified) for each page
+        """
+        params = {"Bucket": self.bucket_name, "Prefix": prefix, "MaxKeys": page_size}
+        if start_after:
+            params["StartAfter"] = start_after
+        while True:
+            try:
+                response = self.s3_client.list_objects_v2(**params)
+            except ClientError as e:
+                logger.error(f"Error listing {prefix} in S3: {str(e)}")
+                raise Exception(f"Failed to list S3 objects: {str(e)}")
+            contents = response.get("Contents", [])
+            page = [(obj["Key"], obj["LastModified"]) for obj in contents]
+            if page:
+                yield page
+            if not response.get("IsTruncated"):
+                return
+            params.pop("StartAfter", None)
+            params["ContinuationToken"] = response["NextContinuationToken"]
+
+    def _public_url(self, key):
+        return f"https://{self.bucket_name}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{key}"  # noqa: E501
+
     def _extract_key_from_url(self, url):
         """Extract S3 key from public URL"""
         try:
@@ -136,6 +427,18 @@ class S3Service:
                 f"Invalid file extension. Allowed: {', '.join(allowed_extensions)}"
             )
 
+        # Uploads parsed by utils.upload_handlers.ImageUploadHandler were
+        # sniffed and verified with Pillow when they finished streaming;
+        # don't read them through Pillow again
+        if getattr(image_file, "header_validated", False) is True:
+            if image_file.image_format is None or not image_file.image_verified:
+                raise ValueError("Invalid image file")
+            if image_file.image_size is not None:
+                width, height = image_file.image_size
+                if width * height > Image.MAX_IMAGE_PIXELS:
+                    raise ValueError("Image dimensions are too large")
+            return
+
         # Validate it's actually an image using Pillow
         try:
             image = Image.open(image_file)
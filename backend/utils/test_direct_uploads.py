@@ -0,0 +1,140 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+from django.core import signing
+from PIL import Image
+
+from utils.direct_uploads import (
+    TOKEN_SALT,
+    UPLOAD_EXPIRES_IN,
+    UploadRejected,
+    confirm_upload,
+    issue_upload,
+)
+from utils.s3_service import s3_service
+from utils.upload_handlers import MAX_IMAGE_SIZE
+
+USER = SimpleNamespace(pk=7)
+
+
+def _png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _upload(fake_s3, key, data, content_type="image/png"):
+    fake_s3.put_object(
+        Bucket="test-bucket", Key=key, Body=data, ContentType=content_type
+    )
+
+
+def test_issue_upload_presigns_post_with_size_and_type_conditions(fake_s3):
+    result = issue_upload(USER, 12, "listings", "image/png")
+
+    assert result["key"].startswith("listings/12/")
+    assert result["key"].endswith(".png")
+    assert result["expires_in"] == UPLOAD_EXPIRES_IN
+    upload = result["upload"]
+    assert upload["method"] == "POST"
+    assert upload["fields"]["key"] == result["key"]
+    assert upload["fields"]["Content-Type"] == "image/png"
+
+    (presigned,) = fake_s3.presigned
+    assert ["content-length-range", 1, MAX_IMAGE_SIZE] in presigned["conditions"]
+    assert {"Content-Type": "image/png"} in presigned["conditions"]
+
+
+def test_issue_upload_put(fake_s3):
+    result = issue_upload(USER, 12, "listings", "image/jpeg", method="PUT")
+
+    upload = result["upload"]
+    assert upload["method"] == "PUT"
+    assert result["key"] in upload["url"]
+    assert upload["headers"]["Content-Type"] == "image/jpeg"
+    assert fake_s3.presigned[0]["params"]["ContentType"] == "image/jpeg"
+
+
+def test_issue_upload_rejects_unknown_content_type(fake_s3):
+    with pytest.raises(UploadRejected):
+        issue_upload(USER, 12, "listings", "application/pdf")
+    assert fake_s3.presigned == []
+
+
+def test_confirm_upload_returns_public_url(fake_s3):
+    result = issue_upload(USER, 12, "listings", "image/png")
+    _upload(fake_s3, result["key"], _png_bytes())
+
+    url = confirm_upload(result["upload_token"], USER, 12, "listings")
+
+    assert url == s3_service.public_url(result["key"])
+    assert result["key"] in fake_s3.objects
+
+
+@pytest.mark.parametrize(
+    "user, resource_id, folder_name",
+    [
+        (SimpleNamespace(pk=8), 12, "listings"),
+        (USER, 13, "listings"),
+        (USER, 12, "profiles"),
+    ],
+)
+def test_confirm_upload_rejects_token_for_other_resource(
+    fake_s3, user, resource_id, folder_name
+):
+    result = issue_upload(USER, 12, "listings", "image/png")
+    _upload(fake_s3, result["key"], _png_bytes())
+
+    with pytest.raises(UploadRejected, match="does not belong"):
+        confirm_upload(result["upload_token"], user, resource_id, folder_name)
+    # Not the caller's object to delete
+    assert result["key"] in fake_s3.objects
+
+
+def test_confirm_upload_rejects_tampered_token(fake_s3):
+    result = issue_upload(USER, 12, "listings", "image/png")
+
+    with pytest.raises(UploadRejected, match="Invalid upload token"):
+        confirm_upload(result["upload_token"] + "x", USER, 12, "listings")
+
+
+def test_confirm_upload_rejects_expired_token(fake_s3, monkeypatch):
+    result = issue_upload(USER, 12, "listings", "image/png")
+    data = signing.loads(result["upload_token"], salt=TOKEN_SALT)
+
+    monkeypatch.setattr(signing.time, "time", lambda: 1_000_000)
+    token = signing.dumps(data, salt=TOKEN_SALT)
+    monkeypatch.undo()
+
+    with pytest.raises(UploadRejected, match="expired"):
+        confirm_upload(token, USER, 12, "listings")
+
+
+def test_confirm_upload_missing_object(fake_s3):
+    result = issue_upload(USER, 12, "listings", "image/png")
+
+    with pytest.raises(UploadRejected, match="not found"):
+        confirm_upload(result["upload_token"], USER, 12, "listings")
+
+
+@pytest.mark.parametrize(
+    "data, content_type, error",
+    [
+        (b"\x89PNG\r\n\x1a\n" + b"\0" * MAX_IMAGE_SIZE, "image/png", "10MB"),
+        (_png_bytes(), "image/jpeg", "content type"),
+        (b"<html>not an image</html>", "image/png", "Invalid image"),
+        (b"\xff\xd8\xff\xe0" + b"\0" * 32, "image/png", "Invalid image"),
+    ],
+)
+def test_confirm_upload_deletes_invalid_object(fake_s3, data, content_type, error):
+    result = issue_upload(USER, 12, "listings", "image/png")
+    _upload(fake_s3, result["key"], data, content_type)
+
+    with pytest.raises(UploadRejected, match=error):
+        confirm_upload(result["upload_token"], USER, 12, "listings")
+    assert result["key"] not in fake_s3.objects
+
+
+def test_head_object_missing_returns_none(fake_s3):
+    assert s3_service.head_object("listings/1/missing.png") is None
@@ -0,0 +1,61 @@
+import pytest
+
+from utils.hyperloglog import DEFAULT_PRECISION, HyperLogLog
+
+
+def _sketch(values):
+    sketch = HyperLogLog()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_empty_sketch_counts_zero():
+    assert HyperLogLog().count() == 0
+
+
+def test_small_counts_are_exact_enough():
+    assert _sketch(f"viewer-{i}" for i in range(10)).count() == 10
+
+
+@pytest.mark.parametrize("n", [1000, 50000])
+def test_estimate_within_error_bound(n):
+    estimate = _sketch(f"viewer-{i}" for i in range(n)).count()
+    # ~2.3% standard error; allow 4 standard errors
+    assert abs(estimate - n) <= 0.1 * n
+
+
+def test_duplicates_do_not_change_sketch():
+    sketch = _sketch(f"viewer-{i}" for i in range(100))
+    before = sketch.to_bytes()
+
+    assert not any(sketch.add(f"viewer-{i}") for i in range(100))
+    assert sketch.to_bytes() == before
+
+
+def test_size_is_constant():
+    small = _sketch(["a"])
+    large = _sketch(f"viewer-{i}" for i in range(20000))
+    assert len(small.to_bytes()) == len(large.to_bytes()) == 2**DEFAULT_PRECISION
+
+
+def test_merge_is_union():
+    a = _sketch(f"viewer-{i}" for i in range(0, 600))
+    b = _sketch(f"viewer-{i}" for i in range(400, 1000))
+
+    merged = HyperLogLog.from_bytes(a.to_bytes()).merge(b)
+
+    assert merged.to_bytes() == _sketch(f"viewer-{i}" for i in range(1000)).to_bytes()
+    assert abs(merged.count() - 1000) <= 100
+
+
+def test_round_trip_bytes():
+    sketch = _sketch(["a", "b", b"c"])
+    assert HyperLogLog.from_bytes(sketch.to_bytes()).count() == 3
+
+
+def test_rejects_wrong_size_and_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(b"\x00" * 10)
+    with pytest.raises(ValueError):
+        HyperLogLog().merge(HyperLogLog(precision=10))
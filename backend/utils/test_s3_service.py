@@ -2,6 +2,7 @@ import pytest
 from botocore.exceptions import ClientError
 from unittest.mock import MagicMock, patch
 from utils.s3_service import (
+    DELETE_BATCH_SIZE,
     S3Service,
     get_s3_service,
     _reset_s3_service,
@@ -310,3 +311,108 @@ def test_get_s3_service_singleton_and_proxy(mock_settings, mock_boto_client):
     _reset_s3_service()
     third = get_s3_service()
     assert third is not first
+
+
+# --- upload_images: concurrent batch upload ---
+def _named_files(*names):
+    files = []
+    for name in names:
+        f = MagicMock()
+        f.name = name
+        files.append(f)
+    return files
+
+
+def test_upload_images_keeps_input_order_and_reports_failures(s3_service):
+    import threading
+    import time
+
+    threads = set()
+
+    def fake_upload(image_file, resource_id, folder_name="listings"):
+        threads.add(threading.get_ident())
+        # Finish in reverse order to prove results are re-ordered by index
+        time.sleep(0.01 * (5 - int(image_file.name[0])))
+        if image_file.name.startswith("2"):
+            raise ValueError("Invalid image file")
+        return f"https://cdn/{folder_name}/{resource_id}/{image_file.name}"
+
+    files = _named_files("0.jpg", "1.jpg", "2.jpg", "3.jpg", "4.jpg")
+    with patch.object(s3_service, "upload_image", side_effect=fake_upload):
+        results = s3_service.upload_images(files, 7, max_workers=3)
+
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.ok for r in results] == [True, True, False, True, True]
+    assert results[0].url == "https://cdn/listings/7/0.jpg"
+    assert results[2].url is None
+    assert results[2].name == "2.jpg"
+    assert results[2].error == "Invalid image file"
+    assert 1 < len(threads) <= 3
+
+
+def test_upload_images_empty_batch(s3_service):
+    assert s3_service.upload_images([], 1) == []
+    s3_service.s3_client.upload_fileobj.assert_not_called()
+
+
+# --- variant helpers ---
+@patch("utils.s3_service.settings")
+def test_variant_key_upload_bytes_and_download(mock_settings, s3_service):
+    mock_settings.AWS_S3_REGION_NAME = "us-east-1"
+    original = "https://test-bucket.s3.us-east-1.amazonaws.com/listings/3/abc.jpg"
+
+    key = s3_service.variant_key(original, "thumbnail", "webp")
+    assert key == "listings/3/abc_thumbnail.webp"
+
+    url = s3_service.upload_bytes(b"data", key, "image/webp")
+    assert url == f"https://test-bucket.s3.us-east-1.amazonaws.com/{key}"
+    kwargs = s3_service.s3_client.put_object.call_args.kwargs
+    assert kwargs["Key"] == key
+    assert kwargs["ContentType"] == "image/webp"
+
+    s3_service.s3_client.get_object.return_value = {"Body": MagicMock()}
+    s3_service.s3_client.get_object.return_value["Body"].read.return_value = b"img"
+    assert s3_service.download_image(original) == b"img"
+
+    with pytest.raises(ValueError):
+        s3_service.download_image("https://elsewhere.example.com/x.jpg")
+
+
+@patch("utils.s3_service.settings")
+def test_delete_images_batches_delete_objects(mock_settings, s3_service):
+    """delete_images sends at most DELETE_BATCH_SIZE keys per request"""
+    mock_settings.AWS_S3_REGION_NAME = "us-east-1"
+    base = f"https://{s3_service.bucket_name}.s3.us-east-1.amazonaws.com"
+    urls = [f"{base}/listings/1/{i}.jpg" for i in range(DELETE_BATCH_SIZE + 5)]
+    s3_service.s3_client.delete_objects.return_value = {}
+
+    failed = s3_service.delete_images(urls + ["https://elsewhere.example.com/x.jpg"])
+
+    assert failed == {}
+    calls = s3_service.s3_client.delete_objects.call_args_list
+    assert [len(c.kwargs["Delete"]["Objects"]) for c in calls] == [
+        DELETE_BATCH_SIZE,
+        5,
+    ]
+    assert calls[0].kwargs["Delete"]["Objects"][0] == {"Key": "listings/1/0.jpg"}
+    assert calls[0].kwargs["Delete"]["Quiet"] is True
+
+
+@patch("utils.s3_service.settings")
+def test_delete_images_reports_failures(mock_settings, s3_service):
+    """Per-key errors and failed requests are returned by URL"""
+    mock_settings.AWS_S3_REGION_NAME = "us-east-1"
+    base = f"https://{s3_service.bucket_name}.s3.us-east-1.amazonaws.com"
+    ok, denied = f"{base}/listings/1/ok.jpg", f"{base}/listings/1/denied.jpg"
+    s3_service.s3_client.delete_objects.return_value = {
+        "Errors": [
+            {"Key": "listings/1/denied.jpg", "Code": "AccessDenied", "Message": "no"}
+        ]
+    }
+
+    assert s3_service.delete_images([ok, denied]) == {denied: "AccessDenied: no"}
+
+    s3_service.s3_client.delete_objects.side_effect = ClientError(
+        {"Error": {"Code": "SlowDown", "Message": "Slow Down"}}, "DeleteObjects"
+    )
+    assert set(s3_service.delete_images([ok, denied])) == {ok, denied}
@@ -0,0 +1,186 @@
+import io
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from utils.s3_service import S3Service, get_s3_service
+from utils.upload_handlers import (
+    MAX_IMAGE_SIZE,
+    ImageUploadHandler,
+    sniff_image_format,
+)
+
+
+def _image_bytes(fmt="JPEG", size=(640, 480)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color="blue").save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def service():
+    with patch("utils.s3_service.boto3.client"):
+        yield S3Service()
+
+
+def _stream(data, name="photo.jpg", chunk=1024):
+    handler = ImageUploadHandler()
+    handler.new_file("images", name, "image/jpeg", len(data))
+    for start in range(0, len(data), chunk):
+        handler.receive_data_chunk(data[start : start + chunk], start)
+    return handler.file_complete(len(data))
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG", "GIF", "WEBP"])
+def test_sniff_image_format(fmt):
+    assert sniff_image_format(_image_bytes(fmt)[:12]) == fmt
+
+
+def test_sniff_rejects_non_images():
+    assert sniff_image_format(b"%PDF-1.7 ...") is None
+    assert sniff_image_format(b"") is None
+
+
+def test_spools_to_disk_and_records_header():
+    uploaded = _stream(_image_bytes("PNG", size=(300, 200)), name="a.png")
+    try:
+        assert isinstance(uploaded, TemporaryUploadedFile)
+        assert uploaded.header_validated is True
+        assert uploaded.image_format == "PNG"
+        assert uploaded.image_size == (300, 200)
+    finally:
+        uploaded.close()
+
+
+def test_non_image_is_flagged(service):
+    uploaded = _stream(b"MZ" + b"\0" * 5000, name="evil.jpg")
+    try:
+        assert uploaded.image_format is None
+        with pytest.raises(ValueError, match="Invalid image file"):
+            service._validate_image(uploaded)
+    finally:
+        uploaded.close()
+
+
+def test_oversized_file_is_rejected_while_streaming():
+    handler = ImageUploadHandler()
+    handler.new_file("images", "big.jpg", "image/jpeg", None)
+    chunk = b"\0" * handler.chunk_size
+    with pytest.raises(RequestDataTooBig):
+        for start in range(0, MAX_IMAGE_SIZE + len(chunk), len(chunk)):
+            handler.receive_data_chunk(chunk, start)
+
+
+def test_validate_image_skips_pillow_for_validated_uploads(service):
+    uploaded = _stream(_image_bytes("JPEG"))
+    try:
+        assert uploaded.image_verified is True
+        with patch("utils.s3_service.Image.open") as mock_open:
+            service._validate_image(uploaded)
+        mock_open.assert_not_called()
+    finally:
+        uploaded.close()
+
+
+def test_truncated_image_with_valid_header_is_rejected(service):
+    data = _image_bytes("PNG", size=(300, 200))
+    uploaded = _stream(data[: len(data) // 2], name="cut.png")
+    try:
+        assert uploaded.image_size == (300, 200)
+        assert uploaded.image_verified is False
+        with pytest.raises(ValueError, match="Invalid image file"):
+            service._validate_image(uploaded)
+    finally:
+        uploaded.close()
+
+
+@pytest.mark.django_db
+def test_listing_create_streams_uploads_through_handler():
+    from tests.factories.factories import UserFactory
+
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    received = []
+
+    def fake_upload(image_file, *args, **kwargs):
+        received.append(image_file)
+        return f"http://example.com/{image_file.name}"
+
+    photo = io.BytesIO(_image_bytes())
+    photo.name = "photo.jpg"
+    with patch.object(get_s3_service(), "upload_image", side_effect=fake_upload):
+        response = client.post(
+            "/api/v1/listings/",
+            {
+                "title": "Lamp",
+                "category": "Furniture",
+                "description": "Bright",
+                "price": "10.00",
+                "images": [photo],
+            },
+            format="multipart",
+        )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert isinstance(received[0], TemporaryUploadedFile)
+    assert received[0].image_size == (640, 480)
+
+
+@pytest.mark.django_db
+def test_listing_create_with_oversized_file_returns_413():
+    from tests.factories.factories import UserFactory
+
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    big = io.BytesIO(_image_bytes()[:3] + b"\0" * MAX_IMAGE_SIZE)
+    big.name = "big.jpg"
+
+    response = client.post(
+        "/api/v1/listings/",
+        {
+            "title": "Huge",
+            "category": "Other",
+            "description": "Too big",
+            "price": "1.00",
+            "images": [big],
+        },
+        format="multipart",
+    )
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
+def _oversized_upload():
+    big = io.BytesIO(_image_bytes()[:3] + b"\0" * MAX_IMAGE_SIZE)
+    big.name = "big.jpg"
+    return big
+
+
+@pytest.mark.django_db
+def test_profile_avatar_with_oversized_file_returns_413():
+    from tests.factories.factories import UserFactory
+
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+
+    response = client.post(
+        "/api/v1/profiles/",
+        {"full_name": "Big Avatar", "avatar": _oversized_upload()},
+        format="multipart",
+    )
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
+def test_other_endpoints_keep_default_upload_handlers(rf):
+    from apps.listings.views import ListingViewSet
+
+    view = ListingViewSet()
+    view.action_map = {"post": "contact_seller"}
+    request = rf.post("/api/v1/listings/1/contact-seller/")
+    view.initialize_request(request)
+
+    assert not any(isinstance(h, ImageUploadHandler) for h in request.upload_handlers)
@@ -0,0 +1,137 @@
+"""
+Upload handler that keeps multipart uploads out of worker memory.
+
+Every uploaded file is spooled to a temporary file in 64KB chunks, so a
+request holding ten 10MB photos costs disk, not RAM. While the chunks
+stream past, the handler:
+
+- rejects a file as soon as it grows past MAX_IMAGE_SIZE (RequestDataTooBig,
+  which the listing views turn into a 413) instead of after buffering it
+- sniffs the format from the magic bytes of the first chunk
+- lazily opens the first HEADER_PARSE_LIMIT bytes with Pillow to read the
+  pixel dimensions (Image.open parses headers only, no pixels are decoded)
+
+Once the file is complete it is checked end to end with Image.verify(),
+so truncated or corrupt bodies behind a valid header are caught too.
+
+The results are attached to the uploaded file (header_validated,
+image_format, image_size, image_verified) for S3Service._validate_image.
+
+The handler is not installed globally: views that accept image uploads
+opt in with ImageUploadViewMixin, which also answers the 10MB limit with
+413. Other multipart endpoints keep Django's default handlers.
+"""
+
+import io
+
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image
+from rest_framework import status
+from rest_framework.response import Response
+
+MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB per file
+HEADER_PARSE_LIMIT = 256 * 1024
+TOO_LARGE_DETAIL = "Uploaded file(s) are too large. Maximum size per image is 10MB."
+
+
+def sniff_image_format(head):
+    """Return the image format named by a file's leading bytes, or None"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "GIF"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    chunk_size = 64 * 1024
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._received = 0
+        self._head = b""
+        self._format = None
+        self._size = None
+        self._parsing = True
+
+    def receive_data_chunk(self, raw_data, start):
+        self._received += len(raw_data)
+        if self._received > MAX_IMAGE_SIZE:
+            raise RequestDataTooBig(
+                f"Uploaded file {self.file_name!r} exceeds the 10MB limit"
+            )
+
+        if self._parsing:
+            self._head += raw_data
+            self._parse_header()
+
+        return super().receive_data_chunk(raw_data, start)
+
+    def _parse_header(self):
+        if self._format is None:
+            self._format = sniff_image_format(self._head)
+            if self._format is None and len(self._head) >= 12:
+                self._stop_parsing()  # not an image we accept
+                return
+        try:
+            with Image.open(io.BytesIO(self._head)) as image:
+                self._size = image.size
+        except Exception:
+            # Truncated header (wait for more data) or unreadable image
+            if len(self._head) >= HEADER_PARSE_LIMIT:
+                self._stop_parsing()
+            return
+        self._stop_parsing()
+
+    def _stop_parsing(self):
+        self._parsing = False
+        self._head = b""
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.header_validated = True
+        uploaded.image_format = self._format
+        uploaded.image_size = self._size
+        uploaded.image_verified = self._format is not None and _verify(uploaded)
+        return uploaded
+
+
+def _verify(uploaded):
+    """Whether Pillow can read the whole spooled file as an image"""
+    try:
+        uploaded.seek(0)
+        with Image.open(uploaded) as image:
+            image.verify()
+        return True
+    except Exception:
+        return False
+    finally:
+        uploaded.seek(0)
+
+
+class ImageUploadViewMixin:
+    """
+    Parse multipart bodies of the viewset actions in image_upload_actions
+    with ImageUploadHandler, and answer its RequestDataTooBig with 413.
+    """
+
+    image_upload_actions = ()
+
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if getattr(self, "action", None) in self.image_upload_actions:
+            request.upload_handlers = [ImageUploadHandler(request)]
+        return drf_request
+
+    def handle_exception(self, exc):
+        if isinstance(exc, RequestDataTooBig):
+            return Response(
+                {"detail": TOO_LARGE_DETAIL},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        return super().handle_exception(exc)
@@ -10,6 +10,21 @@ export async function getWatchlist() {
   return data;
 }
 
+/**
+ * Get one page of the user's watchlist, newest saves first (for incremental
+ * loading; getWatchlist() returns the whole list in one request)
+ * @param {string} [cursor] - Cursor from a previous page's `next`
+ * @returns {Promise<Object>} { results, next } where next is the cursor of
+ *   the following page, or null on the last page
+ */
+export async function getWatchlistPage(cursor) {
+  const { data } = await apiClient.get(endpoints.watchlist, {
+    params: cursor ? { cursor } : { pagination: "cursor" },
+  });
+  const next = data.next ? new URL(data.next).searchParams.get("cursor") : null;
+  return { results: data.results, next };
+}
+
 /**
  * Add listing to watchlist
  * @param {number} listingId - ID of the listing to save
@@ -42,3 +57,14 @@ export async function checkIsSaved(listingId) {
   return data;
 }
 
+/**
+ * Get the saved state of a page of listings in one request
+ * @param {number[]} listingIds - IDs of the listings on the page (max 60)
+ * @returns {Promise<Set<number>>} IDs of the listings the user has saved
+ */
+export async function getWatchlistStatus(listingIds) {
+  const { data } = await apiClient.post(`${endpoints.watchlist}status/`, {
+    listing_ids: listingIds,
+  });
+  return new Set(data.saved);
+}
@@ -1,6 +1,13 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest';
 import apiClient from './client';
-import { getWatchlist, addToWatchlist, removeFromWatchlist, checkIsSaved } from './watchlist';
+import {
+  getWatchlist,
+  getWatchlistPage,
+  addToWatchlist,
+  removeFromWatchlist,
+  checkIsSaved,
+  getWatchlistStatus,
+} from './watchlist';
 
 // Mock the API client
 vi.mock('./client', () => ({
@@ -26,6 +33,7 @@ describe('watchlist API', () => {
 
       const result = await getWatchlist();
 
+      expect(apiClient.get).toHaveBeenCalledTimes(1);
       expect(apiClient.get).toHaveBeenCalledWith('/watchlist/');
       expect(result).toEqual(mockData);
     });
@@ -39,6 +47,37 @@ describe('watchlist API', () => {
     });
   });
 
+  describe('getWatchlistPage', () => {
+    it('asks for cursor pages and returns the next cursor', async () => {
+      apiClient.get.mockResolvedValue({
+        data: {
+          results: [{ listing_id: 2 }],
+          next: 'http://testserver/api/v1/watchlist/?cursor=abc&pagination=cursor',
+        },
+      });
+
+      const page = await getWatchlistPage();
+
+      expect(apiClient.get).toHaveBeenCalledWith('/watchlist/', {
+        params: { pagination: 'cursor' },
+      });
+      expect(page).toEqual({ results: [{ listing_id: 2 }], next: 'abc' });
+    });
+
+    it('fetches the page after a cursor', async () => {
+      apiClient.get.mockResolvedValue({
+        data: { results: [{ listing_id: 1 }], next: null },
+      });
+
+      const page = await getWatchlistPage('abc');
+
+      expect(apiClient.get).toHaveBeenCalledWith('/watchlist/', {
+        params: { cursor: 'abc' },
+      });
+      expect(page.next).toBeNull();
+    });
+  });
+
   describe('addToWatchlist', () => {
     it('adds listing to watchlist successfully', async () => {
       const mockResponse = { message: 'Listing added to watchlist' };
@@ -99,5 +138,17 @@ describe('watchlist API', () => {
       expect(result.is_saved).toBe(false);
     });
   });
-});
 
+  describe('getWatchlistStatus', () => {
+    it('posts the listing ids and returns the saved set', async () => {
+      apiClient.post.mockResolvedValue({ data: { saved: [2] } });
+
+      const result = await getWatchlistStatus([1, 2, 3]);
+
+      expect(apiClient.post).toHaveBeenCalledWith('/watchlist/status/', {
+        listing_ids: [1, 2, 3],
+      });
+      expect(result).toEqual(new Set([2]));
+    });
+  });
+});